@@ -1 +1,8 @@
-from pyiterable.iterable import Iterable
\ No newline at end of file
+from pyiterable.iterable import Iterable
+from pyiterable.partitioned import PartitionedIterable
+from pyiterable.pipeline import Pipeline
+from pyiterable.sketches import TDigest
+from pyiterable.expressions import col, lit
+from pyiterable.memory import limits
+from pyiterable.adaptive import AdaptiveFilter
+from pyiterable.caching import Cache, named_cache
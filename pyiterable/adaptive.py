@@ -0,0 +1,119 @@
+""" Filters whose predicates are reordered while they run, by the cost and selectivity measured for each """
+import timeit
+
+
+class _PredicateStats(object):
+    __slots__ = ('predicate', 'calls', 'passed', 'seconds')
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.calls = 0
+        self.passed = 0
+        self.seconds = 0.0
+
+    def selectivity(self):
+        # Fraction of sampled elements the predicate keeps; assumed to keep everything until it is sampled
+        return self.passed / float(self.calls) if self.calls else 1.0
+
+    def cost(self):
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def rank(self):
+        # Expected cost per element rejected; the lowest rank runs first. Predicates that keep every element rank last
+        rejected = 1.0 - self.selectivity()
+        return self.cost() / rejected if rejected > 0 else float('inf')
+
+
+class AdaptiveFilter(object):
+    """ Single filter equivalent to applying every one of *predicates* in turn, in whichever order is cheapest
+
+    * One element in every *sample_every* is passed to every predicate, timing each, to measure its cost per call
+      and its selectivity, i.e. the fraction of elements it keeps
+    * After every *reorder_every* sampled elements, predicates are sorted by **cost / (1 - selectivity)**, so those
+      that reject the most elements for the least time run first; other elements stop at the first rejection
+    * Predicates must not have side effects, as the order, and the number of times, they are called changes
+
+    :param predicates: functions that return **False** for elements to exclude
+    :param sample_every: one in how many elements is sampled
+    :param reorder_every: number of sampled elements between reorderings
+
+    :raises ValueError: *sample_every* or *reorder_every* is less than 1
+
+    >>> matches = AdaptiveFilter([is_valid_signature, lambda row: row['country'] == 'NZ'])
+    >>> Iterable(rows).filter(matches).len()
+    >>> matches.statistics()['order']
+    [<function <lambda>>, <function is_valid_signature>]
+    """
+
+    def __init__(self, predicates, sample_every=16, reorder_every=8):
+        if sample_every < 1:
+            raise ValueError("'sample_every' must be greater than 0")
+        if reorder_every < 1:
+            raise ValueError("'reorder_every' must be greater than 0")
+
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self.__stats = [_PredicateStats(predicate) for predicate in predicates]
+        self.__order = [stats.predicate for stats in self.__stats]
+        self.__evaluated = 0
+        self.__sampled = 0
+        self.__reorders = 0
+        # The first element is sampled
+        self.__until_sample = 1
+
+    def __call__(self, element):
+        self.__evaluated += 1
+        self.__until_sample -= 1
+        if self.__until_sample:
+            for predicate in self.__order:
+                if not predicate(element):
+                    return False
+
+            return True
+
+        self.__until_sample = self.sample_every
+        return self.__sample(element)
+
+    def __sample(self, element):
+        timer = timeit.default_timer
+        kept = True
+        for stats in self.__stats:
+            start = timer()
+            passed = stats.predicate(element)
+            stats.seconds += timer() - start
+            stats.calls += 1
+            if passed:
+                stats.passed += 1
+            else:
+                kept = False
+
+        self.__sampled += 1
+        if self.__sampled % self.reorder_every == 0:
+            self.__reorder()
+
+        return kept
+
+    def __reorder(self):
+        order = [stats.predicate for stats in sorted(self.__stats, key=_PredicateStats.rank)]
+        if order != self.__order:
+            self.__order = order
+            self.__reorders += 1
+
+    def statistics(self):
+        """ :return: dict of the number of *'evaluated'* and *'sampled'* elements, the number of *'reorders'*, the
+            current *'order'* of the predicates, and *'predicates'*: a list with a dict for each predicate, in the
+            order given, of its *'predicate'*, sampled *'calls'*, *'selectivity'*, *'cost'* in seconds per call, and
+            *'rank'* """
+        return {
+            'evaluated': self.__evaluated,
+            'sampled': self.__sampled,
+            'reorders': self.__reorders,
+            'order': list(self.__order),
+            'predicates': [{
+                'predicate': stats.predicate,
+                'calls': stats.calls,
+                'selectivity': stats.selectivity(),
+                'cost': stats.cost(),
+                'rank': stats.rank(),
+            } for stats in self.__stats],
+        }
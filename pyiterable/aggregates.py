@@ -0,0 +1,156 @@
+""" Fused reductions for **Iterable.aggregate()** and **Iterable.describe()**, computed in a single pass """
+import itertools
+import numbers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Elements reduced at a time; each chunk is reduced by C loops, or by NumPy if it is all numbers
+CHUNK_SIZE = 65536
+
+REDUCTIONS = ('count', 'sum', 'min', 'max', 'mean', 'var', 'std')
+
+# Built-in functions accepted in place of the names of their reductions
+_BUILTINS = {len: 'count', sum: 'sum', min: 'min', max: 'max'}
+
+
+def reduction_name(reduction):
+    """ :param reduction: one of *REDUCTIONS*, or the built-in function **len**, **sum**, **min**, or **max**
+        :return: name of *reduction* in *REDUCTIONS*
+
+        :raises ValueError: *reduction* is not supported """
+    try:
+        name = _BUILTINS.get(reduction, reduction)
+    except TypeError:
+        name = None
+
+    if name not in REDUCTIONS:
+        raise ValueError("unsupported reduction {!r}; use one of {}".format(reduction, ', '.join(REDUCTIONS)))
+
+    return name
+
+
+def _number_kind(chunk):
+    # 'float' if every value is a float, 'real' if every value is a real number, otherwise None
+    kind = 'float'
+    for value in chunk:
+        if isinstance(value, float):
+            continue
+        if not isinstance(value, numbers.Real) or isinstance(value, bool):
+            return None
+        kind = 'real'
+
+    return kind
+
+
+class Moments(object):
+    """ Mergeable count, sum, minimum, maximum, mean, and variance of a stream of values
+
+    Chunks of values are reduced on their own and merged with Chan et al.'s parallel form of Welford's algorithm, so
+    the variance stays accurate even when the values are large relative to their spread.
+
+    :param names: reductions to compute; the others are skipped
+    """
+
+    def __init__(self, names=REDUCTIONS):
+        self.names = frozenset(names)
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, chunk):
+        """ Adds a list of values """
+        if not chunk:
+            return
+
+        names = self.names
+        moments = names.intersection(('mean', 'var', 'std'))
+        kind = _number_kind(chunk) if numpy is not None else None
+        if kind == 'real' and not moments:
+            kind = None
+        values = numpy.asarray(chunk, dtype=numpy.float64) if kind is not None else None
+
+        # Sums and extremes of integers stay exact on the built-in path, where NumPy's int64 would overflow
+        if kind == 'float':
+            total = values.sum().item() if 'sum' in names else 0
+            lo = values.min().item() if 'min' in names else None
+            hi = values.max().item() if 'max' in names else None
+        else:
+            total = sum(chunk) if 'sum' in names or (moments and values is None) else 0
+            lo = min(chunk) if 'min' in names else None
+            hi = max(chunk) if 'max' in names else None
+
+        mean = m2 = 0.0
+        if moments and values is not None:
+            mean = values.mean().item()
+            if names.intersection(('var', 'std')):
+                m2 = numpy.square(values - mean).sum().item()
+        elif moments:
+            mean = total / float(len(chunk))
+            if names.intersection(('var', 'std')):
+                m2 = sum([(value - mean) ** 2 for value in chunk])
+
+        self.__merge(len(chunk), total, lo, hi, mean, m2)
+
+    def __merge(self, count, total, lo, hi, mean, m2):
+        combined = self.count + count
+        delta = mean - self.mean
+        self._m2 += m2 + delta * delta * self.count * count / combined
+        self.mean += delta * count / combined
+        self.count = combined
+        self.sum += total
+        if lo is not None and (self.min is None or lo < self.min):
+            self.min = lo
+        if hi is not None and (self.max is None or hi > self.max):
+            self.max = hi
+
+    def merge(self, other):
+        """ Adds the values of another *Moments* with the same *names* """
+        if other.count:
+            self.__merge(other.count, other.sum, other.min, other.max, other.mean, other._m2)
+
+    def result(self, name):
+        """ :param name: one of *names*
+            :return: value of the *name* reduction; sample variance and standard deviation, with *n - 1* degrees of
+                freedom. *None* for the minimum, maximum, and mean of no values, and the variance of less than two """
+        if name == 'count':
+            return self.count
+        if name == 'sum':
+            return self.sum
+        if name == 'min':
+            return self.min
+        if name == 'max':
+            return self.max
+        if name == 'mean':
+            return self.mean if self.count else None
+
+        if self.count < 2:
+            return None
+        variance = self._m2 / (self.count - 1)
+        return variance if name == 'var' else variance ** 0.5
+
+
+def aggregate(iterable, reductions, chunk_size=CHUNK_SIZE):
+    """ Computes every reduction in *reductions* in a single pass over *iterable*
+
+    :param reductions: dict of result name to a reduction accepted by **reduction_name()**
+    :return: dict of result name to value
+    """
+    names = dict((result, reduction_name(reduction)) for result, reduction in reductions.items())
+    moments = Moments(names.values())
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            break
+
+        moments.update(chunk)
+
+    return dict((result, moments.result(name)) for result, name in names.items())
@@ -0,0 +1,281 @@
+""" Apache Arrow interop for *Iterable*; requires pyarrow
+
+Arrow data is read lazily, one record batch at a time, and **filter()** calls with column expressions and **map()**
+calls with a single **col()** are run by Arrow on whole batches. Writing an *Iterable* that reads Arrow data, with
+only such operations, passes its record batches through without converting them to Python objects.
+"""
+import itertools
+import operator
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from pyiterable.expressions import Column, Literal, Operation
+from pyiterable.iterable import _Pushdown
+
+
+# Rows converted into a record batch at a time
+BATCH_SIZE = 65536
+
+# Arithmetic is not translated: Arrow's kernels raise on integer overflow and on strings, where Python does not
+_COMPUTE_OPERATORS = {
+    'lt': operator.lt,
+    'le': operator.le,
+    'ge': operator.ge,
+    'gt': operator.gt,
+}
+
+_COMPARISONS = frozenset(['lt', 'le', 'eq', 'ne', 'ge', 'gt', 'isin'])
+
+# Arrow compares nulls as unknown rather than equal, so None is not translated
+_SCALAR_TYPES = (bool, int, float, str, bytes)
+
+
+def require_pyarrow():
+    """ :raises ImportError: pyarrow is not installed """
+    if pyarrow is None:
+        raise ImportError("Arrow support requires pyarrow")
+
+
+def _equal(left, right):
+    # Arrow's == is null where either side is null, but None == None in Python
+    either_null = left.is_null() | right.is_null()
+    return pyarrow.compute.if_else(either_null, left.is_null() & right.is_null(), left == right)
+
+
+def _to_compute(expression, condition=True):
+    # Returns the equivalent pyarrow.compute.Expression, or None if there is none. A condition is a comparison, or
+    # and, or, and not of conditions; Arrow cannot take the truth of other values, such as strings, like Python does
+    if isinstance(expression, Column):
+        return pyarrow.compute.field(expression.key) if isinstance(expression.key, str) and not condition else None
+
+    if isinstance(expression, Literal):
+        if type(expression.value) not in _SCALAR_TYPES or condition:
+            return None
+        return pyarrow.compute.scalar(expression.value)
+
+    if not isinstance(expression, Operation):
+        return None
+
+    name = expression.name
+    if condition != (name in _COMPARISONS or name in ('and', 'or', 'not')):
+        return None
+
+    if name == 'isin':
+        target = _to_compute(expression.operands[0], condition=False)
+        values = list(expression.operands[1].value)
+        if target is None or any(type(value) not in _SCALAR_TYPES for value in values):
+            return None
+
+        return target.isin(values)
+
+    is_logical = name in ('and', 'or', 'not')
+    operands = [_to_compute(operand, condition=is_logical) for operand in expression.operands]
+    if any(operand is None for operand in operands):
+        return None
+    if name == 'not':
+        return ~operands[0]
+    if name == 'and':
+        return operands[0] & operands[1]
+    if name == 'or':
+        return operands[0] | operands[1]
+    if name == 'eq':
+        return _equal(*operands)
+    if name == 'ne':
+        return ~_equal(*operands)
+    if name not in _COMPUTE_OPERATORS:
+        return None
+
+    return _COMPUTE_OPERATORS[name](*operands)
+
+
+def _replay(reader):
+    # A RecordBatchReader can only be read once; keep its batches, which reference rather than copy its buffers,
+    # so the source can be iterated again
+    batches = []
+
+    def read():
+        for batch in batches:
+            yield batch
+
+        while True:
+            try:
+                batch = reader.read_next_batch()
+            except StopIteration:
+                return
+
+            batches.append(batch)
+            yield batch
+
+    return read
+
+
+def _parquet_batches(path, columns):
+    parquet_file = pyarrow.parquet.ParquetFile(path)
+    for batch in parquet_file.iter_batches(columns=columns):
+        yield batch
+
+
+def _ipc_batches(path):
+    # Memory-mapped, so batches reference the file's pages instead of copying them
+    reader = pyarrow.ipc.open_file(pyarrow.memory_map(path))
+    for i in range(reader.num_record_batches):
+        yield reader.get_batch(i)
+
+
+class ArrowSource(_Pushdown):
+    """ Rows of Arrow record batches as dicts, read by **Iterable.from_arrow()**, **from_parquet()**, and
+    **from_ipc()** """
+
+    def __init__(self, batches, predicate=None, column=None):
+        # *batches* is a function that returns an iterable of record batches
+        self.batches = batches
+        self.predicate = predicate
+        # Name of the column each row is mapped to, or None for rows as dicts
+        self.column = column
+
+    def record_batches(self):
+        """ :return: iterator of the record batches, or tables, of *self* after its filters and projection """
+        for batch in self.batches():
+            if self.predicate is not None:
+                batch = pyarrow.Table.from_batches([batch]).filter(self.predicate)
+            if self.column is not None:
+                batch = batch.select([self.column])
+
+            yield batch
+
+    def __iter__(self):
+        for batch in self.record_batches():
+            if self.column is None:
+                rows = batch.to_pylist()
+            else:
+                rows = batch.column(0).to_pylist()
+
+            for row in rows:
+                yield row
+
+    def filter(self, expression):
+        if self.column is not None:
+            return None
+
+        predicate = _to_compute(expression)
+        if predicate is None:
+            return None
+
+        return ArrowSource(self.batches, predicate if self.predicate is None else self.predicate & predicate)
+
+    def map(self, expression):
+        if self.column is not None or not isinstance(expression, Column) or not isinstance(expression.key, str):
+            return None
+
+        return ArrowSource(self.batches, self.predicate, expression.key)
+
+    def len(self):
+        return sum(batch.num_rows for batch in self.record_batches())
+
+
+def source(data):
+    """ :param data: *pyarrow.Table*, *pyarrow.RecordBatch*, or *pyarrow.RecordBatchReader*
+        :return: *ArrowSource* of *data*
+
+        :raises TypeError: *data* is not Arrow data """
+    require_pyarrow()
+    if isinstance(data, pyarrow.Table):
+        return ArrowSource(data.to_batches)
+    if isinstance(data, pyarrow.RecordBatch):
+        return ArrowSource(lambda: [data])
+    if isinstance(data, pyarrow.RecordBatchReader):
+        return ArrowSource(_replay(data))
+
+    raise TypeError("expected a pyarrow Table, RecordBatch, or RecordBatchReader, not {}".format(type(data).__name__))
+
+
+def parquet_source(path, columns=None):
+    """ :return: *ArrowSource* of the Parquet file at *path*, reading only *columns* if given """
+    require_pyarrow()
+    return ArrowSource(lambda: _parquet_batches(path, columns))
+
+
+def ipc_source(path):
+    """ :return: *ArrowSource* of the Arrow IPC file at *path* """
+    require_pyarrow()
+    return ArrowSource(lambda: _ipc_batches(path))
+
+
+def record_batches(backing, schema=None, batch_size=BATCH_SIZE):
+    """ Converts the elements of an *Iterable* into record batches
+
+    :param backing: the elements; if an *ArrowSource*, its batches are passed through
+    :param schema: *pyarrow.Schema* of the batches; inferred from the first batch if *None*
+    :param batch_size: number of elements converted at a time
+    :return: iterator of record batches, or tables, that all have the same schema
+    """
+    require_pyarrow()
+    if isinstance(backing, ArrowSource):
+        for batch in backing.record_batches():
+            if schema is not None:
+                if isinstance(batch, pyarrow.RecordBatch):
+                    batch = pyarrow.Table.from_batches([batch])
+                batch = batch.cast(schema)
+
+            yield batch
+        return
+
+    iterator = iter(backing)
+    while True:
+        rows = list(itertools.islice(iterator, batch_size))
+        if not rows:
+            return
+
+        if not isinstance(rows[0], dict):
+            # Like a mapped SQLite source, plain values go in a column named 'value'
+            rows = [{'value': row} for row in rows]
+
+        batch = pyarrow.RecordBatch.from_pylist(rows, schema=schema)
+        schema = batch.schema
+        yield batch
+
+
+def to_table(backing, schema=None, batch_size=BATCH_SIZE):
+    """ :return: *pyarrow.Table* of the elements of an *Iterable*; see **record_batches()** """
+    batches = list(record_batches(backing, schema, batch_size))
+    if not batches:
+        return (schema or pyarrow.schema([])).empty_table()
+
+    return pyarrow.concat_tables([pyarrow.Table.from_batches([batch]) if isinstance(batch, pyarrow.RecordBatch)
+                                  else batch for batch in batches])
+
+
+def write(backing, path, file_format, schema=None, batch_size=BATCH_SIZE):
+    """ Writes the elements of an *Iterable* to a Parquet or Arrow IPC file, one record batch at a time
+
+    :param file_format: *'parquet'* or *'ipc'*
+    """
+    writer = None
+    try:
+        for batch in record_batches(backing, schema, batch_size):
+            if writer is None:
+                if file_format == 'parquet':
+                    writer = pyarrow.parquet.ParquetWriter(path, batch.schema)
+                else:
+                    writer = pyarrow.ipc.new_file(path, batch.schema)
+
+            if isinstance(batch, pyarrow.RecordBatch):
+                batch = pyarrow.Table.from_batches([batch])
+            writer.write_table(batch)
+
+        if writer is None:
+            # Nothing to write; still create a valid, empty file
+            empty = (schema or pyarrow.schema([])).empty_table()
+            if file_format == 'parquet':
+                pyarrow.parquet.write_table(empty, path)
+            else:
+                writer = pyarrow.ipc.new_file(path, empty.schema)
+    finally:
+        if writer is not None:
+            writer.close()
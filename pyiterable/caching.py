@@ -0,0 +1,130 @@
+""" Caches that memoize expensive, pure functions of elements for **map()**, **filter()**, and **mapmany()**
+
+>>> geocode_cache = named_cache('geocode', maxsize=10000)
+>>> cities = addresses.map(geocode, cache='geocode')
+>>> geocode_cache.statistics()['hit_rate']
+0.93
+"""
+from collections import OrderedDict
+import threading
+
+
+_missing = object()
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Cache(object):
+    """ Cache of the results of functions, keyed by function and element, with least-recently-used eviction
+
+    * Elements that cannot be hashed, e.g. dicts, are passed to the function every time, and counted as *uncached*
+    * Equal elements of different types, e.g. *1*, *1.0*, and *True*, are cached apart
+    * A *Cache* can be shared by many *Iterable* objects, and functions, so results computed once are reused
+
+    :param maxsize: maximum number of results kept; *None* for no limit
+
+    :raises ValueError: *maxsize* is less than 1
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("'maxsize' must be greater than 0")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.__entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        """ Removes every result and resets the counts """
+        self.__entries.clear()
+        self.hits = self.misses = self.uncached = 0
+
+    def statistics(self):
+        """ :return: dict of *'hits'*, *'misses'*, *'uncached'* calls, *'size'*, *'maxsize'*, and *'hit_rate'*, the
+            fraction of cacheable calls that were hits, or *None* if there were none """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'uncached': self.uncached,
+            'size': len(self.__entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / float(lookups) if lookups else None,
+        }
+
+    def memoize(self, function, materialize=False):
+        """ :param function: pure function of an element
+            :param materialize: if True, the iterables *function* returns are cached as tuples, so they can be
+                iterated again
+            :return: function equivalent to *function* that returns cached results for elements seen before """
+        entries = self.__entries
+        maxsize = self.maxsize
+        # Materialized results are cached apart from those of the same function used with map()
+        prefix = (function, tuple) if materialize else function
+
+        def memoized(element):
+            # Equal elements of different types, e.g. 1 and 1.0, can have different results
+            key = (prefix, type(element), element)
+            try:
+                # Popped and reinserted, so the least recently used entry stays first
+                value = entries.pop(key, _missing) if maxsize is not None else entries.get(key, _missing)
+            except TypeError:
+                self.uncached += 1
+                return function(element)
+
+            if value is _missing:
+                self.misses += 1
+                value = tuple(function(element)) if materialize else function(element)
+                if maxsize is not None and len(entries) >= maxsize:
+                    try:
+                        entries.popitem(last=False)
+                    except KeyError:
+                        # Emptied by another thread
+                        pass
+            else:
+                self.hits += 1
+
+            entries[key] = value
+            return value
+
+        return memoized
+
+
+def named_cache(name, maxsize=None):
+    """ Returns the *Cache* registered as *name*, creating it if there is none
+
+    :param name: name of the cache; pass it as *cache* to **Iterable.map()**, **filter()**, or **mapmany()**
+    :param maxsize: maximum number of results kept, if the cache is created
+    :return: *Cache*
+    """
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = Cache(maxsize)
+
+        return _registry[name]
+
+
+def named_caches():
+    """ :return: dict of every registered name to its *Cache* """
+    with _registry_lock:
+        return dict(_registry)
+
+
+def memoized(function, memoize=False, maxsize=None, cache=None, materialize=False):
+    """ :return: *function* memoized as requested by the *memoize*, *maxsize*, and *cache* arguments of
+        **Iterable.map()**, or *function* itself if no caching is requested; see **Cache.memoize()** """
+    if cache is not None:
+        if not isinstance(cache, Cache):
+            cache = named_cache(cache, maxsize)
+    elif memoize or maxsize is not None:
+        cache = Cache(maxsize)
+    else:
+        return function
+
+    return cache.memoize(function, materialize)
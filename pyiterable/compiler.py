@@ -0,0 +1,186 @@
+""" Compiles chains of **map()**, **filter()**, **enumerate()**, **zip()**, and **take()** stages into a single loop
+
+The Python source of the loop is generated once for every pipeline shape, i.e. the sequence of stage names and
+anything inlined into the source, and cached; the functions and other arguments of the stages are passed in when the
+compiled loop runs, so pipelines of the same shape share the same code.
+"""
+import functools
+import operator
+
+from pyiterable.expressions import _literal_source as _literal, Expression
+from pyiterable.iterable import Iterable
+
+
+STAGES = ('map', 'filter', 'enumerate', 'zip', 'take')
+
+_COMPARISONS = {
+    operator.lt: '<',
+    operator.le: '<=',
+    operator.eq: '==',
+    operator.ne: '!=',
+    operator.ge: '>=',
+    operator.gt: '>',
+}
+
+_MAX_CACHED_SHAPES = 256
+_cache = {}
+_missing = object()
+
+
+def _inline(function, value):
+    # Returns source computing function(value), or None if function is opaque
+    if isinstance(function, Expression):
+        return function.source(value)
+
+    if type(function) is operator.itemgetter:
+        keys = function.__reduce__()[1]
+        literals = [_literal(key) for key in keys]
+        if None in literals:
+            return None
+        if len(literals) == 1:
+            return '{}[{}]'.format(value, literals[0])
+
+        return '({},)'.format(', '.join('{}[{}]'.format(value, literal) for literal in literals))
+
+    if isinstance(function, functools.partial) and function.func in _COMPARISONS and len(function.args) == 1 \
+            and not function.keywords:
+        # partial(operator.gt, 80)(value) is 80 > value
+        literal = _literal(function.args[0])
+        if literal is not None:
+            return '{} {} {}'.format(literal, _COMPARISONS[function.func], value)
+
+    return None
+
+
+def _generate(stages):
+    # Returns (shape, source, bindings); *bindings* are the arguments of the generated function after *source*
+    shape = []
+    bindings = []
+    parameters = []
+    setup = []
+    body = []
+    checks = []
+    depth = 2
+
+    def emit(line):
+        body.append('    ' * depth + line)
+
+    for position, (name, argument) in enumerate(stages):
+        if name not in STAGES:
+            raise ValueError("unsupported stage '{}'; use one of {}".format(name, ', '.join(STAGES)))
+
+        parameter = 'a{}'.format(position)
+        if name == 'filter' and argument is None:
+            inlined = 'value'
+        else:
+            inlined = _inline(argument, 'value') if name in ('map', 'filter') else None
+        shape.append((name, inlined))
+        if inlined is None:
+            parameters.append(parameter)
+            bindings.append(argument)
+
+        if name == 'map':
+            emit('value = {}'.format(inlined or '{}(value)'.format(parameter)))
+        elif name == 'filter':
+            emit('if {}:'.format(inlined or '{}(value)'.format(parameter)))
+            depth += 1
+        elif name == 'enumerate':
+            setup.append('count{} = {}'.format(position, parameter))
+            emit('value = (count{}, value)'.format(position))
+            emit('count{} += 1'.format(position))
+        elif name == 'zip':
+            setup.append('other{} = iter({})'.format(position, parameter))
+            emit('other = next(other{}, missing)'.format(position))
+            emit('if other is missing:')
+            emit('    break')
+            emit('value = (value, other)')
+        else:
+            setup.append('if {} < 1:'.format(parameter))
+            setup.append('    return result')
+            setup.append('taken{} = 0'.format(position))
+            emit('taken{} += 1'.format(position))
+            # Checked once the element is done, so no element is read from the source past the last one taken
+            checks.append('if taken{} >= {}:'.format(position, parameter))
+            checks.append('    break')
+
+    emit('append(value)')
+
+    lines = ['def pipeline(source{}):'.format(''.join(', ' + parameter for parameter in parameters)),
+             '    result = []',
+             '    append = result.append']
+    lines.extend('    ' + line for line in setup)
+    lines.append('    for value in source:')
+    lines.extend(body)
+    lines.extend('        ' + line for line in checks)
+    lines.append('    return result')
+
+    return tuple(shape), '\n'.join(lines) + '\n', bindings
+
+
+class CompiledPipeline(object):
+    """ Chain of stages compiled into a single loop by *compile_pipeline()*
+
+    Call it with an iterable to run every stage over it; it can be called any number of times, with different inputs.
+
+    :ivar source: Python source of the compiled loop
+    """
+
+    def __init__(self, function, bindings, source):
+        self.__function = function
+        self.__bindings = tuple(bindings)
+        self.source = source
+
+    def __call__(self, iterable):
+        """ Runs every stage over *iterable*
+
+        :param iterable: input of the first stage
+        :return: *Iterable* of the results
+        """
+        return Iterable.wrap(self.__function(iterable, *self.__bindings))
+
+    def to_list(self, iterable):
+        """ Runs every stage over *iterable*, without wrapping the results in an *Iterable*
+
+        :param iterable: input of the first stage
+        :return: list of the results
+        """
+        return self.__function(iterable, *self.__bindings)
+
+
+def compile_pipeline(stages):
+    """ Compiles a chain of stages into a single loop, without an intermediate *Iterable* or iterator per stage
+
+    Each stage is a *(name, argument)* tuple, and stages run in order:
+
+    * *('map', function)* replaces each element with **function(** *element* **)**
+    * *('filter', function)* keeps elements for which **function(** *element* **)** is true; or that are true if
+      *function* is *None*
+    * *('enumerate', start)* replaces each element with *(index, element)*, counting from *start*
+    * *('zip', iterable)* replaces each element with *(element, item)*, taking items from *iterable* in turn, and
+      stops when *iterable* is exhausted
+    * *('take', count)* stops after *count* elements reach it
+
+    Column expressions such as **col('score') > 80**, *operator.itemgetter()* keys, and comparisons with a constant
+    written as e.g. **functools.partial(operator.lt, 80)**, are inlined into the generated source.
+
+    :param stages: iterable of *(name, argument)* tuples
+    :return: *CompiledPipeline*
+
+    :raises ValueError: a stage name is not supported
+
+    >>> from operator import itemgetter
+    >>> pipeline = compile_pipeline([('map', itemgetter('score')), ('filter', lambda x: x > 80), ('take', 2)])
+    >>> pipeline([{'score': 90}, {'score': 50}, {'score': 85}, {'score': 99}]).to_list()
+    [90, 85]
+    """
+    shape, source, bindings = _generate(list(stages))
+    function = _cache.get(shape)
+    if function is None:
+        namespace = {'missing': _missing}
+        exec(compile(source, '<pyiterable pipeline>', 'exec'), namespace)
+        function = namespace['pipeline']
+        if len(_cache) >= _MAX_CACHED_SHAPES:
+            _cache.clear()
+        _cache[shape] = function
+
+    return CompiledPipeline(function, bindings, source)
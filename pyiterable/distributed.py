@@ -0,0 +1,256 @@
+""" Runs *PartitionedIterable* tasks on worker processes over TCP, e.g. across the hosts of a cluster
+
+Start a worker on every host with::
+
+    PYITERABLE_AUTHKEY=secret python -m pyiterable.distributed --host 0.0.0.0 --port 7000
+
+then pass a *ClusterPool* of their addresses as the *pool* of a *PartitionedIterable*. Tasks and results are pickled,
+so functions must be importable by the workers, and workers must only be reachable from trusted hosts; every
+connection is authenticated with the shared *authkey*.
+"""
+import argparse
+import multiprocessing
+from multiprocessing.connection import Client, Listener
+import os
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2.x
+    import Queue as queue
+
+
+def serve(address, authkey, ready=None):
+    """ Runs a worker that executes tasks sent by a *ClusterPool*, until it is sent a shutdown message
+
+    :param address: *(host, port)* to listen on; port 0 picks a free port
+    :param authkey: bytes shared with every *ClusterPool* that connects to this worker
+    :param ready: optional queue; the address the worker listens on is put on it once it is ready
+    """
+    listener = Listener(tuple(address), authkey=authkey)
+    if ready is not None:
+        ready.put(listener.address)
+
+    try:
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception:
+                # e.g. a client that failed authentication
+                continue
+
+            try:
+                message = connection.recv()
+            except (EOFError, OSError, IOError):
+                connection.close()
+                continue
+
+            if message[0] == 'shutdown':
+                connection.close()
+                return
+
+            # Each ClusterPool keeps its connection open for many tasks
+            thread = threading.Thread(target=_handle, args=(connection, message))
+            thread.daemon = True
+            thread.start()
+    finally:
+        listener.close()
+
+
+def _handle(connection, message):
+    try:
+        while True:
+            _, function, argument = message
+            try:
+                response = ('ok', function(argument))
+            except Exception as e:
+                response = ('error', e)
+
+            try:
+                connection.send(response)
+            except Exception as e:
+                # The result or exception could not be pickled
+                connection.send(('error', RuntimeError(repr(e))))
+
+            message = connection.recv()
+    except (EOFError, OSError, IOError):
+        pass
+    finally:
+        connection.close()
+
+
+class ClusterPool(object):
+    """ Pool of remote workers with a **map()** method, usable as the *pool* of a *PartitionedIterable*
+
+    Tasks are scheduled on whichever worker is free, and results are returned in task order. Tasks on a worker that
+    disconnects are rescheduled on the remaining workers.
+
+    :param addresses: list of *(host, port)* tuples that workers listen on
+    :param authkey: bytes shared with the workers
+
+    >>> from operator import add
+    >>> with start_local_workers(4) as cluster:
+    ...     pool = ClusterPool(cluster.addresses, cluster.authkey)
+    ...     Iterable(range(100)).partition(8, by='round_robin', pool=pool).map(abs).aggregate(sum, combine=add)
+    4950
+    """
+
+    def __init__(self, addresses, authkey):
+        self.addresses = [tuple(address) for address in addresses]
+        self.authkey = authkey
+
+    def map(self, function, iterable):
+        """ Equivalent to calling **list( map(** *function, iterable* **) )**, with calls spread across the workers
+
+        :param function: picklable function applied to every item of *iterable*
+        :param iterable: iterable of picklable arguments
+        :return: list of results, in the order of *iterable*
+
+        :raises RuntimeError: every worker disconnected before all tasks finished
+        :raises Exception: the first exception raised by *function*, in the order of *iterable*
+        """
+        pending = queue.Queue()
+        count = 0
+        for count, argument in enumerate(iterable, 1):
+            pending.put((count - 1, argument))
+
+        results = [None] * count
+        errors = {}
+        finished = [0]
+        lock = threading.Lock()
+
+        threads = [threading.Thread(target=self.__schedule, args=(address, function, pending, results, errors,
+                                                                  finished, lock))
+                   for address in self.addresses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[min(errors)]
+        if finished[0] < count:
+            raise RuntimeError("all workers disconnected with {} tasks remaining".format(count - finished[0]))
+
+        return results
+
+    def __schedule(self, address, function, pending, results, errors, finished, lock):
+        try:
+            connection = Client(address, authkey=self.authkey)
+        except Exception:
+            return
+
+        try:
+            while True:
+                with lock:
+                    if finished[0] == len(results):
+                        return
+
+                try:
+                    # Keep polling until every task has finished, as tasks of a disconnected worker are put back
+                    position, argument = pending.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+
+                try:
+                    status, value = self.__run(connection, function, argument)
+                except (EOFError, OSError, IOError):
+                    # The worker is gone; let another worker run the task
+                    pending.put((position, argument))
+                    return
+
+                with lock:
+                    if status == 'ok':
+                        results[position] = value
+                    else:
+                        errors[position] = value
+                    finished[0] += 1
+        finally:
+            connection.close()
+
+    @staticmethod
+    def __run(connection, function, argument):
+        # :return: *(status, value)* of running the task on the worker at the other end of *connection*
+        try:
+            connection.send(('task', function, argument))
+        except (EOFError, OSError, IOError):
+            raise
+        except Exception as e:
+            # The task could not be pickled, so nothing was sent, and the connection can still be used
+            return 'error', e
+
+        return connection.recv()
+
+    def shutdown(self):
+        """ Stops every worker """
+        for address in self.addresses:
+            try:
+                connection = Client(address, authkey=self.authkey)
+                connection.send(('shutdown',))
+                connection.close()
+            except Exception:
+                pass
+
+
+class LocalCluster(object):
+    """ Worker processes on this host, started by *start_local_workers()* """
+
+    def __init__(self, processes, addresses, authkey):
+        self.processes = processes
+        self.addresses = addresses
+        self.authkey = authkey
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def pool(self):
+        """ :return: *ClusterPool* of every worker in *self* """
+        return ClusterPool(self.addresses, self.authkey)
+
+    def close(self):
+        """ Stops every worker """
+        self.pool().shutdown()
+        for process in self.processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+
+
+def start_local_workers(n, authkey=None):
+    """ Starts *n* workers listening on free ports of 127.0.0.1
+
+    :param n: number of worker processes
+    :param authkey: bytes shared with the workers; defaults to a random key
+    :return: *LocalCluster*; use it as a context manager, or call **close()**, to stop the workers
+    """
+    authkey = authkey or os.urandom(32)
+    ready = multiprocessing.Queue()
+    processes = []
+    for _ in range(n):
+        process = multiprocessing.Process(target=serve, args=(('127.0.0.1', 0), authkey, ready))
+        process.daemon = True
+        process.start()
+        processes.append(process)
+
+    addresses = [ready.get(timeout=30) for _ in processes]
+    return LocalCluster(processes, addresses, authkey)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs a pyiterable worker.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7000)
+    args = parser.parse_args()
+
+    authkey = os.environ.get('PYITERABLE_AUTHKEY')
+    if not authkey:
+        parser.error("set the shared key in the PYITERABLE_AUTHKEY environment variable")
+
+    serve((args.host, args.port), authkey.encode('utf-8'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+""" Column expressions: callables built from **col()** that can also be inspected, inlined, and vectorized
+
+>>> from pyiterable import Iterable, col
+>>> rows = Iterable([{'name': 'Ann', 'score': 90}, {'name': 'Bob', 'score': 70}])
+>>> rows.filter(col('score') > 80).map(col('name')).to_list()
+['Ann']
+
+An expression is a function of a single element. Unlike a lambda, it can be
+
+* compiled into a closure over *operator.itemgetter()*, which **Iterable** methods call instead of the expression
+* written into the source of a compiled loop; see *pyiterable.compiler*
+* evaluated over whole NumPy columns at once with **evaluate()**, if NumPy is installed
+* translated by sources that can filter or project data before reading it
+"""
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Literals whose repr() evaluates back to an equal value, so they can be written into source
+_LITERAL_TYPES = (bool, int, float, str, bytes, type(None))
+
+_INFINITIES = (float('inf'), float('-inf'))
+
+
+def _literal_source(value):
+    # NaN and infinities have no literal; their repr(), e.g. 'inf', is not a name in the generated source
+    if type(value) in _LITERAL_TYPES and not (type(value) is float and (value != value or value in _INFINITIES)):
+        return repr(value)
+    if type(value) is frozenset and value:
+        items = [_literal_source(item) for item in value]
+        if None not in items:
+            # A set display, which CPython stores as a frozenset constant when it is the right operand of 'in'
+            return '{{{}}}'.format(', '.join(sorted(items)))
+
+    return None
+
+
+def _logical_and(left, right):
+    return left and right
+
+
+def _logical_or(left, right):
+    return left or right
+
+
+def _contains(value, values):
+    return value in values
+
+
+# name: (function, source template, NumPy function or None to use *function*)
+_OPERATIONS = {
+    'lt': (operator.lt, '({} < {})', None),
+    'le': (operator.le, '({} <= {})', None),
+    'eq': (operator.eq, '({} == {})', None),
+    'ne': (operator.ne, '({} != {})', None),
+    'ge': (operator.ge, '({} >= {})', None),
+    'gt': (operator.gt, '({} > {})', None),
+    'add': (operator.add, '({} + {})', None),
+    'sub': (operator.sub, '({} - {})', None),
+    'mul': (operator.mul, '({} * {})', None),
+    'truediv': (operator.truediv, '({} / {})', None),
+    'floordiv': (operator.floordiv, '({} // {})', None),
+    'mod': (operator.mod, '({} % {})', None),
+    'pow': (operator.pow, '({} ** {})', None),
+    'and': (_logical_and, '({} and {})', 'logical_and'),
+    'or': (_logical_or, '({} or {})', 'logical_or'),
+    'not': (operator.not_, '(not {})', 'logical_not'),
+    'neg': (operator.neg, '(-{})', None),
+    'isin': (_contains, '({} in {})', 'isin'),
+}
+
+
+def col(key):
+    """ Creates an expression that gets *key* from each element, i.e. **element[** *key* **]**
+
+    :param key: column name, index, or any other key of the elements
+    :return: *Expression*
+
+    >>> (col('score') > 80)({'score': 90})
+    True
+    >>> (col(1) * 2)(('a', 21))
+    42
+    """
+    return Column(key)
+
+
+def lit(value):
+    """ Creates an expression that always returns *value*
+
+    :param value: constant
+    :return: *Expression*
+    """
+    return Literal(value)
+
+
+def _expression(value):
+    return value if isinstance(value, Expression) else Literal(value)
+
+
+class Expression(object):
+    """ Function of a single element, built with **col()** and Python operators
+
+    * Comparison and arithmetic operators build new expressions, e.g. **col('a') + col('b') > 10**
+    * Use **&**, **|**, and **~** for *and*, *or*, and *not*, as Python's keywords cannot be overloaded
+    * Expressions are callables, so they can be used anywhere a function of an element can
+    """
+    __hash__ = object.__hash__
+
+    def __init__(self):
+        self.__function = None
+
+    def __call__(self, element):
+        return self.compile()(element)
+
+    def compile(self):
+        """ :return: plain function of an element equivalent to *self*, built once from *operator.itemgetter()*
+            closures """
+        if self.__function is None:
+            self.__function = self._build()
+
+        return self.__function
+
+    def columns(self):
+        """ :return: frozenset of the keys that *self* reads from an element """
+        return frozenset()
+
+    def evaluate(self, columns):
+        """ Evaluates *self* over whole columns at once with NumPy
+
+        :param columns: mapping of every key in **columns()** to a NumPy array, or a sequence, of its values
+        :return: NumPy array with one result for each row
+
+        :raises ImportError: NumPy is not installed
+
+        >>> (col('score') > 80).evaluate({'score': numpy.array([90, 70])})
+        array([ True, False])
+        """
+        if numpy is None:
+            raise ImportError("evaluate() requires NumPy")
+
+        return self._evaluate(columns)
+
+    def source(self, element='element'):
+        """ Python source that computes *self*
+
+        :param element: name of the variable holding the element
+        :return: source string, or *None* if a constant cannot be written as a literal
+        """
+        return None
+
+    def _build(self):
+        raise NotImplementedError()
+
+    def _evaluate(self, columns):
+        raise NotImplementedError()
+
+    def _rekey(self, keys):
+        # Returns an equivalent expression that reads keys[key] from an element instead of every key
+        return self
+
+    def __operation(self, name, *others):
+        return Operation(name, (self,) + tuple(_expression(other) for other in others))
+
+    def __reflected(self, name, other):
+        return Operation(name, (_expression(other), self))
+
+    # comparisons
+    def __lt__(self, other):
+        return self.__operation('lt', other)
+
+    def __le__(self, other):
+        return self.__operation('le', other)
+
+    def __eq__(self, other):
+        return self.__operation('eq', other)
+
+    def __ne__(self, other):
+        return self.__operation('ne', other)
+
+    def __ge__(self, other):
+        return self.__operation('ge', other)
+
+    def __gt__(self, other):
+        return self.__operation('gt', other)
+
+    # arithmetic
+    def __add__(self, other):
+        return self.__operation('add', other)
+
+    def __radd__(self, other):
+        return self.__reflected('add', other)
+
+    def __sub__(self, other):
+        return self.__operation('sub', other)
+
+    def __rsub__(self, other):
+        return self.__reflected('sub', other)
+
+    def __mul__(self, other):
+        return self.__operation('mul', other)
+
+    def __rmul__(self, other):
+        return self.__reflected('mul', other)
+
+    def __truediv__(self, other):
+        return self.__operation('truediv', other)
+
+    def __rtruediv__(self, other):
+        return self.__reflected('truediv', other)
+
+    def __floordiv__(self, other):
+        return self.__operation('floordiv', other)
+
+    def __rfloordiv__(self, other):
+        return self.__reflected('floordiv', other)
+
+    def __mod__(self, other):
+        return self.__operation('mod', other)
+
+    def __rmod__(self, other):
+        return self.__reflected('mod', other)
+
+    def __pow__(self, other):
+        return self.__operation('pow', other)
+
+    def __rpow__(self, other):
+        return self.__reflected('pow', other)
+
+    def __neg__(self):
+        return self.__operation('neg')
+
+    # logical
+    def __and__(self, other):
+        return self.__operation('and', other)
+
+    def __rand__(self, other):
+        return self.__reflected('and', other)
+
+    def __or__(self, other):
+        return self.__operation('or', other)
+
+    def __ror__(self, other):
+        return self.__reflected('or', other)
+
+    def __invert__(self):
+        return self.__operation('not')
+
+    def isin(self, values):
+        """ :param values: iterable of hashable values
+            :return: *Expression* that is true for elements whose value is in *values* """
+        return Operation('isin', (self, Literal(frozenset(values))))
+
+    # string methods
+    def endswith(self, suffix):
+        """ Equivalent to **str.endswith(** *suffix* **)** """
+        return Method('endswith', self, (suffix,))
+
+    def lower(self):
+        """ Equivalent to **str.lower()** """
+        return Method('lower', self, ())
+
+    def startswith(self, prefix):
+        """ Equivalent to **str.startswith(** *prefix* **)** """
+        return Method('startswith', self, (prefix,))
+
+    def strip(self):
+        """ Equivalent to **str.strip()** """
+        return Method('strip', self, ())
+
+    def upper(self):
+        """ Equivalent to **str.upper()** """
+        return Method('upper', self, ())
+
+
+class Column(Expression):
+    """ Expression that gets **element[** *key* **]**; created by **col()** """
+
+    def __init__(self, key):
+        super(Column, self).__init__()
+        self.key = key
+
+    def __repr__(self):
+        return 'col({!r})'.format(self.key)
+
+    def columns(self):
+        return frozenset([self.key])
+
+    def source(self, element='element'):
+        key = _literal_source(self.key)
+        return None if key is None else '{}[{}]'.format(element, key)
+
+    def _build(self):
+        return operator.itemgetter(self.key)
+
+    def _evaluate(self, columns):
+        return numpy.asarray(columns[self.key])
+
+    def _rekey(self, keys):
+        return Column(keys[self.key])
+
+
+class Literal(Expression):
+    """ Expression that always returns *value*; created by **lit()**, or from constants used with operators """
+
+    def __init__(self, value):
+        super(Literal, self).__init__()
+        self.value = value
+
+    def __repr__(self):
+        return 'lit({!r})'.format(self.value)
+
+    def source(self, element='element'):
+        return _literal_source(self.value)
+
+    def _build(self):
+        value = self.value
+        return lambda element: value
+
+    def _evaluate(self, columns):
+        return self.value
+
+
+class Operation(Expression):
+    """ Operator applied to the results of the *operands* expressions """
+
+    def __init__(self, name, operands):
+        super(Operation, self).__init__()
+        self.name = name
+        self.operands = tuple(operands)
+
+    def __repr__(self):
+        return '{}({})'.format(self.name, ', '.join(map(repr, self.operands)))
+
+    def columns(self):
+        return frozenset().union(*[operand.columns() for operand in self.operands])
+
+    def source(self, element='element'):
+        operands = [operand.source(element) for operand in self.operands]
+        if None in operands:
+            return None
+
+        return _OPERATIONS[self.name][1].format(*operands)
+
+    def _build(self):
+        function = _OPERATIONS[self.name][0]
+        if self.name in ('and', 'or'):
+            # Short-circuits, like the generated source
+            left, right = [operand.compile() for operand in self.operands]
+            if self.name == 'and':
+                return lambda element: left(element) and right(element)
+            return lambda element: left(element) or right(element)
+
+        if len(self.operands) == 1:
+            operand = self.operands[0].compile()
+            return lambda element: function(operand(element))
+
+        left, right = self.operands
+        # Constants are bound directly, rather than called through a Literal closure for every element
+        if isinstance(right, Literal):
+            left, value = left.compile(), right.value
+            return lambda element: function(left(element), value)
+        if isinstance(left, Literal):
+            value, right = left.value, right.compile()
+            return lambda element: function(value, right(element))
+
+        left, right = left.compile(), right.compile()
+        return lambda element: function(left(element), right(element))
+
+    def _evaluate(self, columns):
+        function, _, numpy_name = _OPERATIONS[self.name]
+        operands = [operand._evaluate(columns) for operand in self.operands]
+        if numpy_name == 'isin':
+            return numpy.isin(operands[0], list(operands[1]))
+        if numpy_name is not None:
+            function = getattr(numpy, numpy_name)
+
+        return function(*operands)
+
+    def _rekey(self, keys):
+        return Operation(self.name, [operand._rekey(keys) for operand in self.operands])
+
+
+class Method(Expression):
+    """ String method called on the result of the *target* expression """
+
+    def __init__(self, name, target, args):
+        super(Method, self).__init__()
+        self.name = name
+        self.target = target
+        self.args = tuple(args)
+
+    def __repr__(self):
+        return '{!r}.{}({})'.format(self.target, self.name, ', '.join(map(repr, self.args)))
+
+    def columns(self):
+        return self.target.columns()
+
+    def source(self, element='element'):
+        target = self.target.source(element)
+        args = [_literal_source(arg) for arg in self.args]
+        if target is None or None in args:
+            return None
+
+        return '{}.{}({})'.format(target, self.name, ', '.join(args))
+
+    def _build(self):
+        target, method = self.target.compile(), operator.methodcaller(self.name, *self.args)
+        return lambda element: method(target(element))
+
+    def _evaluate(self, columns):
+        # NumPy's equivalents of str methods are in numpy.char
+        return getattr(numpy.char, self.name)(self.target._evaluate(columns), *self.args)
+
+    def _rekey(self, keys):
+        return Method(self.name, self.target._rekey(keys), self.args)
@@ -1,19 +1,826 @@
 from functools import reduce
+import heapq
 import itertools
+import random
+import threading
 import warnings
 
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2.x
+    from collections import Sequence
 
-class Iterable:
+try:
+    import queue
+except ImportError:  # Python 2.x
+    import Queue as queue
 
-    def __init__(self, iterable):
-        iter(iterable)
-        self.__iterable = list(iterable)
+from pyiterable.expressions import Expression
+from pyiterable.sketches import reservoir_sample, TDigest, weighted_reservoir_sample
+
+
+class _LazyBacking(object):
+    """ Re-iterable backing for *Iterable* that is not a sequence; flattened into a list only when random access is
+    needed """
+    __slots__ = ()
+
+    # True if every iteration reads the source again, so a flattened copy must not replace the backing
+    replays = False
+
+
+class _Deferred(_LazyBacking):
+    """ Lazily evaluated backing; every iteration calls **factory(** *\*args* **)** again """
+    __slots__ = ('__factory', '__args', '__kwargs')
+    replays = True
+
+    def __init__(self, factory, *args, **kwargs):
+        self.__factory = factory
+        self.__args = args
+        self.__kwargs = kwargs
+
+    def __iter__(self):
+        return iter(self.__factory(*self.__args, **self.__kwargs))
+
+
+class _Pushdown(_LazyBacking):
+    """ Lazily read source that can run some operations itself while it reads, e.g. evaluate filters during a file
+    scan or in a database query
+
+    Transformations return a new source, or *None* if the source cannot run them; aggregates return their value, or
+    *NotImplemented* if the source cannot compute it. *expression* and *key* arguments are column expressions. """
+    __slots__ = ()
+    replays = True
+
+    def distinct(self):
+        return None
+
+    def filter(self, expression):
+        return None
+
+    def map(self, expression):
+        return None
+
+    def skip(self, count):
+        return None
+
+    def sorted(self, key, reverse):
+        return None
+
+    def take(self, count):
+        return None
+
+    def len(self):
+        return NotImplemented
+
+    def max(self, key):
+        return NotImplemented
+
+    def min(self, key):
+        return NotImplemented
+
+    def sum(self, start):
+        return NotImplemented
+
+
+class _Rope(_LazyBacking):
+    """ Concatenation of two backings, linked in O(1) without copying either side """
+    __slots__ = ('__left', '__right', '__replays')
+
+    def __init__(self, left, right):
+        self.__left = left
+        self.__right = right
+        self.__replays = _replays(left) or _replays(right)
+
+    @property
+    def replays(self):
+        return self.__replays
+
+    def __iter__(self):
+        # Walks the leaves with an explicit stack, as repeated concatenation builds very deep ropes
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, _Rope):
+                stack.append(node.__right)
+                stack.append(node.__left)
+            else:
+                for value in node:
+                    yield value
+
+
+class _HashIndex(object):
+    """ Maps keys to the elements that have them; keys that cannot be hashed fall back to a linear scan """
+    __slots__ = ('__buckets', '__unhashable')
+
+    def __init__(self, pairs):
+        self.__buckets = {}
+        self.__unhashable = []
+        for key, value in pairs:
+            try:
+                self.__buckets.setdefault(key, []).append(value)
+            except TypeError:
+                self.__unhashable.append((key, value))
+
+    def contains(self, key):
+        try:
+            if key in self.__buckets:
+                return True
+        except TypeError:
+            pass
+
+        return any(key == other for other, _ in self.__unhashable)
+
+    def get(self, key):
+        try:
+            values = self.__buckets.get(key, [])
+        except TypeError:
+            values = []
+
+        return values + [value for other, value in self.__unhashable if key == other]
+
+
+class _SliceView(Sequence):
+    """ Read-only view of **sequence[** *start:stop* **]**, created without copying """
+    __slots__ = ('__sequence', '__start', '__stop')
+
+    def __init__(self, sequence, start, stop):
+        self.__sequence = sequence
+        self.__start = start
+        self.__stop = max(start, stop)
+
+    def __len__(self):
+        return self.__stop - self.__start
+
+    def __getitem__(self, index):
+        positions = range(self.__start, self.__stop)[index]
+        if isinstance(index, slice):
+            if positions.step == 1:
+                return _SliceView(self.__sequence, positions.start, positions.stop)
+
+            return [self.__sequence[i] for i in positions]
+
+        return self.__sequence[positions]
+
+    def __iter__(self):
+        return itertools.islice(self.__sequence, self.__start, self.__stop)
+
+
+def _bisect(sequence, value, key=None, reverse=False, right=False):
+    """ Finds the first position in *sequence*, sorted by *key* in the direction given by *reverse*, whose key is not
+    ordered before *value*; or, if *right*, whose key is ordered after *value* """
+    lo, hi = 0, len(sequence)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        other = sequence[mid] if key is None else key(sequence[mid])
+        if right:
+            go_right = not (value > other if reverse else value < other)
+        else:
+            go_right = other > value if reverse else other < value
+
+        if go_right:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return lo
+
+
+_missing = object()
+
+
+def _sorted_last(iterable, key=None):
+    # Returns (True, the first of the equal elements at the end of sorted *iterable*), reading it once; or
+    # (False, None) if it is empty
+    iterator = iter(iterable)
+    candidate = next(iterator, _missing)
+    if candidate is _missing:
+        return False, None
+
+    candidate_key = candidate if key is None else key(candidate)
+    for value in iterator:
+        value_key = value if key is None else key(value)
+        if value_key != candidate_key:
+            candidate, candidate_key = value, value_key
+
+    return True, candidate
+
+
+def _sorted_contains(iterable, value, reverse=False):
+    # Reads *iterable*, sorted in the direction given by *reverse*, only until the elements are ordered after *value*
+    for element in iterable:
+        if element == value:
+            return True
+        if element < value if reverse else element > value:
+            return False
+
+    return False
+
+
+def _range_between(iterable, lo, hi, key, reverse):
+    # Equivalent to slicing sorted *iterable* between the _bisect() positions of *lo* and *hi*, read lazily
+    for element in iterable:
+        element_key = element if key is None else key(element)
+        if element_key > lo if reverse else element_key < lo:
+            continue
+        if element_key < hi if reverse else element_key > hi:
+            return
+
+        yield element
+
+
+def _dedupe_adjacent(iterable):
+    missing = previous = object()
+    for value in iterable:
+        if previous is missing or value != previous:
+            previous = value
+            yield value
+
+
+def _identity(value):
+    return value
+
+
+def _ordered_before(reverse):
+    if reverse:
+        return lambda a, b: b < a
+
+    return lambda a, b: a < b
+
+
+class _Descending(object):
+    # Key that orders larger keys first, for merging inputs sorted in reverse
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+def _decorate(iterable, index, key, reverse):
+    for position, value in enumerate(iterable):
+        order = key(value) if key is not None else value
+        yield (_Descending(order) if reverse else order), index, position, value
+
+
+def _merge(iterables, key=None, reverse=False):
+    """ Equivalent to **heapq.merge(** *\*iterables, key=key, reverse=reverse* **)**, which needs Python 3.5 for
+    *key* and *reverse*; equal elements come from earlier *iterables* first """
+    if key is None and not reverse:
+        return heapq.merge(*iterables)
+
+    # The input index and position break ties, so elements themselves are never compared
+    decorated = [_decorate(iterable, index, key, reverse) for index, iterable in enumerate(iterables)]
+    return (value for _, _, _, value in heapq.merge(*decorated))
+
+
+def _merge_difference(left, right, reverse):
+    before = _ordered_before(reverse)
+    missing = previous = object()
+    right = iter(right)
+    other = next(right, missing)
+    for value in left:
+        while other is not missing and before(other, value):
+            other = next(right, missing)
+
+        if (other is missing or before(value, other)) and (previous is missing or value != previous):
+            previous = value
+            yield value
+
+
+def _merge_intersection(left, right, reverse):
+    before = _ordered_before(reverse)
+    missing = previous = object()
+    right = iter(right)
+    other = next(right, missing)
+    for value in left:
+        while other is not missing and before(other, value):
+            other = next(right, missing)
+
+        if other is missing:
+            return
+
+        if not before(value, other) and (previous is missing or value != previous):
+            previous = value
+            yield value
+
+
+def _merge_join(left, right, key, other_key, reverse):
+    # Buffers only the run of elements in *right* that share the current key
+    before = _ordered_before(reverse)
+    missing = run_key = object()
+    run = []
+    right = iter(right)
+    other = next(right, missing)
+    for value in left:
+        value_key = key(value)
+        if run_key is missing or value_key != run_key:
+            while other is not missing and before(other_key(other), value_key):
+                other = next(right, missing)
+
+            run = []
+            run_key = value_key
+            while other is not missing and not before(value_key, other_key(other)):
+                run.append(other)
+                other = next(right, missing)
+
+        for match in run:
+            yield value, match
+
+
+def _hash_join(left, buckets, key):
+    for value in left:
+        for match in buckets.get(key(value), ()):
+            yield value, match
+
+
+def _put_unless_stopped(buffer, item, stop):
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+
+    return False
+
+
+def _produce(iterable, buffer, stop, done):
+    iterator = iter(iterable)
+    try:
+        for value in iterator:
+            if not _put_unless_stopped(buffer, (True, value), stop):
+                return
+
+        _put_unless_stopped(buffer, (True, done), stop)
+    except Exception as e:
+        _put_unless_stopped(buffer, (False, e), stop)
+    finally:
+        # Release upstream resources, e.g. open files of a generator, from the thread that uses them
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+def _prefetch(iterable, size):
+    buffer = queue.Queue(size)
+    stop = threading.Event()
+    done = object()
+    producer = threading.Thread(target=_produce, args=(iterable, buffer, stop, done))
+    producer.daemon = True
+    producer.start()
+    try:
+        while True:
+            is_value, value = buffer.get()
+            if not is_value:
+                raise value
+            if value is done:
+                return
+
+            yield value
+    finally:
+        # Stops the producer if the consumer stopped early
+        stop.set()
+
+
+# Elements passed to a broadcast() branch at a time
+_BROADCAST_BATCH_SIZE = 256
+
+
+class _Branch(_LazyBacking):
+    """ Elements broadcast to one branch of **Iterable.broadcast()**, read from a bounded buffer; can only be
+    iterated once """
+    __slots__ = ('buffer', 'stop', '__iterated')
+
+    def __init__(self, size):
+        self.buffer = queue.Queue(size)
+        # Set once the branch has returned, so nothing more is passed to it
+        self.stop = threading.Event()
+        self.__iterated = False
+
+    def __iter__(self):
+        if self.__iterated:
+            raise ValueError("a broadcast() branch can only iterate its elements once")
+
+        self.__iterated = True
+        return self.__read()
+
+    def __read(self):
+        while True:
+            try:
+                batch = self.buffer.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop.is_set():
+                    # Nothing more will be passed to a branch that has returned
+                    raise ValueError("a broadcast() branch must read its elements before it returns")
+                continue
+
+            if batch is None:
+                return
+
+            for value in batch:
+                yield value
+
+
+def _run_branch(branch, backing, results, index):
+    try:
+        result = branch(Iterable.wrap(backing))
+        if isinstance(result, Iterable):
+            # A lazily evaluated result, e.g. of distinct(), is read now, while elements are still passed to it
+            result = Iterable.wrap(result.to_list())
+        results[index] = (True, result)
+    except Exception as e:
+        results[index] = (False, e)
+    finally:
+        backing.stop.set()
+
+
+def _broadcast(iterable, branches, buffer_size):
+    batch_size = min(buffer_size, _BROADCAST_BATCH_SIZE)
+    backings = [_Branch(max(1, buffer_size // batch_size)) for _ in branches]
+    results = [None] * len(branches)
+    threads = [threading.Thread(target=_run_branch, args=(branch, backing, results, i))
+               for i, (branch, backing) in enumerate(zip(branches, backings))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        iterator = iter(iterable)
+        while True:
+            batch = list(itertools.islice(iterator, batch_size))
+            if not batch:
+                break
+
+            # A full buffer blocks until its branch catches up, so the fastest branch is at most *buffer_size*
+            # elements ahead of the slowest
+            running = [backing for backing in backings if not backing.stop.is_set()]
+            if not running:
+                break
+            for backing in running:
+                _put_unless_stopped(backing.buffer, batch, backing.stop)
+    finally:
+        for backing in backings:
+            _put_unless_stopped(backing.buffer, None, backing.stop)
+        for thread in threads:
+            thread.join()
+
+    for succeeded, result in results:
+        if not succeeded:
+            raise result
+
+    return tuple(result for _, result in results)
+
+
+def _compiled(function):
+    # Expressions are called through their compiled closure, skipping Expression.__call__ for every element
+    return function.compile() if isinstance(function, Expression) else function
+
+
+def _memoized(function, memoize, maxsize, cache, materialize=False):
+    if not memoize and maxsize is None and cache is None:
+        return function
+
+    from pyiterable.caching import memoized
+    return memoized(function, memoize, maxsize, cache, materialize)
+
+
+def _replays(iterable):
+    # Whether *iterable* reads its source again on every iteration, so it is streamed rather than flattened
+    return getattr(iterable, 'replays', False)
+
+
+def _has_len(iterable):
+    return hasattr(iterable, '__len__')
+
+
+def _is_sequence(iterable):
+    return isinstance(iterable, Sequence)
+
+
+def _budget():
+    # Innermost active memory budget, or None; pyiterable.memory imports this module, so it is imported lazily
+    from pyiterable.memory import active
+    return active()
+
+
+def _distinct(iterable, excluded=frozenset()):
+    seen = set()
+    for value in iterable:
+        if value not in seen and value not in excluded:
+            seen.add(value)
+            yield value
+
+
+def _distinct_in(iterable, included):
+    seen = set()
+    for value in iterable:
+        if value in included and value not in seen:
+            seen.add(value)
+            yield value
+
+
+def _symmetric_difference(left, right, right_set):
+    seen = set()
+    for value in left:
+        if value not in seen:
+            seen.add(value)
+            if value not in right_set:
+                yield value
+
+    for value in right:
+        if value not in seen:
+            yield value
+
+
+def _union(left, right):
+    seen = set()
+    for value in itertools.chain(left, right):
+        if value not in seen:
+            seen.add(value)
+            yield value
+
+
+class Iterable(object):
+    __slots__ = ('__iterable', '__value_index', '__key_index', '__order')
+
+    def __init__(self, iterable, copy=True):
+        if isinstance(iterable, Iterable):
+            iterable = iterable.__iterable if not copy else iterable
+        elif not isinstance(iterable, _LazyBacking) and iter(iterable) is iterable:
+            # One-shot iterators cannot be iterated again, so they are always copied
+            copy = True
+
+        self.__iterable = list(iterable) if copy else iterable
+        self.__value_index = None
+        self.__key_index = None
+        self.__order = None
 
     def __iter__(self):
         return iter(self.__iterable)
 
+    @classmethod
+    def defer(cls, function, *args, **kwargs):
+        """ Creates a lazily evaluated *Iterable*; every iteration of it calls **function(** *\*args, \*\*kwargs* **)** for
+        the elements
+
+        * Use this for slow or large sources, e.g. file readers or database cursors, so they are streamed rather than
+          copied into memory up front
+
+        :param function: function that returns a new iterable, e.g. a generator function
+        :param args: positional arguments for *function*
+        :param kwargs: keyword arguments for *function*
+        :return: *Iterable*
+
+        >>> def read_lines(path):
+        ...     with open(path) as f:
+        ...         for line in f:
+        ...             yield line.rstrip('\\n')
+        >>> lines = Iterable.defer(read_lines, 'access.log')
+        """
+        return cls(_Deferred(function, *args, **kwargs), copy=False)
+
+    @classmethod
+    def from_arrow(cls, data):
+        """ Lazily reads the rows of Arrow data as dicts, one record batch at a time; requires pyarrow
+
+        * **filter()** calls with column expressions, and **map()** calls with a single **col()**, run in Arrow over
+          whole batches
+        * **to_arrow()**, **to_ipc()**, and **to_parquet()** pass the batches through, without converting them to
+          Python objects, unless other operations have been applied
+        * A *RecordBatchReader* is read once, as it is iterated; its batches are kept so *self* can be iterated again
+
+        :param data: *pyarrow.Table*, *pyarrow.RecordBatch*, or *pyarrow.RecordBatchReader*
+        :return: *Iterable* of dicts
+
+        :raises ImportError: pyarrow is not installed
+        :raises TypeError: *data* is not Arrow data
+
+        >>> import pyarrow
+        >>> from pyiterable import col
+        >>> table = pyarrow.table({'name': ['Alice', 'Bob'], 'score': [94, 65]})
+        >>> Iterable.from_arrow(table).map(col('name')).to_list()
+        ['Alice', 'Bob']
+        """
+        from pyiterable.arrow import source
+        return cls(source(data), copy=False)
+
+    @classmethod
+    def from_csv(cls, path, columns=None, types=None, encoding='utf-8', **kwargs):
+        """ Lazily reads the rows of a CSV file with a header row as dicts, like *csv.DictReader*
+
+        * Only the *columns* requested are converted and put in the dicts
+        * **filter()** calls with a column expression, e.g. **col('score') > 80**, over those columns are evaluated
+          while the file is scanned, so rows that are filtered out never become dicts
+        * The file is read through a large buffer, and parsed in chunks of rows; it is read again on every iteration
+
+        :param path: path of the CSV file
+        :param columns: names of the columns to read; defaults to every column
+        :param types: dict of column name to a function that converts its text, e.g. *int*; the
+            values missing from short rows are *None*, and not converted
+        :param encoding: text encoding of the file
+        :param kwargs: keyword-only; formatting parameters of **csv.reader()**, e.g. *delimiter*
+        :return: *Iterable* of dicts
+
+        :raises ValueError: a column in *columns* is not in the header of the file; raised when iterated
+
+        >>> from pyiterable import col
+        >>> scores = Iterable.from_csv('scores.csv', columns=['name', 'score'], types={'score': int})
+        >>> scores.filter(col('score') > 80).map(col('name')).to_list()
+        ['Alice', 'Charlie']
+        """
+        from pyiterable.sources import CsvSource
+        return cls(CsvSource(path, columns, types, encoding, kwargs), copy=False)
+
+    @classmethod
+    def from_ipc(cls, path):
+        """ Lazily reads the rows of an Arrow IPC (Feather v2) file as dicts; see **from_arrow()**
+
+        The file is memory-mapped, so record batches are read without copying them.
+
+        :param path: path of the Arrow IPC file
+        :return: *Iterable* of dicts
+
+        :raises ImportError: pyarrow is not installed
+        """
+        from pyiterable.arrow import ipc_source
+        return cls(ipc_source(path), copy=False)
+
+    @classmethod
+    def from_jsonl(cls, path, fields=None, encoding='utf-8'):
+        """ Lazily reads a JSON Lines file, i.e. a JSON object on every line, as dicts
+
+        * Only the *fields* requested are put in the dicts; missing fields are *None*
+        * **filter()** calls with a column expression over those fields are evaluated while the file is scanned.
+          Lines that cannot contain a string compared with **==** in the expression are skipped without being decoded
+        * The file is read through a large buffer, and parsed in chunks of lines; it is read again on every iteration
+
+        :param path: path of the JSON Lines file
+        :param fields: names of the fields to read; defaults to every field
+        :param encoding: text encoding of the file
+        :return: *Iterable* of dicts
+
+        >>> from pyiterable import col
+        >>> errors = Iterable.from_jsonl('events.jsonl', fields=['time', 'level']).filter(col('level') == 'error')
+        """
+        from pyiterable.sources import JsonLinesSource
+        return cls(JsonLinesSource(path, fields, encoding), copy=False)
+
+    @classmethod
+    def from_parquet(cls, path, columns=None):
+        """ Lazily reads the rows of a Parquet file as dicts, one record batch at a time; see **from_arrow()**
+
+        :param path: path of the Parquet file
+        :param columns: names of the columns to read; other columns are not decoded
+        :return: *Iterable* of dicts
+
+        :raises ImportError: pyarrow is not installed
+        """
+        from pyiterable.arrow import parquet_source
+        return cls(parquet_source(path, columns), copy=False)
+
+    @classmethod
+    def from_sqlite(cls, connection, table=None, query=None, parameters=(), batch_size=1000):
+        """ Lazily reads the rows of a SQLite table or query as dicts of column name to value
+
+        * **filter()**, **sorted()**, and **map()** calls with column expressions, **take()**, **skip()**, and
+          **distinct()** are translated into the SQL that is run, so the database can use its indexes for them
+        * **len()**, **min()** and **max()** with a column expression key, and **sum()** of mapped values, are computed
+          by the database
+        * Expressions without an equivalent in SQLite run in Python on the rows instead, as usual
+        * Rows are fetched in batches of *batch_size*, and the query is run again on every iteration
+
+        Unlike in Python, rows that sort equally, or equal **min()** and **max()** candidates, are returned in the
+        order the database finds them.
+
+        :param connection: *sqlite3.Connection*
+        :param table: name of the table to read; exclusive with *query*
+        :param query: SELECT statement to read the rows of
+        :param parameters: parameters of *query*
+        :param batch_size: number of rows fetched from the cursor at a time
+        :return: *Iterable* of dicts
+
+        :raises ValueError: not exactly one of *table* and *query* is given
+
+        >>> import sqlite3
+        >>> from pyiterable import col
+        >>> connection = sqlite3.connect('scores.db')
+        >>> scores = Iterable.from_sqlite(connection, table='scores')
+        >>> scores.filter(col('score') > 80).sorted(key=col('score'), reverse=True).take(1).to_list()
+        [{'name': 'Alice', 'score': 94}]
+        """
+        if (table is None) == (query is None):
+            raise ValueError("exactly one of 'table' and 'query' must be provided")
+
+        from pyiterable.sources import _quote, SqliteSource
+        if table is not None:
+            query = 'SELECT * FROM {}'.format(_quote(table))
+
+        return cls(SqliteSource(connection, query, parameters, batch_size), copy=False)
+
+    @classmethod
+    def wrap(cls, iterable):
+        """ Equivalent to calling **Iterable(** *iterable, copy=False* **)**
+
+        * *iterable* is stored as-is instead of being copied, so wrapping a large sequence is O(1)
+        * *iterable* must not be mutated afterwards, as the *Iterable* would change with it
+        * One-shot iterators (e.g. generators) are still copied, as they cannot be iterated more than once
+
+        :param iterable: iterable to store; should be a sequence or another re-iterable collection
+        :return: *Iterable* backed by *iterable*
+
+        >>> values = list(range(10000000))
+        >>> Iterable.wrap(values).take(3).to_list()
+        [0, 1, 2]
+        """
+        return cls(iterable, copy=False)
+
+    def __pushed(self, operation, *args):
+        # Runs *operation* in the source that *self* reads from, if it supports it
+        if not isinstance(self.__iterable, _Pushdown):
+            return None
+
+        source = getattr(self.__iterable, operation)(*args)
+        return None if source is None else Iterable.wrap(source)
+
+    def __pushed_value(self, operation, *args):
+        # Computes the aggregate *operation* in the source that *self* reads from, if it supports it
+        if not isinstance(self.__iterable, _Pushdown):
+            return NotImplemented
+
+        return getattr(self.__iterable, operation)(*args)
+
+    def __keep_order(self, derived, reverse=False):
+        # *derived* holds a subsequence of *self*, so it is still sorted the same way (or, if *reverse*, the opposite way)
+        if self.__order is not None:
+            key, is_reversed = self.__order
+            derived.__order = (key, is_reversed != reverse)
+
+        return derived
+
+    def __sorted_endpoint(self, kwargs, largest):
+        # Returns (True, value) if *self* is known to be sorted by kwargs['key'], so min()/max() need not scan it
+        if self.__order is None or not set(kwargs).issubset(('key', 'default')):
+            return False, None
+
+        key, is_reversed = self.__order
+        if kwargs.get('key') is not key:
+            return False, None
+
+        if _replays(self.__iterable):
+            if largest == is_reversed:
+                first = next(iter(self.__iterable), _missing)
+                return first is not _missing, None if first is _missing else first
+
+            return _sorted_last(self.__iterable, key)
+
+        sequence = self.__sequence()
+        if not sequence:
+            return False, None
+
+        if largest == is_reversed:
+            return True, sequence[0]
+
+        # Like the built-ins, return the first of several equal endpoints
+        last = sequence[-1] if key is None else key(sequence[-1])
+        return True, sequence[_bisect(sequence, last, key, is_reversed)]
+
+    def __is_sorted_like(self, other, key=None, other_key=None):
+        # Whether *self* and *other* are both known to be sorted by the given keys, in the same direction
+        return (isinstance(other, Iterable) and self.__order is not None and other.__order is not None and
+                self.__order[0] is key and other.__order[0] is other_key and self.__order[1] == other.__order[1])
+
+    def __share_value_index(self, derived):
+        # *derived* holds exactly the same distinct elements as *self*, so a value index built for *self* still holds
+        derived.__value_index = self.__value_index
+        return derived
+
+    def __sequence(self):
+        # Lazy backings are flattened into a list when random access is needed; once, unless they read their source
+        # again on every iteration
+        if _is_sequence(self.__iterable):
+            return self.__iterable
+
+        sequence = list(self.__iterable)
+        if not getattr(self.__iterable, 'replays', False):
+            self.__iterable = sequence
+
+        return sequence
+
     def __len__(self):
-        return len(list(self.__iterable))
+        count = self.__pushed_value('len')
+        if count is not NotImplemented:
+            return count
+
+        if _has_len(self.__iterable):
+            return len(self.__iterable)
+
+        # Counts without copying elements into a list
+        return sum(1 for _ in self.__iterable)
 
     # built-in equivalent data structures
     def to_frozenset(self):
@@ -107,17 +914,27 @@ class Iterable:
         """
         return Iterable(enumerate(self.__iterable, start))
 
-    def filter(self, function):
+    def filter(self, function, memoize=False, maxsize=None, cache=None):
         """ Equivalent to the built-in function **filter(** *function, iterable* **)**
 
         :param function: function that returns **False** for items to exclude
+        :param memoize: if True, results are cached by element, so *function* is called once for each
+            distinct element; see *pyiterable.caching.Cache*
+        :param maxsize: memoizes, keeping at most *maxsize* results, least recently used first out
+        :param cache: *Cache*, or name of a cache registered with **named_cache()**, to memoize with;
+            shared by every call that uses it
         :return: *Iterable* object that only contains items filtered by *function*
 
         >>> grades = Iterable(['a', 'b', 'c', 'd', 'f'])
         >>> grades.enumerate().filter(lambda i_x: i_x[0] < 3).to_list()
         [(0, 'a'), (1, 'b'), (2, 'c')]
         """
-        return Iterable(filter(function, self.__iterable))
+        pushed = self.__pushed('filter', function) if isinstance(function, Expression) else None
+        if pushed is not None:
+            return self.__keep_order(pushed)
+
+        function = _memoized(_compiled(function), memoize, maxsize, cache)
+        return self.__keep_order(Iterable(filter(function, self.__iterable)))
 
     def len(self):
         """ Equivalent to the built-in function **len(** *s* **)**
@@ -130,17 +947,27 @@ class Iterable:
         """
         return self.__len__()
 
-    def map(self, function):
+    def map(self, function, memoize=False, maxsize=None, cache=None):
         """ Equivalent to the built-in function **map(** *function, iterable* **)**
 
         :param function: function applied to every item in *self*
+        :param memoize: if True, results are cached by element, so *function* is called once for each
+            distinct element; see *pyiterable.caching.Cache*
+        :param maxsize: memoizes, keeping at most *maxsize* results, least recently used first out
+        :param cache: *Cache*, or name of a cache registered with **named_cache()**, to memoize with;
+            shared by every call that uses it
         :return: *Iterable* of results
 
         >>> numbers = Iterable([1, 3, 10, 4, 8])
         >>> numbers.map(lambda x: x * 2).to_list()
         [2, 6, 20, 8, 16]
+        >>> addresses.map(geocode, maxsize=10000).to_list()
         """
-        return Iterable(map(function, self.__iterable))
+        pushed = self.__pushed('map', function) if isinstance(function, Expression) else None
+        if pushed is not None:
+            return pushed
+
+        return Iterable(map(_memoized(_compiled(function), memoize, maxsize, cache), self.__iterable))
 
     def max(self, **kwargs):
         """ Equivalent to the built-in function **max(** *iterable, \*[, key, default]* **)**
@@ -153,6 +980,16 @@ class Iterable:
         >>> grades.max(key=lambda x: x[1])
         ('Alice', 94)
         """
+        is_sorted, value = self.__sorted_endpoint(kwargs, largest=True)
+        if is_sorted:
+            return value
+
+        key = kwargs.get('key')
+        if (key is None or isinstance(key, Expression)) and set(kwargs).issubset(('key', 'default')):
+            value = self.__pushed_value('max', key)
+            if value is not NotImplemented:
+                return value
+
         return max(self.__iterable, **kwargs)
 
     def min(self, **kwargs):
@@ -166,6 +1003,16 @@ class Iterable:
         >>> grades.min(key=lambda x: x[1])
         ('Bob', 65)
         """
+        is_sorted, value = self.__sorted_endpoint(kwargs, largest=False)
+        if is_sorted:
+            return value
+
+        key = kwargs.get('key')
+        if (key is None or isinstance(key, Expression)) and set(kwargs).issubset(('key', 'default')):
+            value = self.__pushed_value('min', key)
+            if value is not NotImplemented:
+                return value
+
         return min(self.__iterable, **kwargs)
 
     def reversed(self):
@@ -177,7 +1024,7 @@ class Iterable:
         >>> names.reversed().to_list()
         ['Charlie', 'Daniel', 'Alice', 'Bob']
         """
-        return Iterable(reversed(self.__iterable))
+        return self.__keep_order(self.__share_value_index(Iterable.wrap(self.__sequence()[::-1])), reverse=True)
 
     def sorted(self, **kwargs):
         """ Equivalent to the built-in function **sorted(** *iterable[, cmp[, key[, reverse]]]* **)**
@@ -195,7 +1042,25 @@ class Iterable:
         >>> grades.sorted(key=lambda x: x[1], reverse=True).to_list()
         [('Alice', 94), ('Charlie', 79), ('Bob', 65)]
         """
-        return Iterable(sorted(self.__iterable, **kwargs))
+        key = kwargs.get('key')
+        result = None
+        if (key is None or isinstance(key, Expression)) and set(kwargs).issubset(('key', 'reverse')):
+            result = self.__pushed('sorted', key, bool(kwargs.get('reverse', False)))
+
+        if result is None:
+            if key is not None:
+                kwargs['key'] = _compiled(key)
+            budget = _budget()
+            if budget is not None and 'cmp' not in kwargs:
+                from pyiterable.memory import sorted_within
+                ordered = sorted_within(self.__iterable, budget, kwargs.get('key'), bool(kwargs.get('reverse', False)))
+            else:
+                ordered = sorted(self.__iterable, **kwargs)
+            result = self.__share_value_index(Iterable.wrap(ordered))
+        if 'cmp' not in kwargs:
+            result.__order = (key, bool(kwargs.get('reverse', False)))
+
+        return result
 
     def sum(self, start=0):
         """ Equivalent to the built-in function **sum(** *iterable[, start]* **)**
@@ -209,6 +1074,10 @@ class Iterable:
         >>> numbers.sum(10)
         36
         """
+        total = self.__pushed_value('sum', start)
+        if total is not NotImplemented:
+            return total
+
         return sum(self.__iterable, start)
 
     def zip(self, *args):
@@ -248,6 +1117,56 @@ class Iterable:
             return reduce(function, self.__iterable, initializer)
 
     # custom transformations / functions
+    def as_sorted(self, key=None, reverse=False):
+        """ Marks *self* as already sorted, as if by **sorted(** *key=key, reverse=reverse* **)**, without sorting it
+
+        * Use this for inputs that arrive pre-sorted, so sorted fast paths (e.g. in **join()**, **merge()**, and set-like
+          functions) can be used
+        * *self* is not checked; results are undefined if *self* is not actually sorted
+
+        :param key: function that returns the value *self* is sorted by
+        :param reverse: boolean; if True, *self* is sorted with the largest value first
+        :return: *Iterable* with the same elements as *self*
+
+        >>> logs = Iterable([(1, 'GET'), (4, 'PUT'), (9, 'GET')]).as_sorted(key=lambda x: x[0])
+        >>> logs.range_between(2, 9).to_list()
+        [(4, 'PUT'), (9, 'GET')]
+        """
+        result = Iterable.wrap(self)
+        result.__order = (key, bool(reverse))
+        return result
+
+    def broadcast(self, *branches, **kwargs):
+        """ Passes every element of *self* to several branches in a single pass, instead of one pass for each
+
+        * Each branch is a function that takes an *Iterable* and returns a result, e.g. **lambda x: x.sum()**; its
+          *Iterable* can only be iterated once, and only until the branch returns. An *Iterable* returned by a branch
+          is read before **broadcast()** returns; other lazily evaluated results raise *ValueError* when read
+        * Branches run on their own threads; elements are read from *self* once, on the calling thread, and buffered
+          for each branch, so the fastest branch reads at most *buffer_size* elements ahead of the slowest
+        * A branch that returns early, e.g. with **first()**, is passed no more elements
+        * The first exception raised by a branch is re-raised once every branch has finished
+
+        :param branches: functions of an *Iterable*
+        :param buffer_size: keyword-only; maximum number of elements buffered for each branch; default is 1024
+        :return: tuple of the results of *branches*, in the same order
+
+        :raises ValueError: *buffer_size* is less than 1
+
+        >>> orders = Iterable.defer(read_orders)
+        >>> count, revenue, customers = orders.broadcast(
+        ...     lambda x: x.len(),
+        ...     lambda x: x.map(col('price')).sum(),
+        ...     lambda x: x.map(col('customer')).to_set())
+        """
+        buffer_size = kwargs.pop('buffer_size', 1024)
+        if kwargs:
+            raise TypeError("unexpected keyword arguments: {}".format(', '.join(sorted(kwargs))))
+        if buffer_size < 1:
+            raise ValueError("'buffer_size' must be greater than 0")
+
+        return _broadcast(self.__iterable, branches, buffer_size)
+
     def contains(self, value):
         """ Equivalent to calling **value in** *iterable*
 
@@ -260,9 +1179,112 @@ class Iterable:
         >>> values.contains(4)
         False
         """
+        if self.__value_index is not None:
+            return self.__value_index.contains(value)
+
+        if self.__order is not None and self.__order[0] is None and _replays(self.__iterable):
+            try:
+                return _sorted_contains(self.__iterable, value, reverse=self.__order[1])
+            except Exception:
+                return value in self.__iterable
+        elif self.__order is not None and self.__order[0] is None:
+            sequence = self.__sequence()
+            try:
+                position = _bisect(sequence, value, reverse=self.__order[1])
+            except Exception:
+                # *value* cannot be ordered against the elements; fall back to a linear scan
+                return value in sequence
+
+            return position < len(sequence) and sequence[position] == value
 
         return value in self.__iterable
 
+    def index(self):
+        """ Builds a hash index of the elements in *self*, so later calls to **contains()** run in O(1)
+
+        * The index is built once and kept on *self*; calling **index()** again is a no-op
+        * Unhashable elements are kept aside and searched linearly
+
+        :return: *self*
+
+        >>> values = Iterable([1, 2, 5, 9]).index()
+        >>> values.contains(5)
+        True
+        """
+        if self.__value_index is None:
+            self.__value_index = _HashIndex((value, value) for value in self.__iterable)
+
+        return self
+
+    def index_by(self, key):
+        """ Builds a hash index of the elements in *self* by **key(** *element* **)**, so later calls to **lookup()** run
+        in O(1)
+
+        * The index is kept on *self*; calling **index_by()** again replaces it
+        * Elements with unhashable keys are kept aside and searched linearly
+
+        :param key: function that returns the value to index each element by
+        :return: *self*
+
+        >>> grades = Iterable([('Alice', 94), ('Bob', 65), ('Charlie', 94)]).index_by(lambda x: x[1])
+        >>> grades.lookup(94).to_list()
+        [('Alice', 94), ('Charlie', 94)]
+        """
+        self.__key_index = _HashIndex((key(value), value) for value in self.__iterable)
+        return self
+
+    def join(self, iterable, key=None, other_key=None):
+        """ Pairs every element of *self* with every element of *iterable* that has an equal key (an inner join)
+
+        * If *self* and *iterable* are *Iterable* objects known to be sorted by *key* and *other_key* respectively
+          (e.g. from **sorted()** or **as_sorted()**), both are streamed in a sort-merge join, buffering only runs of
+          equal keys
+        * Otherwise, the elements of *iterable* are hashed by *other_key* and *self* is streamed against them
+
+        :param iterable: iterable to join with *self*
+        :param key: function that returns the key of an element of *self*; defaults to the element
+        :param other_key: function that returns the key of an element of *iterable*; defaults to *key*
+        :return: *Iterable* of **(** *element, other_element* **)** tuples, in the order of *self*
+
+        >>> names = Iterable([(1, 'Alice'), (2, 'Bob'), (3, 'Charlie')])
+        >>> grades = [(1, 94), (3, 79), (1, 88)]
+        >>> names.join(grades, key=lambda x: x[0]).map(lambda p: (p[0][1], p[1][1])).to_list()
+        [('Alice', 94), ('Alice', 88), ('Charlie', 79)]
+        """
+        if other_key is None:
+            other_key = key
+
+        if self.__is_sorted_like(iterable, key, other_key):
+            join = _Deferred(_merge_join, self.__iterable, iterable.__iterable,
+                             key or _identity, other_key or _identity, self.__order[1])
+        else:
+            buckets = {}
+            for value in iterable:
+                buckets.setdefault((other_key or _identity)(value), []).append(value)
+
+            join = _Deferred(_hash_join, self.__iterable, buckets, key or _identity)
+
+        return Iterable.wrap(join)
+
+    def lookup(self, key):
+        """ Gets every element whose key, as given to **index_by()**, is equal to *key*
+
+        :param key: key to search for
+        :return: *Iterable* of the matching elements, in their original order
+
+        :raises ValueError: **index_by()** has not been called on *self*
+
+        >>> grades = Iterable([('Alice', 94), ('Bob', 65), ('Charlie', 94)]).index_by(lambda x: x[1])
+        >>> grades.lookup(65).to_list()
+        [('Bob', 65)]
+        >>> grades.lookup(70).to_list()
+        []
+        """
+        if self.__key_index is None:
+            raise ValueError("'lookup' requires an index; call 'index_by' first")
+
+        return Iterable.wrap(self.__key_index.get(key))
+
     def is_empty(self):
         """ Equivalent to calling **len( list(** *iterable* **) ) == 0**
 
@@ -275,10 +1297,15 @@ class Iterable:
         """
         return len(list(self.__iterable)) == 0
 
-    def mapmany(self, function):
+    def mapmany(self, function, memoize=False, maxsize=None, cache=None):
         """ Equivalent to calling **itertools.chain.from_iterable( map(** *function, iterable* **) )**
 
         :param function: function to be applied to each input; outputs an iterable
+        :param memoize: if True, results are cached by element, so *function* is called once for each
+            distinct element; see *pyiterable.caching.Cache*
+        :param maxsize: memoizes, keeping at most *maxsize* results, least recently used first out
+        :param cache: *Cache*, or name of a cache registered with **named_cache()**, to memoize with;
+            shared by every call that uses it
         :return: *Iterable* comprised of every element returned by **function**
 
         >>> values = Iterable([1, 2, 5, 9])
@@ -288,8 +1315,84 @@ class Iterable:
         >>> values.mapmany(func).to_list()
         [1, 1, 2, 2, 5, 5, 9, 9]
         """
+        function = _memoized(function, memoize, maxsize, cache, materialize=True)
         return Iterable(itertools.chain.from_iterable(map(function, self.__iterable)))
 
+    def merge(self, *iterables, **kwargs):
+        """ Equivalent to calling **heapq.merge(** *iterable, \*iterables, key=None, reverse=False* **)**
+
+        Lazily merges *self* and *iterables*, each of which must already be sorted, into a single sorted *Iterable*.
+        Elements are streamed when the result is iterated, holding only one element per input at a time.
+
+        :param iterables: any number of sorted iterables
+        :param key: keyword-only; function that returns the value every input is sorted by
+        :param reverse: keyword-only; boolean; if True, every input is sorted with the largest value first
+        :return: sorted *Iterable*
+
+        >>> left = Iterable([1, 4, 9])
+        >>> left.merge([2, 3, 10], [5]).to_list()
+        [1, 2, 3, 4, 5, 9, 10]
+        """
+        key = kwargs.pop('key', None)
+        reverse = kwargs.pop('reverse', False)
+        if kwargs:
+            raise TypeError("unexpected keyword arguments: {}".format(', '.join(sorted(kwargs))))
+
+        inputs = [self.__iterable] + [Iterable.wrap(iterable).__iterable for iterable in iterables]
+        merged = Iterable.wrap(_Deferred(_merge, inputs, key, reverse))
+        merged.__order = (key, bool(reverse))
+        return merged
+
+    def partition(self, n, by='hash', key=None, processes=None, pool=None, typecode=None):
+        """ Splits *self* into *n* partitions, whose transformations run independently in a process pool
+
+        * *'hash'* places elements with equal keys in the same partition
+        * *'range'* places elements in partitions by sampled ranges of keys, in ascending order of partitions
+        * *'round_robin'* deals elements out in turn, so partitions differ in size by at most one element
+
+        :param n: number of partitions
+        :param by: *'hash'*, *'range'*, or *'round_robin'*
+        :param key: function that returns the value to partition each element by
+        :param processes: number of worker processes; defaults to the number of CPUs
+        :param pool: object with a **map(** *function, iterable* **)** method to run tasks with instead,
+            e.g. a *ClusterPool* of remote workers
+        :param typecode: *array.array* typecode of every element, e.g. *'d'* for floats, so partitions
+            can be shared with worker processes without pickling them
+        :return: *PartitionedIterable*
+
+        :raises ValueError: *n* is less than 1, or *by* is not supported
+
+        >>> words = Iterable(['apple', 'bob', 'avocado', 'cat', 'bee'])
+        >>> words.partition(3, by='range', key=lambda x: x[0]).map_partitions(sorted).partitions()
+        [['apple', 'avocado'], ['bee', 'bob'], ['cat']]
+        """
+        # Imported here, as the partitioned module builds on Iterable
+        from pyiterable.partitioned import PartitionedIterable, split
+
+        return PartitionedIterable(split(self.__iterable, n, by=by, key=key), processes=processes, pool=pool,
+                                   typecode=typecode)
+
+    def prefetch(self, n):
+        """ Pulls elements of *self* on a background thread into a buffer of up to *n* elements
+
+        * Lets a slow source (e.g. a network reader or database cursor, via **Iterable.defer()**) produce elements while
+          later stages consume them, rather than one waiting for the other
+        * Exceptions raised by *self* are re-raised when the failed element would have been consumed
+        * If the consumer stops early, the background thread stops after the element it is fetching
+
+        :param n: maximum number of elements to buffer
+        :return: *Iterable*; lazily evaluated, so a new background thread runs for every iteration
+
+        :raises ValueError: *n* is less than 1
+
+        >>> rows = Iterable.defer(fetch_rows, cursor).prefetch(1000)
+        >>> rows.map(parse).filter(is_valid).len()
+        """
+        if n < 1:
+            raise ValueError("'n' must be greater than 0")
+
+        return Iterable.wrap(_Deferred(_prefetch, self.__iterable, n))
+
     def single(self, filter_by=None, default=None):
         """ Equivalent to calling **first()**, except it raises *ValueError* if *iterable* contains more than one element
 
@@ -301,9 +1404,9 @@ class Iterable:
 
         >>> values = Iterable([1, 2, 5, 9])
         >>> values.single()
-        ValueError: iterable [1, 2, 5, 9] contains more than one element
+        ValueError: iterable contains more than one element, including 1 and 2
         >>> values.single(filter_by=lambda x: x > 1)
-        ValueError: iterable [2, 5, 9] contains more than one element
+        ValueError: iterable contains more than one element, including 2 and 5
         >>> values.single(filter_by=lambda x: x > 5)
         9
         >>> values.single(filter_by=lambda x: x > 10) # Returns None
@@ -311,20 +1414,32 @@ class Iterable:
         0
         """
         if filter_by is None:
-            filtered_self = self
+            iterator = iter(self.__iterable)
         else:
-            filtered_self = self.filter(filter_by)
+            iterator = iter(filter(filter_by, self.__iterable))
+
+        # Stops as soon as a second match is found
+        missing = object()
+        value = next(iterator, missing)
+        if value is missing:
+            return default
 
-        if filtered_self.len() > 1:
-            raise ValueError("iterable {} contains more than one element".format(filtered_self.__iterable))
+        other = next(iterator, missing)
+        if other is not missing:
+            raise ValueError("iterable contains more than one element, including {!r} and {!r}".format(value, other))
 
-        return filtered_self.first(default=default)
+        return value
 
 
     # List-like transformations / functions
     def concat(self, iterable):
         """ Equivalent to calling **list(** *left* **) + list(** *right* **)**
 
+        * *self* and *iterable* are linked in O(1) rather than copied, so repeated **concat()** calls are not quadratic
+        * An *Iterable* passed as *iterable* is linked as-is, including lazily evaluated ones; other iterables are
+          copied once
+        * The result is only flattened into a single list if random access (e.g. **get()**) is needed
+
         :param iterable: iterable to concat with *self*
         :return: New *Iterable* containing the elements from *self* and *iterable*
 
@@ -333,7 +1448,12 @@ class Iterable:
         >>> Iterable(left).concat(right).to_list()
         [2, 10, 2, 2, 5, 9, 10, 13, -5, 1982, -10, 2384, 1982, 98]
         """
-        return Iterable(list(self.__iterable) + list(iterable))
+        if isinstance(iterable, Iterable):
+            right = iterable.__iterable
+        else:
+            right = list(iterable)
+
+        return Iterable.wrap(_Rope(self.__iterable, right))
 
     def first(self, filter_by=None, default=None, function=None):
         """ Equivalent to calling **next( iter( filter(** *filter_by, iterable* **) )** *, default* **)**
@@ -386,12 +1506,17 @@ class Iterable:
         >>> values.get(5)
         IndexError: index out of range
         """
-        iterable_as_list = list(self.__iterable)
+        if index >= 0 and _replays(self.__iterable):
+            for value in itertools.islice(self.__iterable, index, None):
+                return value
+            raise IndexError("index out of range")
+
+        sequence = self.__sequence()
 
-        if index < 0 or index >= len(iterable_as_list):
+        if index < 0 or index >= len(sequence):
             raise IndexError("index out of range")
 
-        return list(self.__iterable)[index]
+        return sequence[index]
 
     def last(self, filter_by=None, default=None):
         """ Equivalent to calling **next( iter( reversed( list( filter(** *filter_by, iterable* **) ) ) )** *, default* **)**
@@ -409,17 +1534,59 @@ class Iterable:
         >>> values.last(filter_by=lambda x: x < 1, default=0)
         0
         """
+        if not _is_sequence(self.__iterable):
+            # Not reversible; keep the last match of a single forward pass rather than flattening *self*
+            value = default
+            for value in (self.__iterable if filter_by is None else filter(filter_by, self.__iterable)):
+                pass
+
+            return value
+
+        # Scans backwards from the end, stopping at the first match
+        reversed_iterable = reversed(self.__iterable)
         if filter_by:
-            reversed_iterable = reversed(list(filter(filter_by, self.__iterable)))
-        else:
-            reversed_iterable = reversed(list(self.__iterable))
+            reversed_iterable = filter(filter_by, reversed_iterable)
 
         return next(iter(reversed_iterable), default)
 
+    def range_between(self, lo, hi):
+        """ Gets the elements whose sort key is between *lo* and *hi* inclusive, using binary search
+
+        * *self* must come from **sorted()** (or be derived from a sorted *Iterable*, e.g. via **filter()**)
+        * *lo* and *hi* are compared against **key(** *element* **)**, using the *key* given to **sorted()**
+        * The result is a view of *self*; no elements are copied
+
+        :param lo: smallest key to include
+        :param hi: largest key to include
+        :return: *Iterable* of the matching elements, in the same order as *self*
+
+        :raises ValueError: *self* is not known to be sorted
+
+        >>> grades = Iterable([('Charlie', 79), ('Alice', 94), ('Bob', 65)]).sorted(key=lambda x: x[1])
+        >>> grades.range_between(70, 100).to_list()
+        [('Charlie', 79), ('Alice', 94)]
+        """
+        if self.__order is None:
+            raise ValueError("'range_between' requires a sorted Iterable; call 'sorted' first")
+
+        key, is_reversed = self.__order
+        if is_reversed:
+            lo, hi = hi, lo
+
+        if _replays(self.__iterable):
+            return self.__keep_order(Iterable.wrap(_Deferred(_range_between, self.__iterable, lo, hi, key,
+                                                             is_reversed)))
+
+        sequence = self.__sequence()
+        start = _bisect(sequence, lo, key, is_reversed)
+        stop = _bisect(sequence, hi, key, is_reversed, right=True)
+
+        return self.__keep_order(Iterable.wrap(_SliceView(sequence, start, stop)))
+
     def skip(self, count):
         """ Skips the first *count* elements in *iterable*
 
-        * This function will convert the *iterable* to a sequence type before retrieving the values
+        * Sequences are sliced; other iterables, e.g. from **defer()**, are read lazily, and only as far as needed
         * If *count* is equal to or greater than the length of *iterable*, no elements are taken
 
         :param count: number of values to skip
@@ -441,15 +1608,21 @@ class Iterable:
             raise ValueError("'count' must be greater than 0")
         elif count == 0:
             return self
-        elif count >= len(self.__iterable):
+
+        pushed = self.__pushed('skip', count)
+        if pushed is not None:
+            return self.__keep_order(pushed)
+        elif not _is_sequence(self.__iterable):
+            return self.__keep_order(Iterable.wrap(_Deferred(itertools.islice, self.__iterable, count, None)))
+        elif count >= len(self.__sequence()):
             return Iterable([])
         else:
-            return Iterable(list(self.__iterable)[count:])
+            return self.__keep_order(Iterable.wrap(self.__sequence()[count:]))
 
     def take(self, count):
         """ Gets the first *count* elements in *iterable*
 
-        * This function will convert the *iterable* to a sequence type before retrieving the values
+        * Sequences are sliced; other iterables, e.g. from **defer()**, are read lazily, and only as far as needed
         * If *count* is equal to or greater than the length of *iterable*, all elements are taken
 
         :param count: number of values to retrieve
@@ -471,14 +1644,26 @@ class Iterable:
             raise ValueError("'count' must be greater than 0")
         elif count == 0:
             return Iterable([])
-        elif count >= len(self.__iterable):
+
+        pushed = self.__pushed('take', count)
+        if pushed is not None:
+            return self.__keep_order(pushed)
+        elif not _is_sequence(self.__iterable):
+            # Reads no more of a lazy source than it needs
+            return self.__keep_order(Iterable.wrap(_Deferred(itertools.islice, self.__iterable, count)))
+        elif count >= len(self.__sequence()):
             return self
         else:
-            return Iterable(list(self.__iterable)[:count])
+            return self.__keep_order(Iterable.wrap(self.__sequence()[:count]))
 
     # Set-like transformations / functions
     def difference(self, iterable):
-        """ Equivalent to calling **set(** *left* **).difference( set (** *iterable* **) )**
+        """ Equivalent to calling **set(** *left* **).difference( set (** *iterable* **) )**, but preserves the order in
+        which elements first appear in *self*
+
+        * Only *iterable* is hashed into a set; *self* is streamed against it when the result is iterated
+        * If *self* and *iterable* are *Iterable* objects both known to be sorted without a key, in the same direction,
+          they are merged instead and nothing is hashed
 
         :param iterable: iterable to check against for differences
         :return: New *Iterable* containing elements found in *self* but not *iterable*
@@ -486,23 +1671,47 @@ class Iterable:
         >>> left = [2, 10, 1982, -5, 9, 10]
         >>> right = [1982, -10, -5, 1982, 98]
         >>> Iterable(left).difference(right).to_list()
-        [9, 2, 10]
+        [2, 10, 9]
         """
-        return Iterable(set(self.__iterable).difference(set(iterable)))
+        if self.__is_sorted_like(iterable):
+            difference = _Deferred(_merge_difference, self.__iterable, iterable.__iterable, self.__order[1])
+        else:
+            difference = _Deferred(_distinct, self.__iterable, set(iterable))
+
+        return self.__keep_order(Iterable.wrap(difference))
 
     def distinct(self):
-        """ Equivalent to calling **set(** *iterable* **)**
+        """ Equivalent to calling **set(** *iterable* **)**, but preserves the order in which elements first appear
 
-        :return: New *Iterable* containing only the distinct elements; order not preserved
+        :return: New *Iterable* containing only the distinct elements, in first-seen order
 
         >>> values = Iterable([2, 10, 2, 2, 5, 9, 10])
         >>> values.distinct().to_list()
-        [9, 2, 10, 5]
+        [2, 10, 5, 9]
         """
-        return Iterable(set(self.__iterable))
+        pushed = self.__pushed('distinct')
+        if pushed is not None:
+            return self.__keep_order(pushed)
+
+        budget = _budget()
+        if self.__order is not None and self.__order[0] is None:
+            # Equal elements are adjacent once sorted, so nothing needs to be hashed
+            distinct = Iterable.wrap(_Deferred(_dedupe_adjacent, self.__iterable))
+        elif budget is not None:
+            from pyiterable.memory import distinct_within
+            distinct = Iterable.wrap(_Deferred(distinct_within, self.__iterable, budget))
+        else:
+            distinct = Iterable.wrap(_Deferred(_distinct, self.__iterable))
+
+        return self.__keep_order(self.__share_value_index(distinct))
 
     def intersection(self, iterable):
-        """ Equivalent to calling **set(** *left* **).intersection( set(** *right* **) )**
+        """ Equivalent to calling **set(** *left* **).intersection( set(** *right* **) )**, but preserves the order in
+        which elements first appear in *self*
+
+        * Only the smaller side is hashed into a set when both sizes are known; otherwise *iterable* is hashed
+        * If *self* and *iterable* are *Iterable* objects both known to be sorted without a key, in the same direction,
+          they are merged instead and nothing is hashed
 
         :param iterable: iterable to intersect with *self*
         :return: *Iterable* with distinct values found in both *self* and *iterable*
@@ -510,12 +1719,23 @@ class Iterable:
         >>> left = [2, 10, 1982, -5, 9, 10]
         >>> right = [1982, -10, -5, 1982, 98]
         >>> Iterable(left).intersection(right).to_list()
-        [-5, 1982]
+        [1982, -5]
         """
-        return Iterable(set(self.__iterable).intersection(set(iterable)))
+        if self.__is_sorted_like(iterable):
+            intersection = _Deferred(_merge_intersection, self.__iterable, iterable.__iterable, self.__order[1])
+            return self.__keep_order(Iterable.wrap(intersection))
+
+        if _has_len(self.__iterable) and _has_len(iterable) and len(self.__iterable) < len(iterable):
+            left = set(self.__iterable)
+            matches = set(value for value in iterable if value in left)
+        else:
+            matches = set(iterable)
+
+        return self.__keep_order(Iterable.wrap(_Deferred(_distinct_in, self.__iterable, matches)))
 
     def symmetric_difference(self, iterable):
-        """ Equivalent to calling **set(** *left* **).symmetric_difference( set(** *right* **) )**
+        """ Equivalent to calling **set(** *left* **).symmetric_difference( set(** *right* **) )**, but preserves the
+        order in which elements first appear; elements from *self* come before elements from *iterable*
 
         :param iterable: iterable to perform symmetric difference against
         :return: *Iterable* with distinct values found in either *self* or *iterable* but not both
@@ -523,12 +1743,18 @@ class Iterable:
         >>> left = [2, 10, 1982, -5, 9, 10]
         >>> right = [1982, -10, -5, 1982, 98]
         >>> Iterable(left).symmetric_difference(right).to_list()
-        [98, 2, 9, 10, -10]
+        [2, 10, 9, -10, 98]
         """
-        return Iterable(set(self.__iterable).symmetric_difference(set(iterable)))
+        right = list(_distinct(iterable))
+        return Iterable.wrap(_Deferred(_symmetric_difference, self.__iterable, right, set(right)))
 
     def union(self, iterable):
-        """ Equivalent to calling **set(** *left* **).union( set(** *right* **) )**
+        """ Equivalent to calling **set(** *left* **).union( set(** *right* **) )**, but preserves the order in which
+        elements first appear; elements from *self* come before elements from *iterable*
+
+        * Elements are emitted lazily; *self* is streamed when the result is iterated
+        * If *self* and *iterable* are *Iterable* objects both known to be sorted without a key, in the same direction,
+          they are merged instead; the result is then sorted rather than having the elements of *self* first
 
         :param iterable: iterable to union with *self*
         :return: *Iterable* with distinct values in either *self* or *iterable*
@@ -536,6 +1762,255 @@ class Iterable:
         >>> left = [2, 10, 2, 2, 5, 9, 10]
         >>> right = [1982, -10, 5, 1982, 9]
         >>> Iterable(left).union(right).to_list()
-        [2, 5, 9, 10, -10, 1982]
+        [2, 10, 5, 9, 1982, -10]
+        """
+        if self.__is_sorted_like(iterable):
+            merged = self.merge(iterable, reverse=self.__order[1])
+            return self.__keep_order(Iterable.wrap(_Deferred(_dedupe_adjacent, merged.__iterable)))
+
+        right = list(_distinct(iterable))
+        return Iterable.wrap(_Deferred(_union, self.__iterable, right))
+
+    # Statistical functions
+    @staticmethod
+    def __interpolate_sorted(values, q):
+        rank = q * (len(values) - 1)
+        lower = int(rank)
+        if lower == len(values) - 1:
+            return values[lower]
+
+        return values[lower] + (values[lower + 1] - values[lower]) * (rank - lower)
+
+    def aggregate(self, **reductions):
+        """ Computes several reductions of *self* in a single pass, instead of one pass for each
+
+        * Reductions are *'count'*, *'sum'*, *'min'*, *'max'*, *'mean'*, *'var'*, and *'std'*; the built-in
+          functions **len**, **sum**, **min**, and **max** can be used in place of their names
+        * Variance is computed with Welford's algorithm, so it stays accurate for large values with a small spread;
+          *'var'* and *'std'* are the sample variance and standard deviation
+        * Elements are reduced in chunks; if NumPy is installed, chunks of numbers are reduced with NumPy
+        * *'min'*, *'max'*, and *'mean'* are *None* if *self* is empty, as are *'var'* and *'std'* if *self* has
+          less than two elements
+
+        :param reductions: keyword arguments of result name to reduction
+        :return: dict of result name to value
+
+        :raises ValueError: a reduction is not supported
+
+        >>> Iterable([4, 8, 6]).aggregate(count=len, total=sum, lo=min, hi=max, mean='mean', var='var')
+        {'count': 3, 'total': 18, 'lo': 4, 'hi': 8, 'mean': 6.0, 'var': 4.0}
+        """
+        from pyiterable.aggregates import aggregate
+        return aggregate(self.__iterable, reductions)
+
+    def describe(self):
+        """ Summarizes *self* in a single pass; see **aggregate()**
+
+        :return: dict of *'count'*, *'sum'*, *'mean'*, *'std'*, *'min'*, and *'max'*
+
+        >>> Iterable([12, 15, 11, 90, 14, 13]).describe()['mean']
+        25.833333333333332
+        """
+        return self.aggregate(count='count', sum='sum', mean='mean', std='std', min='min', max='max')
+
+    def median(self, method='tdigest', compression=100):
+        """ Equivalent to calling **quantiles( [0.5]** *, method, compression* **)[0]**
+
+        :param method: *'tdigest'* for a bounded-memory estimate, or *'exact'*
+        :param compression: accuracy of the *'tdigest'* estimate; see *TDigest*
+        :return: median of *self*
+
+        :raises ValueError: *self* is empty, or *method* is not supported
+
+        >>> Iterable([12, 15, 11, 90, 14, 13]).median(method='exact')
+        13.5
+        """
+        return self.quantiles([0.5], method=method, compression=compression)[0]
+
+    def quantiles(self, qs, method='tdigest', compression=100):
+        """ Computes the values at each quantile in *qs*
+
+        * *'tdigest'* streams *self* once into a *TDigest*, using memory bounded by *compression*
+        * *'exact'* sorts a copy of *self* once; values are linearly interpolated at rank **q * (len - 1)**
+
+        :param qs: iterable of quantiles, each between 0 and 1 inclusive
+        :param method: *'tdigest'* for bounded-memory estimates, or *'exact'*
+        :param compression: accuracy of the *'tdigest'* estimates; see *TDigest*
+        :return: list of values, one for each quantile in *qs*
+
+        :raises ValueError: *self* is empty, a quantile is out of range, or *method* is not supported
+
+        >>> latencies = Iterable([12, 15, 11, 90, 14, 13])
+        >>> latencies.quantiles([0.5, 0.9], method='exact')
+        [13.5, 52.5]
+        """
+        qs = list(qs)
+        if any(q < 0 or q > 1 for q in qs):
+            raise ValueError("quantiles must be between 0 and 1")
+
+        if method == 'tdigest':
+            digest = TDigest.from_iterable(self.__iterable, compression=compression)
+            if not len(digest):
+                raise ValueError("quantiles of empty iterable")
+
+            return [digest.quantile(q) for q in qs]
+        elif method == 'exact':
+            values = sorted(self.__iterable)
+            if not values:
+                raise ValueError("quantiles of empty iterable")
+
+            return [self.__interpolate_sorted(values, q) for q in qs]
+        else:
+            raise ValueError("unsupported method '{}'; use 'tdigest' or 'exact'".format(method))
+
+    def sample(self, k, seed=None, weights=None):
+        """ Draws a random sample of *k* elements, without replacement, in a single pass over *self*
+
+        * Uniform samples use reservoir sampling (Algorithm L); memory is O(k) even when *self* is not a sequence
+        * Weighted samples use A-Res; an element's chance of being drawn is proportional to its weight
+        * If *k* is equal to or greater than the length of *self*, all elements are taken
+        * The order of the sampled elements is not preserved
+
+        :param k: number of elements to draw
+        :param seed: seed for the random number generator, for reproducible samples
+        :param weights: function that returns the weight of an element, or an iterable of weights
+            with one weight for each element of *self*
+        :return: *Iterable* of sampled elements
+
+        :raises ValueError: *k* is a negative value, a weight is negative, or an iterable of *weights* does not have
+            exactly one weight for each element
+
+        >>> values = Iterable(range(100))
+        >>> values.sample(3, seed=7).to_list()
+        [41, 19, 50]
+        >>> values.sample(2, seed=7, weights=lambda x: 1 if x < 10 else 0).to_list()
+        [4, 2]
+        """
+        if k < 0:
+            raise ValueError("'k' must be greater than 0")
+
+        rng = random.Random(seed)
+        if weights is not None:
+            return Iterable.wrap(weighted_reservoir_sample(self.__iterable, weights, k, rng))
+        elif _is_sequence(self.__iterable):
+            return Iterable.wrap(rng.sample(self.__iterable, min(k, len(self.__iterable))))
+        else:
+            return Iterable.wrap(reservoir_sample(self.__iterable, k, rng))
+
+    # Sinks
+    def to_arrow(self, schema=None):
+        """ Converts *self* into an Arrow table; requires pyarrow
+
+        * Elements must be dicts of column name to value; other elements are put in a column named *'value'*
+        * If *self* reads Arrow data, its record batches are used as-is; see **from_arrow()**
+        * Otherwise elements are converted in batches, so only one batch of them is held as Python objects at a time
+
+        :param schema: *pyarrow.Schema* of the table; inferred from the elements if *None*
+        :return: *pyarrow.Table*
+
+        :raises ImportError: pyarrow is not installed
+
+        >>> Iterable([{'name': 'Alice', 'score': 94}]).to_arrow().num_rows
+        1
+        """
+        from pyiterable.arrow import to_table
+        return to_table(self.__iterable, schema)
+
+    def to_csv(self, path, columns=None, encoding='utf-8', batch_size=1000, threads=0, **kwargs):
+        """ Writes *self* to a CSV file as it is read, without holding more than a few batches of rows in memory
+
+        * Dicts are written like *csv.DictWriter* does, under a header row of *columns*, which defaults to the keys
+          of the first dict
+        * Other elements, e.g. tuples, are written as rows as-is, under a header row of *columns* if given
+
+        :param path: path of the file to write
+        :param columns: names of the columns
+        :param encoding: text encoding of the file
+        :param batch_size: number of rows encoded at a time
+        :param threads: number of threads that encode batches while earlier ones are written
+        :param kwargs: keyword-only; formatting parameters of **csv.writer()**, e.g. *delimiter*
+        :return: number of rows written, excluding the header row
+
+        >>> Iterable([{'name': 'Alice', 'score': 94}]).to_csv('scores.csv')
+        1
+        """
+        from pyiterable.sinks import write_csv
+        return write_csv(self.__iterable, path, columns, encoding, batch_size, threads, **kwargs)
+
+    def to_file(self, path, function=str, separator='\n', encoding='utf-8', batch_size=1000, threads=0):
+        """ Writes **function(** *element* **)** for every element of *self* to a text file as it is read
+
+        Elements are encoded a batch at a time, and written through a large buffer.
+
+        :param path: path of the file to write
+        :param function: function that returns the text of an element
+        :param separator: text written after every element
+        :param encoding: text encoding of the file
+        :param batch_size: number of elements encoded at a time
+        :param threads: number of threads that encode batches while earlier ones are written
+        :return: number of elements written
+
+        >>> Iterable(['a', 'b']).to_file('letters.txt')
+        2
+        """
+        from pyiterable.sinks import LineEncoder, write_text
+        return write_text(self.__iterable, path, LineEncoder(function, separator), encoding, batch_size, threads)
+
+    def to_ipc(self, path, schema=None):
+        """ Writes *self* to an Arrow IPC (Feather v2) file one record batch at a time; see **to_arrow()**
+
+        :param path: path of the file to write
+        :param schema: *pyarrow.Schema* of the file; inferred from the elements if *None*
+
+        :raises ImportError: pyarrow is not installed
+        """
+        from pyiterable.arrow import write
+        write(self.__iterable, path, 'ipc', schema)
+
+    def to_jsonl(self, path, encoding='utf-8', batch_size=1000, threads=0):
+        """ Writes every element of *self* as JSON on its own line as it is read; see **to_file()**
+
+        :param path: path of the file to write
+        :param encoding: text encoding of the file
+        :param batch_size: number of elements encoded at a time
+        :param threads: number of threads that encode batches while earlier ones are written
+        :return: number of lines written
+
+        >>> Iterable([{'time': 1, 'level': 'error'}]).to_jsonl('events.jsonl')
+        1
+        """
+        from pyiterable.sinks import write_jsonl
+        return write_jsonl(self.__iterable, path, encoding, batch_size, threads)
+
+    def to_parquet(self, path, schema=None):
+        """ Writes *self* to a Parquet file one record batch at a time; see **to_arrow()**
+
+        :param path: path of the file to write
+        :param schema: *pyarrow.Schema* of the file; inferred from the elements if *None*
+
+        :raises ImportError: pyarrow is not installed
+        """
+        from pyiterable.arrow import write
+        write(self.__iterable, path, 'parquet', schema)
+
+    def to_sqlite(self, connection, table, columns=None, batch_size=1000):
+        """ Inserts the elements of *self* into a SQLite table as they are read, a batch at a time with
+        **executemany()**, in a single transaction
+
+        * Dicts are inserted into *columns*, which default to the keys of the first dict; missing keys are *NULL*
+        * Other elements, e.g. tuples, are inserted as rows as-is, into *columns* if given
+        * If *columns* are known, the table is created with them if it does not exist
+
+        :param connection: *sqlite3.Connection*
+        :param table: name of the table
+        :param columns: names of the columns
+        :param batch_size: number of rows inserted at a time
+        :return: number of rows inserted
+
+        >>> import sqlite3
+        >>> connection = sqlite3.connect(':memory:')
+        >>> Iterable([{'name': 'Alice', 'score': 94}]).to_sqlite(connection, 'scores')
+        1
         """
-        return Iterable(set(self.__iterable).union(set(iterable)))
+        from pyiterable.sinks import write_sqlite
+        return write_sqlite(self.__iterable, connection, table, columns, batch_size)
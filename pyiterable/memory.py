@@ -0,0 +1,329 @@
+""" Memory budgets for materializing operations, which spill to temporary files instead of exceeding them
+
+>>> import pyiterable
+>>> with pyiterable.limits(memory='512MB') as budget:
+...     ordered = Iterable.defer(read_events).sorted(key=lambda event: event['time'])
+>>> budget.stats['sorted']['peak'] <= budget.memory
+True
+
+While a budget is active, **sorted()** and **distinct()** estimate the memory their elements take as they go. Before
+their elements, together with those of the other operations running under the same budget, would exceed it, they
+write them to temporary files and continue; their results are then read back from those files. Estimates come from
+*sys.getsizeof()* of a sample of the elements and of what they directly contain, so they are approximate.
+"""
+import heapq
+import os
+import pickle
+import re
+import sys
+import tempfile
+import threading
+
+from pyiterable.iterable import _LazyBacking, _merge
+
+
+_UNITS = {'': 1, 'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'TB': 1 << 40}
+
+# Elements written to, or read from, a spill file at a time
+_SPILL_BATCH_SIZE = 1024
+
+# Footprints are measured for one element in every _SAMPLE_EVERY, and assumed for the rest
+_SAMPLE_EVERY = 32
+
+# Fewest elements spilled in a sorted run, so a budget that other operations have already used up does not spill a
+# file for every element
+_MIN_RUN_SIZE = 1024
+
+# Spilled distinct() elements are split into this many files by hash, so each file fits in memory on its own
+_DISTINCT_PARTITIONS = 64
+
+_lock = threading.Lock()
+_active = []
+
+
+def parse_size(size):
+    """ Converts a size such as *'2GB'* or *'512 MB'* to a number of bytes; units are powers of 1024
+
+    :param size: number of bytes, or string of a number followed by *B*, *KB*, *MB*, *GB*, or *TB*
+    :return: number of bytes
+
+    :raises ValueError: *size* is not a valid size
+
+    >>> parse_size('1.5KB')
+    1536
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+
+    match = re.match(r'^\s*([0-9]*\.?[0-9]+)\s*([KMGT]?B?)\s*$', size.upper())
+    if match is None:
+        raise ValueError("invalid size '{}'; use e.g. '512MB' or '2GB'".format(size))
+
+    number, unit = match.groups()
+    if unit and not unit.endswith('B'):
+        unit += 'B'
+
+    return int(float(number) * _UNITS[unit])
+
+
+def footprint(value):
+    """ Approximates the bytes *value* takes: its own size, a list slot, and the sizes of what it directly contains
+
+    :param value: any object
+    :return: number of bytes
+    """
+    size = sys.getsizeof(value) + 8
+    if isinstance(value, (tuple, list)):
+        size += sum(sys.getsizeof(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+
+    return size
+
+
+def active():
+    """ :return: innermost active *Limits*, or *None* if no budget is active """
+    return _active[-1] if _active else None
+
+
+class Limits(object):
+    """ Memory budget shared by the materializing operations that run while it is active; created by **limits()**
+
+    :ivar memory: budget in bytes
+    :ivar stats: dict of operation name, e.g. *'sorted'*, to a dict with its *'peak'* estimated bytes in memory at
+        once, *'spills'* count, and *'spilled'* bytes written to temporary files
+    """
+
+    def __init__(self, memory, spill_directory=None):
+        self.memory = parse_size(memory)
+        if self.memory <= 0:
+            raise ValueError("'memory' must be greater than 0")
+
+        self.spill_directory = spill_directory
+        self.stats = {}
+        self.__used = 0
+
+    def __enter__(self):
+        with _lock:
+            _active.append(self)
+        return self
+
+    def __exit__(self, *args):
+        with _lock:
+            _active.remove(self)
+
+    @property
+    def used(self):
+        """ Estimated bytes held in memory by the operations that are running under *self* """
+        return self.__used
+
+    def _reserve(self, stage, nbytes, held):
+        # Adds *nbytes* to the usage of *self*; *held* is the total of the operation, for its peak
+        with _lock:
+            self.__used += nbytes
+            stats = self.__stats(stage)
+            stats['peak'] = max(stats['peak'], held)
+            return self.__used > self.memory
+
+    def _spilled(self, stage, nbytes):
+        with _lock:
+            stats = self.__stats(stage)
+            stats['spills'] += 1
+            stats['spilled'] += nbytes
+
+    def __stats(self, stage):
+        if stage not in self.stats:
+            self.stats[stage] = {'peak': 0, 'spills': 0, 'spilled': 0}
+
+        return self.stats[stage]
+
+
+def limits(memory, spill_directory=None):
+    """ Creates a memory budget for **sorted()** and **distinct()**, which is active inside a *with* block
+
+    * Operations use the budget that was active when they were called, even if their results are iterated later
+    * Budgets apply to operations on every thread; the innermost active budget is used
+    * Only **sorted()** and **distinct()** are budgeted; **difference()**, **intersection()**, **union()**, and
+      **symmetric_difference()** hash their elements into sets in memory, within a budget or not
+
+    :param memory: budget in bytes, or a string such as *'2GB'*; see **parse_size()**
+    :param spill_directory: directory for temporary files; defaults to the system temporary directory
+    :return: *Limits*
+
+    :raises ValueError: *memory* is not a valid, positive size
+    """
+    return Limits(memory, spill_directory)
+
+
+class _Tracker(object):
+    # Estimates the memory an operation holds, and reserves it in a Limits
+
+    def __init__(self, budget, stage):
+        self.budget = budget
+        self.stage = stage
+        self.held = 0
+        self.__count = 0
+        self.__sampled = 0
+
+    def add(self, value):
+        """ :return: whether the budget is exceeded once *value* is held """
+        if self.__count % _SAMPLE_EVERY == 0:
+            self.__sampled = footprint(value)
+
+        self.__count += 1
+        self.held += self.__sampled
+        return self.budget._reserve(self.stage, self.__sampled, self.held)
+
+    def release(self):
+        self.budget._reserve(self.stage, -self.held, 0)
+        self.held = 0
+
+
+class _Run(object):
+    # Temporary file of pickled elements, written a batch at a time; deleted once no result reads from it
+
+    def __init__(self, budget, stage):
+        self.budget = budget
+        self.stage = stage
+        descriptor, self.path = tempfile.mkstemp(prefix='pyiterable-', suffix='.spill', dir=budget.spill_directory)
+        self.__file = os.fdopen(descriptor, 'wb')
+        self.__batch = []
+
+    @classmethod
+    def of(cls, budget, stage, values):
+        run = cls(budget, stage)
+        for value in values:
+            run.append(value)
+
+        return run.close()
+
+    def append(self, value):
+        self.__batch.append(value)
+        if len(self.__batch) >= _SPILL_BATCH_SIZE:
+            self.__flush()
+
+    def close(self):
+        """ :return: *self*, which can then be read """
+        self.__flush()
+        self.budget._spilled(self.stage, self.__file.tell())
+        self.__file.close()
+        return self
+
+    def __flush(self):
+        if self.__batch:
+            pickle.dump(self.__batch, self.__file, pickle.HIGHEST_PROTOCOL)
+            self.__batch = []
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+
+                for value in batch:
+                    yield value
+
+    def __del__(self):
+        try:
+            os.remove(self.path)
+        except (OSError, AttributeError):
+            pass
+
+
+class _MergedRuns(_LazyBacking):
+    """ Sorted runs spilled by **sorted()**, merged as they are read """
+    __slots__ = ('__runs', '__key', '__reverse')
+    replays = True
+
+    def __init__(self, runs, key, reverse):
+        self.__runs = runs
+        self.__key = key
+        self.__reverse = reverse
+
+    def __iter__(self):
+        # Equal elements come from earlier runs first, so the merge is stable like sorted()
+        return _merge(self.__runs, self.__key, self.__reverse)
+
+
+def sorted_within(iterable, budget, key=None, reverse=False):
+    """ Sorts *iterable* like the built-in **sorted()**, spilling sorted runs to temporary files to stay within
+    *budget*; runs have at least *_MIN_RUN_SIZE* elements
+
+    Once spilled, the result is only read by streaming it: **min()**, **max()**, **contains()**, **range_between()**,
+    **take()**, and **get()** read as much of it as they need, instead of loading it into memory.
+
+    :return: list, if nothing was spilled; otherwise a lazily merged backing for *Iterable*
+    """
+    tracker = _Tracker(budget, 'sorted')
+    runs = []
+    chunk = []
+    try:
+        for value in iterable:
+            chunk.append(value)
+            if tracker.add(value) and len(chunk) >= _MIN_RUN_SIZE:
+                chunk.sort(key=key, reverse=reverse)
+                runs.append(_Run.of(budget, 'sorted', chunk))
+                chunk = []
+                tracker.release()
+    finally:
+        tracker.release()
+
+    chunk.sort(key=key, reverse=reverse)
+    if not runs:
+        return chunk
+
+    runs.append(_Run.of(budget, 'sorted', chunk))
+    return _MergedRuns(runs, key, reverse)
+
+
+def distinct_within(iterable, budget):
+    """ Equivalent to the *distinct()* generator, spilling to temporary files to stay within *budget*
+
+    Once the seen elements would exceed *budget*, they and the rest of *iterable* are split by hash into files, with
+    their positions; each file is then deduplicated on its own, and the survivors are merged back in position order.
+    """
+    tracker = _Tracker(budget, 'distinct')
+    seen = set()
+    iterator = iter(iterable)
+    exceeded = False
+    try:
+        for value in iterator:
+            if value not in seen:
+                seen.add(value)
+                yield value
+                if tracker.add(value):
+                    exceeded = True
+                    break
+    finally:
+        tracker.release()
+
+    if not exceeded:
+        return
+
+    partitions = [_Run(budget, 'distinct') for _ in range(_DISTINCT_PARTITIONS)]
+    # Elements already yielded come first in their partitions, at position -1
+    for value in seen:
+        partitions[hash(value) % _DISTINCT_PARTITIONS].append((-1, value))
+    seen = None
+    for pair in enumerate(iterator):
+        partitions[hash(pair[1]) % _DISTINCT_PARTITIONS].append(pair)
+
+    survivors = []
+    for partition in partitions:
+        first = {}
+        try:
+            for position, value in partition.close():
+                if value not in first:
+                    first[value] = position
+                    tracker.add(value)
+        finally:
+            tracker.release()
+
+        survivors.append(_Run.of(budget, 'distinct', sorted((position, value) for value, position in first.items()
+                                                            if position >= 0)))
+    partitions = None
+
+    for _, value in heapq.merge(*survivors):
+        yield value
@@ -0,0 +1,353 @@
+import array
+from bisect import bisect_left
+from functools import reduce
+import itertools
+import multiprocessing
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+from pyiterable.iterable import Iterable
+
+
+_PARTITIONERS = ('hash', 'range', 'round_robin')
+
+# array.array typecodes that memoryview.cast() also supports
+_SHAREABLE_TYPECODES = frozenset('bBhHiIlLqQfd')
+
+
+def _identity(value):
+    return value
+
+
+def _apply_stages(values, stages):
+    for name, function in stages:
+        if name == 'map':
+            values = map(function, values)
+        elif name == 'filter':
+            values = filter(function, values)
+        elif name == 'mapmany':
+            values = itertools.chain.from_iterable(map(function, values))
+        elif name == 'map_partitions':
+            values = function(list(values))
+        elif name == 'aggregate':
+            values = [function(list(values))]
+
+    return values
+
+
+def _run_stages(task):
+    # Runs in a worker process; *task* must be picklable, so stages are (name, function) tuples
+    partition, stages = task
+    return list(_apply_stages(partition, stages))
+
+
+def _run_shared_stages(task):
+    # Runs in a worker process; reads its partition from, and optionally writes its results to, shared memory
+    (name, typecode, start, stop), stages, output = task
+    segments = []
+    views = []
+    try:
+        segments.append(shared_memory.SharedMemory(name=name))
+        views.append(segments[-1].buf.cast(typecode))
+        views.append(views[-1][start:stop])
+        values = _apply_stages(views[-1], stages)
+        if output is None:
+            return list(values)
+
+        output_name, output_typecode = output
+        segments.append(shared_memory.SharedMemory(name=output_name))
+        views.append(segments[-1].buf.cast(output_typecode))
+        views[-1][start:stop] = array.array(output_typecode, values)
+        return None
+    finally:
+        for view in reversed(views):
+            view.release()
+        for segment in segments:
+            segment.close()
+
+
+class _SharedSegment(object):
+    # Shared memory segment holding *length* values of *typecode*; unlinked on exit, so no segment outlives a run
+
+    def __init__(self, typecode, length):
+        self.typecode = typecode
+        self.segment = shared_memory.SharedMemory(create=True, size=max(length, 1) * array.array(typecode).itemsize)
+        self.view = self.segment.buf.cast(typecode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        self.segment.close()
+        self.segment.unlink()
+
+
+def split(values, n, by='hash', key=None):
+    """ Splits *values* into *n* lists
+
+    * *'hash'* places elements with equal keys in the same partition
+    * *'range'* places elements in partitions by ranges of keys, with boundaries picked from a sample of the keys,
+      so that partition *i* only has keys less than or equal to those of partition *i + 1*
+    * *'round_robin'* deals elements out in turn, so partitions differ in size by at most one element
+
+    :param values: iterable to split
+    :param n: number of partitions
+    :param by: *'hash'*, *'range'*, or *'round_robin'*
+    :param key: function that returns the value to partition each element by; defaults to the element
+    :return: list of *n* lists
+
+    :raises ValueError: *n* is less than 1, or *by* is not supported
+    """
+    if n < 1:
+        raise ValueError("'n' must be greater than 0")
+    if by not in _PARTITIONERS:
+        raise ValueError("unsupported partitioner '{}'; use one of {}".format(by, ', '.join(_PARTITIONERS)))
+
+    key = key or _identity
+    partitions = [[] for _ in range(n)]
+    if by == 'round_robin':
+        for i, value in enumerate(values):
+            partitions[i % n].append(value)
+    elif by == 'hash':
+        for value in values:
+            partitions[hash(key(value)) % n].append(value)
+    else:
+        values = Iterable(values)
+        keys = values.sample(n * 20, seed=0).map(key).sorted().to_list()
+        boundaries = [keys[len(keys) * i // n] for i in range(1, n)] if keys else []
+        for value in values:
+            partitions[bisect_left(boundaries, key(value))].append(value)
+
+    return partitions
+
+
+class PartitionedIterable(object):
+    """ Data split into partitions, whose transformations run independently on each partition in a process pool
+
+    Transformations (**map()**, **filter()**, **mapmany()**, and **map_partitions()**) are recorded, not run. They run,
+    fused into a single task per partition, when an action such as **collect()**, **aggregate()**, or **shuffle()**
+    needs their results.
+
+    * Functions are sent to worker processes, so they must be picklable; i.e. defined at the top level of a module
+      rather than lambdas
+    * With *processes=1*, everything runs in the calling process, and any function can be used
+    * With a numeric *typecode*, partitions are stored as *array.array* objects. When run in the default process pool,
+      they are placed in *multiprocessing.shared_memory* segments that workers read without copying or pickling, and
+      the results of **map()** calls with a *typecode* are written into a preallocated shared output segment
+
+    :param partitions: iterable of iterables; one for each partition
+    :param processes: number of worker processes; defaults to the number of CPUs
+    :param pool: object with a **map(** *function, iterable* **)** method to run tasks with, e.g. a
+        *multiprocessing.Pool* that is reused across actions; defaults to a new pool for each action
+    :param typecode: *array.array* typecode of every item, e.g. *'d'* for floats
+
+    >>> from operator import add
+    >>> numbers = Iterable(range(100)).partition(4, by='round_robin')
+    >>> numbers.map(abs).reduce(add)
+    4950
+    """
+
+    def __init__(self, partitions, processes=None, pool=None, typecode=None, stages=(), output_typecode=None):
+        if typecode is None:
+            self.__partitions = [list(partition) for partition in partitions]
+        else:
+            self.__partitions = [partition if isinstance(partition, array.array) and partition.typecode == typecode
+                                 else array.array(typecode, partition) for partition in partitions]
+
+        self.__processes = processes
+        self.__pool = pool
+        self.__typecode = typecode
+        self.__stages = tuple(stages)
+        # typecode of the items once every stage has run, if known
+        self.__output_typecode = typecode if not stages else output_typecode
+
+    def __len__(self):
+        return len(self.__partitions)
+
+    def __with_stage(self, name, function, output_typecode=None):
+        return PartitionedIterable(self.__partitions, self.__processes, self.__pool, self.__typecode,
+                                   self.__stages + ((name, function),), output_typecode)
+
+    def __run(self, stages, output_typecode=None):
+        if not stages:
+            return list(self.__partitions)
+
+        tasks = [(partition, stages) for partition in self.__partitions]
+        if self.__pool is not None:
+            return list(self.__pool.map(_run_stages, tasks))
+        elif self.__processes == 1 or len(tasks) == 1:
+            return [_run_stages(task) for task in tasks]
+
+        if shared_memory is not None and self.__typecode in _SHAREABLE_TYPECODES:
+            return self.__run_shared(stages, output_typecode)
+
+        pool = multiprocessing.Pool(self.__processes)
+        try:
+            return pool.map(_run_stages, tasks)
+        finally:
+            pool.terminate()
+
+    def __run_shared(self, stages, output_typecode):
+        # Only the segment names and offsets are pickled, rather than every item
+        bounds = []
+        total = 0
+        for partition in self.__partitions:
+            bounds.append((total, total + len(partition)))
+            total += len(partition)
+
+        writes_output = output_typecode in _SHAREABLE_TYPECODES and all(name == 'map' for name, _ in stages)
+
+        # Segments are created before the pool, so workers share this process' resource tracker rather than
+        # starting their own, which would report the segments as leaked when the workers exit
+        with _SharedSegment(self.__typecode, total) as source:
+            for partition, (start, stop) in zip(self.__partitions, bounds):
+                source.view[start:stop] = partition
+
+            output = _SharedSegment(output_typecode, total) if writes_output else None
+            try:
+                output_name = (output.segment.name, output_typecode) if output is not None else None
+                tasks = [((source.segment.name, self.__typecode, start, stop), stages, output_name)
+                         for start, stop in bounds]
+
+                pool = multiprocessing.Pool(self.__processes)
+                try:
+                    results = pool.map(_run_shared_stages, tasks)
+                finally:
+                    pool.terminate()
+
+                if output is None:
+                    return results
+
+                return [array.array(output_typecode, output.view[start:stop]) for start, stop in bounds]
+            finally:
+                if output is not None:
+                    output.close()
+
+    # transformations
+    def filter(self, function):
+        """ Equivalent to calling **filter(** *function* **)** on every partition
+
+        :param function: picklable function that returns **False** for items to exclude
+        :return: *PartitionedIterable*
+        """
+        return self.__with_stage('filter', function, self.__output_typecode)
+
+    def map(self, function, typecode=None):
+        """ Equivalent to calling **map(** *function* **)** on every partition
+
+        :param function: picklable function applied to every item
+        :param typecode: *array.array* typecode of every result, so results can be written to shared
+            memory; see *PartitionedIterable*
+        :return: *PartitionedIterable*
+        """
+        return self.__with_stage('map', function, typecode)
+
+    def map_partitions(self, function):
+        """ Replaces every partition with **function(** *partition* **)**
+
+        :param function: picklable function that takes a list of the items in a partition and returns an iterable
+        :return: *PartitionedIterable*
+
+        >>> Iterable(range(10)).partition(2, by='round_robin').map_partitions(sorted).partitions()
+        [[0, 2, 4, 6, 8], [1, 3, 5, 7, 9]]
+        """
+        return self.__with_stage('map_partitions', function)
+
+    def mapmany(self, function):
+        """ Equivalent to calling **mapmany(** *function* **)** on every partition
+
+        :param function: picklable function applied to every item; outputs an iterable
+        :return: *PartitionedIterable*
+        """
+        return self.__with_stage('mapmany', function)
+
+    # actions
+    def aggregate(self, function, combine=None):
+        """ Applies *function* to every partition in parallel, then optionally combines the results
+
+        :param function: picklable function that takes a list of the items in a partition and returns a value
+        :param combine: function that takes two partition results and returns a single value; runs in this process
+        :return: list of results, one for each partition, if *combine* is *None*; otherwise the combined result
+
+        >>> from operator import add
+        >>> Iterable(range(10)).partition(3).aggregate(sum, combine=add)
+        45
+        """
+        results = [result[0] for result in self.__run(self.__stages + (('aggregate', function),))]
+        if combine is None:
+            return results
+
+        return reduce(combine, results)
+
+    def collect(self):
+        """ Runs every pending transformation and gathers the partitions, in order
+
+        :return: *Iterable* of every item of every partition
+        """
+        partitions = self.__run(self.__stages, self.__output_typecode)
+        return Iterable.wrap(list(itertools.chain.from_iterable(partitions)))
+
+    def len(self):
+        """ Counts the items of every partition in parallel
+
+        :return: total number of items
+        """
+        return sum(self.aggregate(len))
+
+    def partitions(self):
+        """ Runs every pending transformation
+
+        :return: list of lists, or of *array.array* objects if the typecode of the items is known; one for each
+            partition
+        """
+        return self.__run(self.__stages, self.__output_typecode)
+
+    def reduce(self, function):
+        """ Reduces every partition with *function* in parallel, then reduces the partition results in this process
+
+        *function* must be associative, as partitions are reduced independently.
+
+        :param function: picklable function that takes two values and returns a single value
+        :return: single value
+
+        :raises TypeError: every partition is empty
+        """
+        results = [partition for partition in self.__run(self.__stages + (('map_partitions', _Reducer(function)),))
+                   if partition]
+
+        return reduce(function, [partition[0] for partition in results])
+
+    def shuffle(self, n=None, by='hash', key=None):
+        """ Runs every pending transformation, then redistributes the items into new partitions
+
+        Use *by='hash'* to place items with equal keys in the same partition before grouping or joining them with
+        **map_partitions()**.
+
+        :param n: number of new partitions; defaults to the current number of partitions
+        :param by: *'hash'*, *'range'*, or *'round_robin'*; see **Iterable.partition()**
+        :param key: function that returns the value to partition each item by; runs in this process
+        :return: *PartitionedIterable*
+        """
+        values = itertools.chain.from_iterable(self.__run(self.__stages, self.__output_typecode))
+        partitions = split(values, n or len(self.__partitions), by=by, key=key)
+        return PartitionedIterable(partitions, self.__processes, self.__pool, self.__output_typecode)
+
+
+class _Reducer(object):
+    # Picklable equivalent of lambda partition: [reduce(function, partition)] if partition else []
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, partition):
+        if not partition:
+            return []
+
+        return [reduce(self.function, partition)]
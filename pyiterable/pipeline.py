@@ -0,0 +1,148 @@
+from pyiterable.adaptive import AdaptiveFilter
+from pyiterable.compiler import compile_pipeline
+
+
+class Pipeline(object):
+    """ Reusable chain of transformations, defined once and applied to any number of inputs
+
+    Every method returns a new *Pipeline* with one more stage, so a *Pipeline* can be shared and extended freely. The
+    stages are compiled into a single loop with *compile_pipeline()* the first time the *Pipeline* runs; later runs
+    reuse the compiled loop, so no *Iterable* is created per stage and the stages are not validated again.
+
+    >>> top_scores = Pipeline().map(lambda row: row['score']).filter(lambda score: score > 80).take(2)
+    >>> top_scores([{'score': 90}, {'score': 50}, {'score': 85}, {'score': 99}]).to_list()
+    [90, 85]
+    >>> [result.to_list() for result in top_scores.run_many([[{'score': 81}], []])]
+    [[81], []]
+    """
+    __slots__ = ('__stages', '__compiled', '__adaptive', '__adaptive_filters')
+
+    def __init__(self, stages=(), adaptive=False):
+        self.__stages = tuple(stages)
+        self.__compiled = None
+        self.__adaptive = adaptive
+        self.__adaptive_filters = []
+
+    def __call__(self, iterable):
+        """ Runs every stage over *iterable*
+
+        :param iterable: input of the first stage
+        :return: *Iterable* of the results
+        """
+        return self.compile()(iterable)
+
+    def __len__(self):
+        return len(self.__stages)
+
+    def __then(self, name, argument):
+        return Pipeline(self.__stages + ((name, argument),), self.__adaptive)
+
+    def adaptive(self, enabled=True):
+        """ Lets each run of adjacent **filter()** stages be merged into an *AdaptiveFilter*, which reorders them by
+        their measured cost and selectivity while the *Pipeline* runs
+
+        Only use this if the filters have no side effects, since they may be called in any order; an element is kept
+        only if every filter keeps it, as before. What the filters have learned carries over between runs.
+
+        :param enabled: False to run filters in the order they were added
+        :return: *Pipeline* with the same stages
+        """
+        return Pipeline(self.__stages, enabled)
+
+    def statistics(self):
+        """ :return: list of **AdaptiveFilter.statistics()** for each run of adjacent filters, in stage order; empty
+            until *self* is compiled, or if it is not **adaptive()** """
+        return [adaptive_filter.statistics() for adaptive_filter in self.__adaptive_filters]
+
+    def compile(self):
+        """ Compiles the stages of *self*, if they have not been compiled yet
+
+        Consecutive **take()** stages are merged into one first, as are consecutive **filter()** stages if *self* is
+        **adaptive()**.
+
+        :return: *CompiledPipeline*
+        """
+        if self.__compiled is None:
+            stages = []
+            for name, argument in self.__stages:
+                if name == 'take' and stages and stages[-1][0] == 'take':
+                    stages[-1] = (name, min(stages[-1][1], argument))
+                elif name == 'filter' and self.__adaptive and stages and stages[-1][0] == 'filters':
+                    stages[-1][1].append(bool if argument is None else argument)
+                elif name == 'filter' and self.__adaptive:
+                    stages.append(('filters', [bool if argument is None else argument]))
+                else:
+                    stages.append((name, argument))
+
+            for i, (name, argument) in enumerate(stages):
+                if name == 'filters':
+                    if len(argument) == 1:
+                        stages[i] = ('filter', argument[0])
+                    else:
+                        stages[i] = ('filter', AdaptiveFilter(argument))
+                        self.__adaptive_filters.append(stages[i][1])
+
+            self.__compiled = compile_pipeline(stages)
+
+        return self.__compiled
+
+    def run_many(self, iterables):
+        """ Runs every stage over each of *iterables*
+
+        :param iterables: iterable of inputs
+        :return: list of *Iterable* objects; one for each input, in order
+        """
+        compiled = self.compile()
+        return [compiled(iterable) for iterable in iterables]
+
+    def stages(self):
+        """ :return: tuple of the *(name, argument)* stages of *self*, in the order they run """
+        return self.__stages
+
+    # transformations
+    def enumerate(self, start=0):
+        """ Equivalent to **Iterable.enumerate(** *start* **)**
+
+        :param start: first index
+        :return: *Pipeline*
+        """
+        return self.__then('enumerate', start)
+
+    def filter(self, function=None):
+        """ Equivalent to **Iterable.filter(** *function* **)**
+
+        :param function: function that returns **False** for items to exclude; if *None*, false items are excluded
+        :return: *Pipeline*
+        """
+        return self.__then('filter', function)
+
+    def map(self, function):
+        """ Equivalent to **Iterable.map(** *function* **)**
+
+        :param function: function applied to every item
+        :return: *Pipeline*
+        """
+        return self.__then('map', function)
+
+    def take(self, count):
+        """ Equivalent to **Iterable.take(** *count* **)**, except that the input is never copied
+
+        :param count: number of items to take
+        :return: *Pipeline*
+
+        :raises ValueError: *count* is a negative value
+        """
+        if count < 0:
+            raise ValueError("'count' must be greater than 0")
+
+        return self.__then('take', count)
+
+    def zip(self, iterable):
+        """ Equivalent to **Iterable.zip(** *iterable* **)**
+
+        *iterable* is iterated again from the start on every run, so it should be a sequence rather than an iterator.
+
+        :param iterable: iterable paired with the items
+        :return: *Pipeline*
+        """
+        return self.__then('zip', iterable)
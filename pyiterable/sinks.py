@@ -0,0 +1,172 @@
+""" Sinks that write the elements of an *Iterable* as they are read, one batch at a time, so memory stays flat """
+import collections
+import csv
+import io
+import itertools
+import json
+from multiprocessing.pool import ThreadPool
+
+from pyiterable.sources import _quote
+
+
+# Elements encoded at a time, and bytes written to the file at a time
+BATCH_SIZE = 1000
+_BUFFER_SIZE = 1 << 20
+
+_missing = object()
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+
+        yield batch
+
+
+def _encoded(batches, encode, threads):
+    # Encodes *batches* in order; with *threads*, up to twice as many batches are encoded ahead of the one written
+    if not threads:
+        for batch in batches:
+            yield encode(batch)
+        return
+
+    pool = ThreadPool(threads)
+    try:
+        pending = collections.deque()
+        for batch in batches:
+            pending.append(pool.apply_async(encode, (batch,)))
+            if len(pending) >= threads * 2:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+
+
+def write_text(iterable, path, encode, encoding='utf-8', batch_size=BATCH_SIZE, threads=0, header=''):
+    """ Writes *iterable* to a text file, encoding it a batch at a time
+
+    :param iterable: elements to write
+    :param path: path of the file to write
+    :param encode: function that takes a list of elements and returns their text
+    :param encoding: text encoding of the file
+    :param batch_size: number of elements encoded at a time
+    :param threads: number of threads that encode batches while earlier ones are written; 0 encodes them in this
+        thread
+    :param header: text written before the elements
+    :return: number of elements written
+    """
+    count = [0]
+
+    def counted(batch):
+        count[0] += len(batch)
+        return batch
+
+    with io.open(path, 'w', encoding=encoding, newline='', buffering=_BUFFER_SIZE) as f:
+        f.write(header)
+        for text in _encoded(map(counted, _batches(iterable, batch_size)), encode, threads):
+            f.write(text)
+
+    return count[0]
+
+
+class LineEncoder(object):
+    """ Encodes a batch as **function(** *element* **)** on a line for each element """
+
+    def __init__(self, function=str, separator='\n'):
+        self.function = function
+        self.separator = separator
+
+    def __call__(self, batch):
+        return ''.join([self.function(element) + self.separator for element in batch])
+
+
+class CsvEncoder(object):
+    """ Encodes a batch as CSV rows; dicts are written with *csv.DictWriter*, other rows with *csv.writer* """
+
+    def __init__(self, columns=None, format=None):
+        self.columns = columns
+        self.format = dict(format or {})
+
+    def header(self):
+        """ :return: text of the header row, or an empty string if there are no *columns* """
+        if self.columns is None:
+            return ''
+
+        buffer = io.StringIO()
+        csv.writer(buffer, **self.format).writerow(self.columns)
+        return buffer.getvalue()
+
+    def __call__(self, batch):
+        buffer = io.StringIO()
+        if self.columns is not None and batch and isinstance(batch[0], dict):
+            csv.DictWriter(buffer, self.columns, **self.format).writerows(batch)
+        else:
+            csv.writer(buffer, **self.format).writerows(batch)
+
+        return buffer.getvalue()
+
+
+def _json_lines(batch):
+    encode = json.JSONEncoder().encode
+    return ''.join([encode(element) + '\n' for element in batch])
+
+
+def write_csv(iterable, path, columns=None, encoding='utf-8', batch_size=BATCH_SIZE, threads=0, **kwargs):
+    """ Writes *iterable* as CSV rows; see **Iterable.to_csv()**
+
+    :return: number of rows written, excluding the header
+    """
+    iterator = iter(iterable)
+    first = next(iterator, _missing)
+    if first is _missing:
+        rows = []
+    else:
+        rows = itertools.chain([first], iterator)
+        if columns is None and isinstance(first, dict):
+            columns = list(first)
+
+    encoder = CsvEncoder(columns, kwargs)
+    return write_text(rows, path, encoder, encoding, batch_size, threads, encoder.header())
+
+
+def write_jsonl(iterable, path, encoding='utf-8', batch_size=BATCH_SIZE, threads=0):
+    """ Writes *iterable* as JSON Lines; see **Iterable.to_jsonl()**
+
+    :return: number of lines written
+    """
+    return write_text(iterable, path, _json_lines, encoding, batch_size, threads)
+
+
+def write_sqlite(iterable, connection, table, columns=None, batch_size=BATCH_SIZE):
+    """ Inserts *iterable* into a SQLite table with **executemany()**; see **Iterable.to_sqlite()**
+
+    :return: number of rows inserted
+    """
+    count = 0
+    statement = None
+    with connection:
+        for batch in _batches(iterable, batch_size):
+            if statement is None:
+                if columns is None and isinstance(batch[0], dict):
+                    columns = list(batch[0])
+
+                width = len(columns) if columns is not None else len(batch[0])
+                if columns is not None:
+                    names = ', '.join(map(_quote, columns))
+                    connection.execute('CREATE TABLE IF NOT EXISTS {} ({})'.format(_quote(table), names))
+                    statement = 'INSERT INTO {} ({}) VALUES ({})'.format(_quote(table), names, ', '.join('?' * width))
+                else:
+                    statement = 'INSERT INTO {} VALUES ({})'.format(_quote(table), ', '.join('?' * width))
+
+            if isinstance(batch[0], dict):
+                batch = [[row.get(column) for column in columns] for row in batch]
+
+            connection.executemany(statement, batch)
+            count += len(batch)
+
+    return count
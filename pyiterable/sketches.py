@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import math
+
+
+class TDigest(object):
+    """ Streaming, mergeable sketch for approximate quantiles (Dunning's merging t-digest)
+
+    Values are buffered and periodically compressed into at most ~*compression* weighted centroids, so memory
+    stays bounded no matter how many values are added. Centroids near the tails are kept small, which makes extreme
+    quantiles such as p99 more accurate than the median.
+
+    :param compression: accuracy parameter; larger values keep more centroids and give more accurate results
+
+    :raises ValueError: *compression* is not a positive number
+
+    >>> digest = TDigest()
+    >>> for latency in [12, 15, 11, 90, 14, 13]:
+    ...     digest.add(latency)
+    >>> digest.quantile(0.5)
+    13.5
+    """
+
+    def __init__(self, compression=100):
+        if compression <= 0:
+            raise ValueError("'compression' must be greater than 0")
+
+        self.compression = compression
+        self._means = []
+        self._weights = []
+        self._buffer = []
+        self._buffer_size = max(int(compression) * 5, 10)
+        self._count = 0
+        self._min = None
+        self._max = None
+
+    def __len__(self):
+        return int(self._count)
+
+    @classmethod
+    def from_iterable(cls, iterable, compression=100):
+        """ Creates a *TDigest* containing every value of *iterable*, in a single pass
+
+        :param iterable: iterable of numbers
+        :param compression: accuracy parameter; see *TDigest*
+        :return: *TDigest*
+        """
+        digest = cls(compression)
+        for value in iterable:
+            digest.add(value)
+
+        return digest
+
+    @property
+    def count(self):
+        """ Total weight of all values added to the sketch """
+        return self._count
+
+    def add(self, value, weight=1):
+        """ Adds *value* to the sketch
+
+        :param value: number to add
+        :param weight: number of times *value* was observed
+        """
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+        self._count += weight
+        self._buffer.append((value, weight))
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        """ Merges *other* into *self*, e.g. to combine sketches built independently over different partitions
+
+        :param other: *TDigest*
+        :return: *self*
+        """
+        other._compress()
+        for mean, weight in zip(other._means, other._weights):
+            self._buffer.append((mean, weight))
+
+        if other._count:
+            self._count += other._count
+            if self._min is None or other._min < self._min:
+                self._min = other._min
+            if self._max is None or other._max > self._max:
+                self._max = other._max
+
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """ Estimates the value at quantile *q*
+
+        :param q: quantile between 0 and 1 inclusive
+        :return: estimated value at *q*, linearly interpolated between centroids
+
+        :raises ValueError: *q* is out of range, or the sketch is empty
+        """
+        if q < 0 or q > 1:
+            raise ValueError("'q' must be between 0 and 1")
+        if not self._count:
+            raise ValueError("quantile of empty sketch")
+
+        self._compress()
+
+        # Each centroid sits at the (0-based) rank of its centre; for single-value centroids this is exactly the
+        # "linear" definition used by method='exact', i.e. rank = q * (n - 1)
+        rank = q * (self._count - 1)
+        previous_rank = 0
+        previous_mean = self._min
+        cumulative = 0
+        for mean, weight in zip(self._means, self._weights):
+            centre = cumulative + (weight - 1) / 2.0
+            if rank <= centre:
+                return self._interpolate(previous_rank, previous_mean, centre, mean, rank)
+
+            previous_rank, previous_mean = centre, mean
+            cumulative += weight
+
+        return self._interpolate(previous_rank, previous_mean, self._count - 1, self._max, rank)
+
+    @staticmethod
+    def _interpolate(left_rank, left_value, right_rank, right_value, rank):
+        if right_rank <= left_rank:
+            return right_value
+
+        fraction = (rank - left_rank) / float(right_rank - left_rank)
+        return left_value + (right_value - left_value) * fraction
+
+    def _k(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _q_limit(self, q):
+        k = self._k(q) + 1
+        if k >= self.compression / 4.0:
+            return 1.0
+
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2.0
+
+    def _compress(self):
+        if not self._buffer:
+            return
+
+        items = sorted(list(zip(self._means, self._weights)) + self._buffer, key=lambda item: item[0])
+        self._buffer = []
+
+        total = float(self._count)
+        means = []
+        weights = []
+        current_mean, current_weight = items[0]
+        weight_so_far = 0
+        weight_limit = total * self._q_limit(0)
+        for mean, weight in items[1:]:
+            if weight_so_far + current_weight + weight <= weight_limit:
+                current_weight += weight
+                current_mean += (mean - current_mean) * weight / float(current_weight)
+            else:
+                means.append(current_mean)
+                weights.append(current_weight)
+                weight_so_far += current_weight
+                weight_limit = total * self._q_limit(weight_so_far / total)
+                current_mean, current_weight = mean, weight
+
+        means.append(current_mean)
+        weights.append(current_weight)
+
+        self._means = means
+        self._weights = weights
+
+
+def _open_unit_random(rng):
+    # random() is in [0, 1); the reservoir algorithms below take logarithms, so exclude 0
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+
+    return value
+
+
+def reservoir_sample(iterable, k, rng):
+    """ Draws a uniform random sample of *k* elements from *iterable* in one pass, using O(k) memory
+
+    Uses Li's Algorithm L, which skips ahead geometrically instead of drawing a random number per element.
+
+    :param iterable: iterable to sample from; consumed once
+    :param k: sample size
+    :param rng: *random.Random* instance
+    :return: list of at most *k* elements
+    """
+    iterator = iter(iterable)
+    reservoir = list(itertools.islice(iterator, k))
+    if len(reservoir) < k or k == 0:
+        return reservoir
+
+    w = math.exp(math.log(_open_unit_random(rng)) / k)
+    while True:
+        skip = int(math.log(_open_unit_random(rng)) / math.log(1 - w)) if w < 1 else 0
+        for element in itertools.islice(iterator, skip, skip + 1):
+            reservoir[rng.randrange(k)] = element
+            break
+        else:
+            return reservoir
+
+        w *= math.exp(math.log(_open_unit_random(rng)) / k)
+
+
+def _paired(iterable, weights):
+    # Like zip(), but raises ValueError instead of stopping at the end of the shorter one
+    missing = object()
+    weights = iter(weights)
+    for element in iterable:
+        weight = next(weights, missing)
+        if weight is missing:
+            raise ValueError("'weights' must have one weight for each element")
+
+        yield element, weight
+
+    if next(weights, missing) is not missing:
+        raise ValueError("'weights' must have one weight for each element")
+
+
+def weighted_reservoir_sample(iterable, weights, k, rng):
+    """ Draws a weighted random sample of *k* elements from *iterable* without replacement, in one pass using O(k)
+    memory
+
+    Uses Efraimidis and Spirakis' A-Res: every element gets the key **u ** (1 / weight)** and the *k* largest keys
+    are kept in a heap. Keys are compared in log space for numerical stability.
+
+    :param iterable: iterable to sample from; consumed once
+    :param weights: function that returns the non-negative weight of an element, called in the same pass; or
+        iterable of non-negative weights, one for each element of *iterable*
+    :param k: sample size
+    :param rng: *random.Random* instance
+    :return: list of at most *k* elements
+
+    :raises ValueError: a weight is negative, or *weights* has a different number of weights than *iterable* has
+        elements
+    """
+    if k == 0:
+        return []
+
+    if callable(weights):
+        pairs = ((element, weights(element)) for element in iterable)
+    else:
+        pairs = _paired(iterable, weights)
+
+    heap = []
+    for position, (element, weight) in enumerate(pairs):
+        if weight < 0:
+            raise ValueError("weights must not be negative")
+        if weight == 0:
+            continue
+
+        key = math.log(_open_unit_random(rng)) / weight
+        if len(heap) < k:
+            heapq.heappush(heap, (key, position, element))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, position, element))
+
+    return [element for _, _, element in heap]
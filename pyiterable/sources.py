@@ -0,0 +1,458 @@
+""" Sources read lazily by *Iterable*, which run some of its operations while they read: files that project columns
+and evaluate filters while they are scanned, and SQLite queries that operations are translated into """
+import csv
+import io
+import itertools
+import json
+import sqlite3
+import string
+
+from pyiterable.expressions import Column, Literal, Method, Operation
+from pyiterable.iterable import _Pushdown
+
+
+# Rows or lines parsed at a time, and bytes read from the file at a time
+_CHUNK_SIZE = 4096
+_BUFFER_SIZE = 1 << 20
+
+# Characters that every JSON encoder writes as-is inside a string
+_JSON_UNESCAPED = frozenset(string.ascii_letters + string.digits + ' -_.:@')
+
+
+# Python comparisons with the same result in SQLite; == and != are IS and IS NOT, which treat NULL like None
+_SQL_COMPARISONS = {
+    'lt': '<',
+    'le': '<=',
+    'eq': 'IS',
+    'ne': 'IS NOT',
+    'ge': '>=',
+    'gt': '>',
+}
+
+_SQL_PARAMETER_TYPES = (bool, int, float, str, bytes, type(None))
+
+
+def _chunks(iterator):
+    while True:
+        chunk = list(itertools.islice(iterator, _CHUNK_SIZE))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _conjuncts(expression):
+    # Splits a & b & c into [a, b, c]
+    if isinstance(expression, Operation) and expression.name == 'and':
+        return [conjunct for operand in expression.operands for conjunct in _conjuncts(operand)]
+
+    return [expression]
+
+
+def _json_tokens(expression):
+    # Text that must appear in a line for *expression* to be true on its object: strings compared with ==
+    tokens = []
+    for conjunct in _conjuncts(expression):
+        if not isinstance(conjunct, Operation) or conjunct.name != 'eq':
+            continue
+
+        # Only a field compared as-is; e.g. col('level').lower() == 'error' is true for "ERROR" too
+        literals = [operand.value for operand in conjunct.operands if isinstance(operand, Literal)]
+        columns = [operand for operand in conjunct.operands if isinstance(operand, Column)]
+        if len(literals) == 1 and len(columns) == 1:
+            value = literals[0]
+            if isinstance(value, str) and value and set(value) <= _JSON_UNESCAPED:
+                tokens.append(json.dumps(value))
+
+    return tokens
+
+
+class _FileSource(_Pushdown):
+    # Reads the *keys* of each record; *predicate* is an Expression over those keys, or None
+
+    def __init__(self, path, keys, encoding, predicate=None):
+        self.path = path
+        self.keys = None if keys is None else list(keys)
+        self.encoding = encoding
+        self.predicate = predicate
+
+    def _with_predicate(self, predicate):
+        # Copy of *self* that also evaluates *predicate*, or None if the format cannot evaluate it while it reads
+        return None
+
+    def filter(self, expression):
+        # Filters over keys that were not read must raise KeyError as usual, so they are not pushed down
+        if self.keys is not None and not expression.columns() <= set(self.keys):
+            return None
+
+        return self._with_predicate(expression if self.predicate is None else self.predicate & expression)
+
+    def _open(self):
+        return io.open(self.path, 'r', encoding=self.encoding, newline='', buffering=_BUFFER_SIZE)
+
+
+class CsvSource(_FileSource):
+    """ Rows of a CSV file with a header row, read by **Iterable.from_csv()** """
+
+    def __init__(self, path, columns, types, encoding, format, predicate=None):
+        super(CsvSource, self).__init__(path, columns, encoding, predicate)
+        self.types = dict(types or {})
+        self.format = dict(format)
+
+    def _with_predicate(self, predicate):
+        return CsvSource(self.path, self.keys, self.types, self.encoding, self.format, predicate)
+
+    def __iter__(self):
+        with self._open() as f:
+            reader = csv.reader(f, **self.format)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            columns = header if self.keys is None else self.keys
+            # A column named more than once reads its last value, like csv.DictReader does
+            positions = dict((column, i) for i, column in enumerate(header))
+            missing = [column for column in columns if column not in positions]
+            if missing:
+                raise ValueError("columns not in header of '{}': {}".format(self.path, ', '.join(missing)))
+
+            names = [(column, positions[column]) for column in columns]
+            width = len(header)
+
+            # Columns in the predicate are converted first, and the rest only for rows that pass it
+            predicate = None
+            tested = frozenset()
+            if self.predicate is not None:
+                predicate = self.predicate._rekey(positions).compile()
+                tested = frozenset(positions[column] for column in self.predicate.columns())
+            converters = [(positions[column], self.types[column]) for column in set(columns) if column in self.types]
+            before = [(i, convert) for i, convert in converters if i in tested]
+            after = [(i, convert) for i, convert in converters if i not in tested]
+
+            for chunk in _chunks(reader):
+                for row in chunk:
+                    if not row:
+                        # Blank lines are skipped, like csv.DictReader does
+                        continue
+                    if len(row) < width:
+                        # Missing values are None, like csv.DictReader gives, and are not converted
+                        row.extend([None] * (width - len(row)))
+
+                    for i, convert in before:
+                        if row[i] is not None:
+                            row[i] = convert(row[i])
+                    if predicate is not None and not predicate(row):
+                        continue
+                    for i, convert in after:
+                        if row[i] is not None:
+                            row[i] = convert(row[i])
+
+                    yield dict((column, row[i]) for column, i in names)
+
+
+class JsonLinesSource(_FileSource):
+    """ Objects on the lines of a JSON Lines file, read by **Iterable.from_jsonl()** """
+
+    def _with_predicate(self, predicate):
+        return JsonLinesSource(self.path, self.keys, self.encoding, predicate)
+
+    def __iter__(self):
+        fields = self.keys
+        predicate = None if self.predicate is None else self.predicate.compile()
+        tokens = [] if self.predicate is None else _json_tokens(self.predicate)
+        decode = json.JSONDecoder().decode
+
+        with self._open() as f:
+            for chunk in _chunks(f):
+                if tokens:
+                    chunk = [line for line in chunk if all(token in line for token in tokens)]
+
+                for line in chunk:
+                    if not line.strip():
+                        continue
+
+                    record = decode(line)
+                    if fields is not None:
+                        record = dict((field, record.get(field)) for field in fields)
+                    if predicate is None or predicate(record):
+                        yield record
+
+
+def _quote(name):
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _to_sql(expression, parameters, condition=False):
+    # Returns SQL equivalent to *expression*, appending its constants to *parameters*; or None if there is none
+    #
+    # Values are only columns and constants: SQL arithmetic differs from Python's for text, e.g. 'a' + 'b' is 0. A
+    # condition is a comparison, isin(), startswith(), or endswith(), or AND, OR, and NOT of conditions; SQL's truth
+    # of other values differs from Python's, e.g. non-empty text is false.
+    if isinstance(expression, Column):
+        return _quote(expression.key) if isinstance(expression.key, str) and not condition else None
+
+    if isinstance(expression, Literal):
+        if type(expression.value) not in _SQL_PARAMETER_TYPES or condition:
+            return None
+
+        parameters.append(expression.value)
+        return '?'
+
+    if not condition:
+        return None
+
+    if isinstance(expression, Method):
+        prefix = expression.args[0] if expression.args else None
+        if expression.name not in ('startswith', 'endswith') or not isinstance(prefix, str) or not prefix:
+            return None
+
+        target = _to_sql(expression.target, parameters)
+        if target is None:
+            return None
+
+        parameters.extend([len(prefix) if expression.name == 'startswith' else -len(prefix), prefix])
+        if expression.name == 'startswith':
+            return 'substr({}, 1, ?) = ?'.format(target)
+        return 'substr({}, ?) = ?'.format(target)
+
+    if not isinstance(expression, Operation):
+        return None
+
+    name = expression.name
+    if name == 'isin':
+        values = expression.operands[1].value
+        if any(type(value) not in _SQL_PARAMETER_TYPES or value is None for value in values):
+            return None
+
+        target = _to_sql(expression.operands[0], parameters)
+        if target is None:
+            return None
+
+        parameters.extend(values)
+        return '({} IN ({}))'.format(target, ', '.join('?' * len(values)))
+
+    if name not in _SQL_COMPARISONS and name not in ('and', 'or', 'not'):
+        return None
+
+    # Operands of AND, OR, and NOT are conditions; those of comparisons are values
+    is_logical = name not in _SQL_COMPARISONS
+    operands = []
+    for operand in expression.operands:
+        operands.append(_to_sql(operand, parameters, condition=is_logical))
+        if operands[-1] is None:
+            return None
+
+    if name == 'not':
+        return '(NOT {})'.format(operands[0])
+
+    return '({} {} {})'.format(operands[0], _SQL_COMPARISONS.get(name, name.upper()), operands[1])
+
+
+class SqliteSource(_Pushdown):
+    """ Rows of a SQLite table or query, read by **Iterable.from_sqlite()**
+
+    Operations are translated into a single SELECT statement around the table or query, in the order SQL runs them:
+    WHERE, DISTINCT, ORDER BY, then LIMIT and OFFSET. An operation that would have to run out of that order, e.g. a
+    filter after **take()**, is not pushed down, and runs in Python on the rows instead.
+    """
+
+    def __init__(self, connection, query, parameters=(), batch_size=1000, value=None, alias='value', where=(),
+                 is_distinct=False, order=(), limit=None, offset=0):
+        self.connection = connection
+        self.query = query
+        self.parameters = tuple(parameters)
+        self.batch_size = batch_size
+        # (sql, parameters) of the expression each row is mapped to, or None for rows as dicts
+        self.value = value
+        # Name the mapped values are selected as; it is not a column of *query*, so ORDER BY terms over the columns
+        # of *query* do not refer to it instead
+        self.alias = alias
+        # (sql, parameters) conditions
+        self.where = tuple(where)
+        self.is_distinct = is_distinct
+        # (sql, parameters, descending) terms; earlier terms sort first
+        self.order = tuple(order)
+        self.limit = limit
+        self.offset = offset
+
+    def __replace(self, **changes):
+        state = dict(connection=self.connection, query=self.query, parameters=self.parameters,
+                     batch_size=self.batch_size, value=self.value, alias=self.alias, where=self.where,
+                     is_distinct=self.is_distinct, order=self.order, limit=self.limit, offset=self.offset)
+        state.update(changes)
+        return SqliteSource(**state)
+
+    def __is_sliced(self):
+        return self.limit is not None or self.offset
+
+    def statement(self):
+        """ :return: *(sql, parameters)* of the SELECT statement that reads the rows """
+        parameters = []
+        if self.value is None:
+            columns = '*'
+        else:
+            columns = '{} AS "{}"'.format(self.value[0], self.alias)
+            parameters.extend(self.value[1])
+
+        sql = 'SELECT {}{} FROM ({})'.format('DISTINCT ' if self.is_distinct else '', columns, self.query)
+        parameters.extend(self.parameters)
+        if self.where:
+            sql += ' WHERE ' + ' AND '.join(condition for condition, _ in self.where)
+            for _, condition_parameters in self.where:
+                parameters.extend(condition_parameters)
+        if self.order:
+            sql += ' ORDER BY ' + ', '.join(term + (' DESC' if descending else '') for term, _, descending in self.order)
+            for _, term_parameters, _ in self.order:
+                parameters.extend(term_parameters)
+        if self.__is_sliced():
+            sql += ' LIMIT ? OFFSET ?'
+            parameters.extend([-1 if self.limit is None else self.limit, self.offset])
+
+        return sql, parameters
+
+    def __iter__(self):
+        sql, parameters = self.statement()
+        cursor = self.connection.execute(sql, parameters)
+        try:
+            names = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    return
+
+                for row in rows:
+                    yield row[0] if self.value is not None else dict(zip(names, row))
+        finally:
+            cursor.close()
+
+    def __scalar(self, sql):
+        # Runs *sql* with the statement of *self* in place of {}, and returns its only row
+        statement, parameters = self.statement()
+        cursor = self.connection.execute(sql.format(statement), parameters)
+        try:
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def __term(self, key):
+        # (sql, parameters) of *key* over the rows: a column expression, or None for the mapped values themselves
+        if key is None:
+            return None if self.value is None else ('"{}"'.format(self.alias), [])
+        if self.value is not None:
+            return None
+
+        parameters = []
+        sql = _to_sql(key, parameters)
+        return None if sql is None else (sql, parameters)
+
+    # transformations
+    def distinct(self):
+        # With DISTINCT, SQL does not define an order by terms that are not in the output
+        if self.__is_sliced() or (self.value is not None and self.order):
+            return None
+
+        return self.__replace(is_distinct=True)
+
+    def filter(self, expression):
+        if self.value is not None or self.is_distinct or self.__is_sliced():
+            return None
+
+        parameters = []
+        sql = _to_sql(expression, parameters, condition=True)
+        if sql is None:
+            return None
+
+        return self.__replace(where=self.where + ((sql, parameters),))
+
+    def map(self, expression):
+        if self.value is not None or self.is_distinct:
+            return None
+
+        parameters = []
+        sql = _to_sql(expression, parameters)
+        if sql is None:
+            return None
+
+        # Terms already in ORDER BY still refer to the columns of the query that is selected from
+        return self.__replace(value=(sql, parameters), alias=self.__unused_name())
+
+    def __unused_name(self):
+        cursor = self.connection.execute('SELECT * FROM ({}) LIMIT 0'.format(self.query), self.parameters)
+        try:
+            columns = set(description[0].lower() for description in cursor.description)
+        finally:
+            cursor.close()
+
+        name = 'value'
+        suffix = 0
+        while name in columns:
+            suffix += 1
+            name = 'value_{}'.format(suffix)
+
+        return name
+
+    def skip(self, count):
+        limit = None if self.limit is None else max(self.limit - count, 0)
+        return self.__replace(limit=limit, offset=self.offset + count)
+
+    def sorted(self, key, reverse):
+        term = self.__term(key)
+        if term is None or self.__is_sliced():
+            return None
+
+        # Sorting again is stable in Python, so the previous order breaks ties
+        return self.__replace(order=((term[0], term[1], reverse),) + self.order)
+
+    def take(self, count):
+        return self.__replace(limit=count if self.limit is None else min(self.limit, count))
+
+    # aggregates
+    def len(self):
+        return self.__scalar('SELECT COUNT(*) FROM ({})')[0]
+
+    def max(self, key):
+        return self.__endpoint(key, largest=True)
+
+    def min(self, key):
+        return self.__endpoint(key, largest=False)
+
+    def __endpoint(self, key, largest):
+        term = self.__term(key)
+        if term is None:
+            return NotImplemented
+
+        sql, parameters = self.statement()
+        # Python's min() and max() cannot compare None with other keys, so rows with NULL keys are left to Python
+        cursor = self.connection.execute('SELECT EXISTS (SELECT 1 FROM ({}) WHERE {} IS NULL)'.format(sql, term[0]),
+                                         parameters + list(term[1]))
+        try:
+            has_null = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        if has_null:
+            return NotImplemented
+
+        value = None if self.value is None else (term[0], [])
+        rows = list(SqliteSource(self.connection, sql, parameters, value=value, alias=self.alias,
+                                 order=((term[0], term[1], largest),), limit=1))
+        if not rows:
+            # Python's min() and max() raise, or return their default, for nothing
+            return NotImplemented
+
+        return rows[0]
+
+    def sum(self, start):
+        if self.value is None:
+            return NotImplemented
+
+        # SUM() skips NULLs and reads text as numbers, where Python's sum() raises, so only numbers are summed in SQL;
+        # integers that overflow 64 bits are left to Python too
+        sql = "SELECT SUM({0}), MIN(typeof({0}) IN ('integer', 'real')) FROM ({{}})".format('"{}"'.format(self.alias))
+        try:
+            total, numeric = self.__scalar(sql)
+        except sqlite3.OperationalError:
+            return NotImplemented
+        if numeric == 0:
+            return NotImplemented
+
+        return start if total is None else start + total
@@ -18,6 +18,7 @@ setup(
     author_email='mark.tse@neverendingqs.com',
     license='MIT',
     packages=['pyiterable'],
+    extras_require={'arrow': ['pyarrow>=14'], 'numpy': ['numpy']},
     test_suite='nose.collector',
     tests_require=['nose', 'unittest2'],
     zip_safe=False
@@ -0,0 +1,57 @@
+from unittest2 import TestCase
+import random
+
+from pyiterable import AdaptiveFilter, Iterable, Pipeline
+
+
+class TestAdaptiveFilter(TestCase):
+
+    def setUp(self):
+        generator = random.Random(3)
+        self.__values = [generator.randint(0, 999) for _ in range(4000)]
+
+    def test_call_keepsElementsEveryPredicateKeeps(self):
+        predicates = [lambda x: x % 2 == 0, lambda x: x > 500, lambda x: x % 3 != 0]
+        matches = AdaptiveFilter(predicates, sample_every=4, reorder_every=2)
+
+        self.assertEqual(
+            [x for x in self.__values if all(predicate(x) for predicate in predicates)],
+            Iterable(self.__values).filter(matches).to_list()
+        )
+
+    def test_call_selectivePredicateMovesFirst(self):
+        keeps_most = lambda x: x != 7
+        keeps_few = lambda x: x < 10
+        matches = AdaptiveFilter([keeps_most, keeps_few])
+
+        Iterable(self.__values).filter(matches).len()
+        statistics = matches.statistics()
+
+        self.assertEqual([keeps_few, keeps_most], statistics['order'])
+        self.assertGreaterEqual(statistics['reorders'], 1)
+        self.assertEqual(4000, statistics['evaluated'])
+        self.assertEqual(250, statistics['sampled'])
+        self.assertEqual([250, 250], [predicate['calls'] for predicate in statistics['predicates']])
+        self.assertLess(statistics['predicates'][1]['selectivity'], 0.1)
+
+    def test_init_invalidSampling_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            AdaptiveFilter([bool], sample_every=0)
+        with self.assertRaises(ValueError):
+            AdaptiveFilter([bool], reorder_every=0)
+
+    def test_pipeline_adaptive_mergesAdjacentFilters(self):
+        pipeline = Pipeline().filter(lambda x: x != 7).filter(lambda x: x < 10).map(str).filter().adaptive()
+
+        self.assertEqual(
+            [str(x) for x in self.__values if x < 10 and x != 7],
+            pipeline(self.__values).to_list()
+        )
+        self.assertEqual(1, len(pipeline.statistics()))
+        self.assertEqual(4000, pipeline.statistics()[0]['evaluated'])
+
+    def test_pipeline_notAdaptive_hasNoStatistics(self):
+        pipeline = Pipeline().filter(lambda x: x != 7).filter(lambda x: x < 10)
+
+        self.assertEqual([1, 2], pipeline([1, 7, 2, 30]).to_list())
+        self.assertEqual([], pipeline.statistics())
@@ -0,0 +1,101 @@
+from unittest2 import skipIf, TestCase
+import os
+import shutil
+import tempfile
+
+from pyiterable import col, Iterable
+from pyiterable.arrow import pyarrow
+
+
+@skipIf(pyarrow is None, "requires pyarrow")
+class TestArrow(TestCase):
+
+    def setUp(self):
+        self.__rows = [{'name': 'Ann', 'score': 90}, {'name': 'Bob', 'score': 70}, {'name': 'Abe', 'score': 85}]
+        self.__table = pyarrow.Table.from_pylist(self.__rows)
+        self.__directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def test_fromArrow_table_readsRowsAsDicts(self):
+        self.assertEqual(self.__rows, Iterable.from_arrow(self.__table).to_list())
+
+    def test_fromArrow_reader_canBeIteratedTwice(self):
+        reader = pyarrow.RecordBatchReader.from_batches(self.__table.schema, self.__table.to_batches(max_chunksize=1))
+        rows = Iterable.from_arrow(reader)
+
+        self.assertEqual(self.__rows, rows.to_list())
+        self.assertEqual(self.__rows, rows.to_list())
+
+    def test_filterAndMap_matchPython(self):
+        rows = Iterable(self.__rows)
+        arrow = Iterable.from_arrow(self.__table)
+        cases = [
+            lambda i: i.filter(col('score') > 80).map(col('name')),
+            lambda i: i.filter((col('score') * 2 >= 170) & ~col('name').isin(['Ann'])),
+            lambda i: i.filter(col('name').startswith('A')),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(case(rows).to_list(), case(arrow).to_list())
+
+    def test_filter_nullsAndTruthiness_matchPython(self):
+        rows = [{'x': 'a', 'y': 'a', 'n': 1}, {'x': None, 'y': None, 'n': 0}, {'x': 'b', 'y': 'c', 'n': 2},
+                {'x': '', 'y': None, 'n': 3}]
+        arrow = Iterable.from_arrow(pyarrow.Table.from_pylist(rows))
+        cases = [
+            lambda i: i.filter(col('x') != 'a'),
+            lambda i: i.filter(~(col('x') == 'a')),
+            lambda i: i.filter(col('x') == col('y')),
+            lambda i: i.filter(col('x') != col('y')),
+            lambda i: i.filter(col('x')),
+            lambda i: i.filter(col('n') & (col('x') != 'b')),
+            lambda i: i.filter(~col('x') | (col('n') > 1)),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(case(Iterable(rows)).to_list(), case(arrow).to_list())
+
+    def test_filter_arithmetic_matchesPython(self):
+        rows = [{'name': 'ab', 'n': 2 ** 62}, {'name': 'c', 'n': -1}]
+        arrow = Iterable.from_arrow(pyarrow.Table.from_pylist(rows))
+        cases = [
+            lambda i: i.filter(col('n') * 4 > 0),
+            lambda i: i.filter(col('name') + 'x' == 'abx'),
+            lambda i: i.filter((col('n') - 1 < 0) | (col('n') + 1 > 5)),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(case(Iterable(rows)).to_list(), case(arrow).to_list())
+
+    def test_toArrow_fromArrowSource_keepsColumns(self):
+        table = Iterable.from_arrow(self.__table).filter(col('score') > 80).to_arrow()
+
+        self.assertEqual(['Ann', 'Abe'], table.column('name').to_pylist())
+
+    def test_toArrow_fromRows_buildsTable(self):
+        self.assertTrue(self.__table.equals(Iterable(self.__rows).to_arrow()))
+        self.assertEqual([1, 2], Iterable([1, 2]).to_arrow().column('value').to_pylist())
+
+    def test_parquetAndIpc_roundTrip(self):
+        for extension in ['parquet', 'arrow']:
+            with self.subTest(extension=extension):
+                path = os.path.join(self.__directory, 'scores.' + extension)
+                if extension == 'parquet':
+                    Iterable(self.__rows).to_parquet(path)
+                    rows = Iterable.from_parquet(path, columns=['score'])
+                    self.assertEqual([{'score': 90}, {'score': 70}, {'score': 85}], rows.to_list())
+                else:
+                    Iterable(self.__rows).to_ipc(path)
+                    self.assertEqual(self.__rows, Iterable.from_ipc(path).to_list())
+
+
+@skipIf(pyarrow is not None, "pyarrow is installed")
+class TestArrowWithoutPyarrow(TestCase):
+
+    def test_arrowMethods_raiseImportError(self):
+        with self.assertRaises(ImportError):
+            Iterable([{'a': 1}]).to_arrow()
+        with self.assertRaises(ImportError):
+            Iterable.from_parquet('scores.parquet')
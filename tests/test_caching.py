@@ -0,0 +1,85 @@
+from unittest2 import TestCase
+
+from pyiterable import Cache, Iterable, named_cache
+from pyiterable.caching import named_caches
+
+
+class TestCaching(TestCase):
+
+    def setUp(self):
+        self.__calls = []
+
+    def __square(self, x):
+        self.__calls.append(x)
+        return x * x
+
+    def test_map_memoize_callsFunctionOncePerElement(self):
+        self.assertEqual(
+            [1, 4, 1, 9, 4, 1],
+            Iterable([1, 2, 1, 3, 2, 1]).map(self.__square, memoize=True).to_list()
+        )
+        self.assertEqual([1, 2, 3], self.__calls)
+
+    def test_map_maxsize_evictsLeastRecentlyUsed(self):
+        Iterable([1, 2, 1, 3, 2]).map(self.__square, maxsize=2).to_list()
+
+        # 2 is evicted by 3, as 1 was used more recently
+        self.assertEqual([1, 2, 3, 2], self.__calls)
+
+    def test_map_memoize_equalElementsOfDifferentTypes_cachedSeparately(self):
+        self.assertEqual(['1', '1.0', 'True'], Iterable([1, 1.0, True]).map(repr, memoize=True).to_list())
+
+    def test_filter_memoize_callsFunctionOncePerElement(self):
+        def is_odd(x):
+            self.__calls.append(x)
+            return x % 2
+
+        self.assertEqual([1, 3, 1], Iterable([1, 2, 3, 2, 1]).filter(is_odd, memoize=True).to_list())
+        self.assertEqual([1, 2, 3], self.__calls)
+
+    def test_mapmany_memoize_reusesMaterializedResults(self):
+        def repeat(x):
+            self.__calls.append(x)
+            return (x for _ in range(x))
+
+        self.assertEqual([2, 2, 1, 2, 2], Iterable([2, 1, 2]).mapmany(repeat, memoize=True).to_list())
+        self.assertEqual([2, 1], self.__calls)
+
+    def test_map_unhashableElements_callsFunctionEveryTime(self):
+        cache = Cache()
+        rows = [{'a': 1}, {'a': 1}]
+
+        self.assertEqual([1, 1], Iterable(rows).map(lambda row: row['a'], cache=cache).to_list())
+        self.assertEqual(2, cache.statistics()['uncached'])
+        self.assertEqual(0, len(cache))
+
+    def test_namedCache_sharedAcrossIterables(self):
+        cache = named_cache('test_squares', maxsize=100)
+        Iterable([1, 2]).map(self.__square, cache='test_squares').to_list()
+        Iterable([2, 3, 1]).map(self.__square, cache='test_squares').to_list()
+
+        self.assertIs(cache, named_caches()['test_squares'])
+        self.assertEqual([1, 2, 3], self.__calls)
+        self.assertEqual(
+            {'hits': 2, 'misses': 3, 'uncached': 0, 'size': 3, 'maxsize': 100, 'hit_rate': 0.4},
+            cache.statistics()
+        )
+
+    def test_cache_differentFunctions_cachedSeparately(self):
+        cache = Cache()
+
+        self.assertEqual([2], Iterable([1]).map(lambda x: x + 1, cache=cache).to_list())
+        self.assertEqual([0], Iterable([1]).map(lambda x: x - 1, cache=cache).to_list())
+        self.assertEqual(2, len(cache))
+
+    def test_cache_clear_resetsCounts(self):
+        cache = Cache(maxsize=10)
+        Iterable([1, 1]).map(self.__square, cache=cache).to_list()
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.statistics()['hit_rate'])
+
+    def test_cache_invalidMaxsize_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Cache(maxsize=0)
@@ -0,0 +1,81 @@
+from functools import partial
+from operator import gt, itemgetter, lt
+from unittest2 import TestCase
+
+from pyiterable import col, Iterable
+from pyiterable.compiler import compile_pipeline
+
+
+class TestCompilePipeline(TestCase):
+
+    def setUp(self):
+        self.__rows = [{'name': 'ann', 'score': 90}, {'name': 'bob', 'score': 50},
+                       {'name': 'cat', 'score': 85}, {'name': 'dan', 'score': 99}]
+
+    def test_compilePipeline_matchesIterableChain(self):
+        values = list(range(-10, 10))
+        pipeline = compile_pipeline([('map', abs), ('filter', lambda x: x % 3), ('map', str)])
+
+        self.assertEqual(
+            Iterable(values).map(abs).filter(lambda x: x % 3).map(str).to_list(),
+            pipeline(values).to_list()
+        )
+
+    def test_compilePipeline_enumerateAndZip_pairElements(self):
+        pipeline = compile_pipeline([('enumerate', 1), ('zip', 'ab')])
+
+        self.assertEqual([((1, 'x'), 'a'), ((2, 'y'), 'b')], pipeline(['x', 'y', 'z']).to_list())
+
+    def test_compilePipeline_take_readsNoFurtherElements(self):
+        read = []
+
+        def source():
+            for i in range(100):
+                read.append(i)
+                yield i
+
+        pipeline = compile_pipeline([('filter', lambda x: x % 2), ('take', 3)])
+
+        self.assertEqual([1, 3, 5], pipeline(source()).to_list())
+        self.assertEqual(list(range(6)), read)
+        self.assertEqual([], compile_pipeline([('take', 0)])(source()).to_list())
+
+    def test_compilePipeline_itemgetterAndComparisons_areInlined(self):
+        pipeline = compile_pipeline([('map', itemgetter(0, 2)), ('filter', itemgetter(1)), ('map', itemgetter(0)),
+                                     ('filter', partial(gt, 80))])
+
+        self.assertIn('(value[0], value[2],)', pipeline.source)
+        self.assertIn('80 > value', pipeline.source)
+        self.assertEqual([1], pipeline([(1, 2, 3), (4, 5, 0), (90, 0, 6)]).to_list())
+
+    def test_compilePipeline_nonFiniteConstants_areNotInlined(self):
+        values = [1.0, float('inf'), float('-inf')]
+        rows = [{'x': value} for value in values]
+        for bound in [float('inf'), float('-inf'), float('nan')]:
+            with self.subTest(bound=bound):
+                self.assertEqual(
+                    [row for row in rows if row['x'] < bound],
+                    compile_pipeline([('filter', col('x') < bound)]).to_list(rows)
+                )
+                self.assertEqual(
+                    [value for value in values if bound > value],
+                    compile_pipeline([('filter', partial(gt, bound))]).to_list(values)
+                )
+
+    def test_compilePipeline_sameShape_sharesCode(self):
+        first = compile_pipeline([('map', itemgetter('score')), ('filter', partial(lt, 80)), ('take', 2)])
+        second = compile_pipeline([('map', itemgetter('score')), ('filter', partial(lt, 80)), ('take', 3)])
+
+        self.assertEqual([90, 85], first(self.__rows).to_list())
+        self.assertEqual([90, 85, 99], second(self.__rows).to_list())
+        self.assertEqual(first.source, second.source)
+
+    def test_compilePipeline_calledRepeatedly_restartsStages(self):
+        pipeline = compile_pipeline([('zip', range(3)), ('take', 2)])
+
+        self.assertEqual([('a', 0), ('b', 1)], pipeline('abc').to_list())
+        self.assertEqual([('x', 0), ('y', 1)], pipeline('xyz').to_list())
+
+    def test_compilePipeline_unsupportedStage_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            compile_pipeline([('reduce', max)])
@@ -0,0 +1,73 @@
+from operator import add
+from unittest2 import TestCase
+import pickle
+
+from pyiterable import Iterable
+from pyiterable.distributed import ClusterPool, start_local_workers
+
+
+def square(x):
+    return x * x
+
+
+def fail_on_three(x):
+    if x == 3:
+        raise KeyError(x)
+
+    return x
+
+
+class TestClusterPool(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cluster = start_local_workers(3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.cluster.close()
+
+    def test_map_returnsResultsInOrder(self):
+        self.assertEqual(
+            [square(x) for x in range(20)],
+            self.cluster.pool().map(square, range(20))
+        )
+
+    def test_map_functionRaises_raisesException(self):
+        with self.assertRaises(KeyError):
+            self.cluster.pool().map(fail_on_three, range(6))
+
+    def test_map_unpicklableFunction_raisesPicklingError(self):
+        # Python 3 raises AttributeError for local objects
+        with self.assertRaises((pickle.PicklingError, AttributeError)):
+            self.cluster.pool().map(lambda x: x, range(8))
+
+    def test_map_wrongAuthkey_raisesRuntimeError(self):
+        pool = ClusterPool(self.cluster.addresses, b'wrong')
+
+        with self.assertRaises(RuntimeError):
+            pool.map(square, range(3))
+
+    def test_map_noTasks_returnsEmptyList(self):
+        self.assertEqual([], self.cluster.pool().map(square, []))
+
+    def test_partition_withClusterPool_matchesIterable(self):
+        partitioned = Iterable(range(100)).partition(8, by='round_robin', pool=self.cluster.pool())
+
+        self.assertEqual(
+            sum(square(x) for x in range(100)),
+            partitioned.map(square).aggregate(sum, combine=add)
+        )
+
+
+class TestLocalCluster(TestCase):
+
+    def test_map_workerStopped_reschedulesTasks(self):
+        with start_local_workers(2) as cluster:
+            cluster.processes[0].terminate()
+            cluster.processes[0].join()
+
+            self.assertEqual(
+                [square(x) for x in range(10)],
+                cluster.pool().map(square, range(10))
+            )
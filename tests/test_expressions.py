@@ -0,0 +1,71 @@
+from unittest2 import skipIf, TestCase
+
+from pyiterable import col, Iterable, lit, Pipeline
+from pyiterable.compiler import compile_pipeline
+from pyiterable.expressions import numpy
+
+
+class TestExpressions(TestCase):
+
+    def setUp(self):
+        self.__rows = [{'name': 'Ann', 'score': 90}, {'name': 'bob', 'score': 70}, {'name': 'Abe', 'score': 85}]
+
+    def test_call_matchesLambdas(self):
+        cases = [
+            (col('score') > 80, lambda r: r['score'] > 80),
+            (col('score') * 2 - 1, lambda r: r['score'] * 2 - 1),
+            (100 - col('score'), lambda r: 100 - r['score']),
+            ((col('score') >= 85) & (col('name') != 'Ann'), lambda r: r['score'] >= 85 and r['name'] != 'Ann'),
+            (~(col('score') < 80) | col('name').startswith('b'), lambda r: not r['score'] < 80 or r['name'][0] == 'b'),
+            (col('name').lower().endswith('e'), lambda r: r['name'].lower().endswith('e')),
+            (col('name').isin(['Ann', 'bob']), lambda r: r['name'] in ('Ann', 'bob')),
+            (-col('score') % 7, lambda r: -r['score'] % 7),
+        ]
+        for expression, function in cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(list(map(function, self.__rows)), list(map(expression, self.__rows)))
+                self.assertEqual(list(map(function, self.__rows)), list(map(expression.compile(), self.__rows)))
+
+    def test_iterableMethods_acceptExpressions(self):
+        rows = Iterable(self.__rows)
+
+        self.assertEqual(['Ann', 'Abe'], rows.filter(col('score') > 80).map(col('name')).to_list())
+        self.assertEqual([70, 85, 90], rows.sorted(key=col('score')).map(col('score')).to_list())
+        self.assertEqual(('b', 21), Iterable([('a', 1), ('b', 21)]).max(key=col(1)))
+
+    def test_columns_returnsKeysRead(self):
+        self.assertEqual(frozenset(['name', 'score']), ((col('score') > lit(1)) | col('name').strip()).columns())
+
+    def test_source_inlinesLiterals(self):
+        self.assertEqual("(row['score'] > 80)", (col('score') > 80).source('row'))
+        self.assertEqual("(row[1] in {'a', 'b'})", col(1).isin('ba').source('row'))
+        self.assertIsNone((col('score') > object()).source('row'))
+
+    def test_compiledPipeline_inlinesExpressions(self):
+        pipeline = compile_pipeline([('filter', col('name').startswith('A')), ('map', col('score') + 1)])
+
+        self.assertNotIn('a0', pipeline.source)
+        self.assertEqual([91, 86], pipeline(self.__rows).to_list())
+        self.assertEqual([91, 86], Pipeline().filter(col('name').startswith('A')).map(col('score') + 1)(self.__rows)
+                         .to_list())
+
+    def test_compiledPipeline_nonLiteralConstant_callsExpression(self):
+        threshold = object()
+        pipeline = compile_pipeline([('filter', col('score') != threshold)])
+
+        self.assertIn('a0(value)', pipeline.source)
+        self.assertEqual(self.__rows, pipeline(self.__rows).to_list())
+
+    @skipIf(numpy is None, "requires NumPy")
+    def test_evaluate_vectorizesOverColumns(self):
+        columns = {'name': numpy.array(['Ann', 'bob', 'Abe']), 'score': numpy.array([90, 70, 85])}
+
+        self.assertEqual([True, False, True], list((col('score') > 80).evaluate(columns)))
+        self.assertEqual([False, False, True], list(((col('score') < 88) & col('name').startswith('A'))
+                                                    .evaluate(columns)))
+        self.assertEqual([True, True, False], list(col('name').isin(['Ann', 'bob']).evaluate(columns)))
+
+    @skipIf(numpy is not None, "NumPy is installed")
+    def test_evaluate_withoutNumpy_raisesImportError(self):
+        with self.assertRaises(ImportError):
+            (col('score') > 80).evaluate({'score': [90]})
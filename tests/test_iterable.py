@@ -2,6 +2,8 @@ from collections import Counter
 from copy import deepcopy
 from functools import reduce
 from unittest2 import skipIf, TestCase
+import itertools
+import time
 import uuid
 import sys
 
@@ -132,6 +134,44 @@ class TestIterable(TestCase):
                     Counter(iterable)
                 )
 
+    def test_constructor_copyIsFalse_doesNotCopyIterable(self):
+        for test_input in self.__test_lists:
+            with self.subTest(test_input=test_input):
+                iterable = Iterable(test_input, copy=False)
+                test_input.append(uuid.uuid4())
+
+                self.assertEqual(
+                    Counter(test_input),
+                    Counter(iterable)
+                )
+
+    def test_constructor_hasNoInstanceDict(self):
+        with self.assertRaises(AttributeError):
+            Iterable([]).attribute = 1
+
+    def test_wrap_generator_canBeIteratedMoreThanOnce(self):
+        iterable = Iterable.wrap(x for x in range(3))
+
+        self.assertEqual([0, 1, 2], iterable.to_list())
+        self.assertEqual([0, 1, 2], iterable.to_list())
+
+    def test_wrap_sequence_supportsRandomAccess(self):
+        iterable = Iterable.wrap(range(10))
+
+        self.assertEqual(4, iterable.get(4))
+        self.assertEqual([7, 8, 9], iterable.skip(7).to_list())
+        self.assertEqual([0, 1], iterable.take(2).to_list())
+        self.assertEqual(9, iterable.last())
+        self.assertEqual(list(range(9, -1, -1)), iterable.reversed().to_list())
+
+    def test_wrap_nonSequence_supportsRandomAccess(self):
+        test_input = {3, 1, 2}
+        iterable = Iterable.wrap(test_input)
+
+        self.assertEqual(list(test_input)[-1], iterable.last())
+        self.assertEqual(list(test_input)[1], iterable.get(1))
+        self.assertEqual(list(reversed(list(test_input))), iterable.reversed().to_list())
+
     def test_to_frozenset(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -336,6 +376,25 @@ class TestIterable(TestCase):
                     type(actual_error)
                 )
 
+    def test_max_sortedIterable_returnsFirstLargestElement(self):
+        test_input = [(1, 'a'), (3, 'b'), (2, 'c'), (3, 'd')]
+        key = lambda x: x[0]
+
+        for reverse in [False, True]:
+            with self.subTest(reverse=reverse):
+                sorted_iterable = Iterable(test_input).sorted(key=key, reverse=reverse)
+
+                self.assertEqual(
+                    max(sorted_iterable.to_list(), key=key),
+                    sorted_iterable.max(key=key)
+                )
+
+    def test_max_sortedByDifferentKey_returnsMax(self):
+        sorted_iterable = Iterable([(1, 9), (3, 2), (2, 5)]).sorted(key=lambda x: x[0])
+
+        self.assertEqual((1, 9), sorted_iterable.max(key=lambda x: x[1]))
+        self.assertEqual((3, 2), sorted_iterable.max())
+
     def test_min_noDefault_returnsMin(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -389,6 +448,19 @@ class TestIterable(TestCase):
                     type(actual_error)
                 )
 
+    def test_min_sortedIterable_returnsFirstSmallestElement(self):
+        test_input = [(1, 'a'), (3, 'b'), (1, 'c'), (3, 'd')]
+        key = lambda x: x[0]
+
+        for reverse in [False, True]:
+            with self.subTest(reverse=reverse):
+                sorted_iterable = Iterable(test_input).sorted(key=key, reverse=reverse)
+
+                self.assertEqual(
+                    min(sorted_iterable.to_list(), key=key),
+                    sorted_iterable.min(key=key)
+                )
+
     def test_reversed(self):
         err_msg = "{} is not the reverse of the input {}"
 
@@ -453,6 +525,11 @@ class TestIterable(TestCase):
                     msg="Iterable {} not sorted".format(sorted_iterable)
                 )
 
+    def test_as_sorted_doesNotSortIterable(self):
+        values = Iterable([3, 1, 2]).as_sorted()
+
+        self.assertEqual([3, 1, 2], values.to_list())
+
     def test_sum_noStartValue_returnsSum(self):
         test_inputs = self.__extend_test(self.__int_list) + self.__extend_test(self.__float_list)
 
@@ -533,6 +610,78 @@ class TestIterable(TestCase):
                     Iterable(test_input).reduce(func, initializer)
                 )
 
+    def test_broadcast_returnsResultOfEachBranch(self):
+        test_input = [3, 1, 4, 1, 5, 9, 2, 6]
+
+        self.assertEqual(
+            (31, {1, 2, 3, 4, 5, 6, 9}, [6, 2, 8, 2, 10, 18, 4, 12]),
+            Iterable(test_input).broadcast(
+                lambda x: x.sum(),
+                lambda x: x.to_set(),
+                lambda x: x.map(lambda y: y * 2).to_list()
+            )
+        )
+
+    def test_broadcast_lazySource_traversedOnce(self):
+        calls = []
+
+        def read():
+            calls.append(1)
+            return iter(range(5000))
+
+        self.assertEqual(
+            (5000, 12497500, 0),
+            Iterable.defer(read).broadcast(
+                lambda x: x.len(),
+                lambda x: x.sum(),
+                lambda x: x.first(),
+                buffer_size=16
+            )
+        )
+        self.assertEqual(1, len(calls))
+
+    def test_broadcast_branchRaises_reraises(self):
+        def fail(iterable):
+            raise KeyError('branch')
+
+        with self.assertRaises(KeyError):
+            Iterable(range(5000)).broadcast(lambda x: x.sum(), fail, buffer_size=8)
+
+    def test_broadcast_sourceRaises_reraises(self):
+        def read():
+            yield 1
+            raise IOError('source')
+
+        with self.assertRaises(IOError):
+            Iterable.defer(read).broadcast(lambda x: x.to_list(), lambda x: x.len())
+
+    def test_broadcast_branchIteratesTwice_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).broadcast(lambda x: (x.to_list(), x.to_list()))
+
+    def test_broadcast_lazyIterableResult_isRead(self):
+        distinct, prefetched, total = Iterable([3, 1, 3, 2, 1] * 500).broadcast(
+            lambda x: x.distinct(),
+            lambda x: x.prefetch(4),
+            lambda x: x.sum(),
+            buffer_size=8
+        )
+
+        self.assertEqual([3, 1, 2], distinct.to_list())
+        self.assertEqual([3, 1, 3, 2, 1] * 500, prefetched.to_list())
+        self.assertEqual(5000, total)
+
+    def test_broadcast_lazyOtherResult_raisesValueError(self):
+        iterator, total = Iterable(range(5000)).broadcast(lambda x: iter(x), lambda x: x.sum(), buffer_size=8)
+
+        self.assertEqual(12497500, total)
+        with self.assertRaises(ValueError):
+            list(iterator)
+
+    def test_broadcast_invalidBufferSize_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).broadcast(lambda x: x.sum(), buffer_size=0)
+
     def test_contains_doesNotContainValue_returnsFalse(self):
         value_not_in_test_input = uuid.uuid4()
 
@@ -546,6 +695,44 @@ class TestIterable(TestCase):
                 a_value_in_test_input = list(test_input)[-1]
                 self.assertTrue(Iterable(test_input).contains(a_value_in_test_input))
 
+    def test_contains_withIndex_matchesLinearScan(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                iterable = Iterable(test_input).index()
+
+                for value in list(test_input) + [uuid.uuid4()]:
+                    self.assertEqual(
+                        value in list(test_input),
+                        iterable.contains(value)
+                    )
+
+    def test_contains_withIndexAndUnhashableElements_fallsBackToLinearScan(self):
+        iterable = Iterable([[1, 2], 3, {'a': 1}]).index()
+
+        self.assertTrue(iterable.contains([1, 2]))
+        self.assertTrue(iterable.contains({'a': 1}))
+        self.assertTrue(iterable.contains(3))
+        self.assertFalse(iterable.contains([3]))
+
+    def test_contains_derivedFromIndexedIterable_returnsCorrectResult(self):
+        iterable = Iterable([3, 1, 2, 3]).index()
+
+        self.assertTrue(iterable.sorted().contains(2))
+        self.assertTrue(iterable.distinct().reversed().contains(1))
+        self.assertFalse(iterable.filter(lambda x: x != 2).contains(2))
+
+    def test_contains_sortedIterable_matchesLinearScan(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                for reverse in [False, True]:
+                    sorted_iterable = Iterable(test_input).sorted(reverse=reverse).filter(lambda x: True)
+
+                    for value in list(test_input) + ['missing']:
+                        self.assertEqual(
+                            value in list(test_input),
+                            sorted_iterable.contains(value)
+                        )
+
     def test_is_empty_isNotEmpty_returnsFalse(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -648,6 +835,18 @@ class TestIterable(TestCase):
                 with self.assertRaises(ValueError):
                     Iterable(test_input).single(filter_by=func)
 
+    def test_single_multipleMatches_stopsAtSecondMatch(self):
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            return x > 1
+
+        with self.assertRaises(ValueError):
+            Iterable([1, 2, 3, 4, 5]).single(filter_by=func)
+
+        self.assertEqual([1, 2, 3], calls)
+
     def test_concat_leftAndRightHasSameContents_returnsLeftConcatRight(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -712,6 +911,47 @@ class TestIterable(TestCase):
                     Counter(Iterable(left).concat([]).to_list())
                 )
 
+    def test_concat_repeatedly_returnsAllElementsInOrder(self):
+        iterable = Iterable([])
+        for i in range(5000):
+            iterable = iterable.concat([i, -i])
+
+        self.assertEqual(
+            list(itertools.chain.from_iterable([i, -i] for i in range(5000))),
+            iterable.to_list()
+        )
+        self.assertEqual(2, iterable.get(4))
+        self.assertEqual(-4999, iterable.last())
+
+    def test_concat_lazilyEvaluatedIterable_isNotCopied(self):
+        left = Iterable([1, 2, 1])
+        right = Iterable([3, 3, 4]).distinct()
+        concatenated = left.concat(right)
+
+        self.assertEqual([1, 2, 1, 3, 4], concatenated.to_list())
+        self.assertEqual([1, 2, 1, 3, 4], concatenated.to_list())
+        self.assertEqual([1, 3, 4], concatenated.skip(2).to_list())
+
+    def test_concat_rightIsMutatedAfterConcat_isUnchanged(self):
+        right = [3, 4]
+        concatenated = Iterable([1, 2]).concat(right)
+        right.append(5)
+
+        self.assertEqual([1, 2, 3, 4], concatenated.to_list())
+
+    def test_concat_deferredIterable_readsSourceAgain(self):
+        calls = []
+
+        def source():
+            calls.append(1)
+            return [len(calls)]
+
+        concatenated = Iterable([0]).concat(Iterable.defer(source))
+
+        self.assertEqual(1, concatenated.get(1))
+        self.assertEqual(2, concatenated.get(1))
+        self.assertEqual([0, 3], concatenated.to_list())
+
     def test_first_noArgs_returnsFirstElement(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -910,6 +1150,23 @@ class TestIterable(TestCase):
                     Iterable(test_input).last(filter_by=func, default=default)
                 )
 
+    def test_last_withFunc_scansBackwardsFromEnd(self):
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            return x < 3
+
+        self.assertEqual(2, Iterable([1, 2, 3, 4, 5]).last(filter_by=func))
+        self.assertEqual([5, 4, 3, 2], calls)
+
+    def test_last_lazilyEvaluatedIterable_returnsLastMatchingElement(self):
+        values = Iterable([1, 2, 5, 2, 9]).distinct()
+
+        self.assertEqual(9, values.last())
+        self.assertEqual(2, values.last(filter_by=lambda x: x < 5))
+        self.assertEqual(0, values.last(filter_by=lambda x: x > 10, default=0))
+
     def test_skip_countIsZero_returnsIterable(self):
         for test_input in self.__test_inputs:
             with self.subTest(test_input=test_input):
@@ -1101,6 +1358,12 @@ class TestIterable(TestCase):
                     Counter(Iterable(left).difference([]).to_list())
                 )
 
+    def test_difference_preservesFirstSeenOrder(self):
+        self.assertEqual(
+            [2, 10, 9],
+            Iterable([2, 10, 1982, -5, 9, 10, 2]).difference([1982, -10, -5, 1982, 98]).to_list()
+        )
+
     def test_distinct_returnsDistinctIterable(self):
         tests_list = [
             [True, False, False, True, True],
@@ -1119,6 +1382,27 @@ class TestIterable(TestCase):
                     Counter(Iterable(test_input).distinct().to_list())
                 )
 
+    def test_distinct_preservesFirstSeenOrder(self):
+        for test_input in self.__test_lists:
+            with self.subTest(test_input=test_input):
+                expected = []
+                for value in test_input:
+                    if value not in expected:
+                        expected.append(value)
+
+                self.assertEqual(
+                    expected,
+                    Iterable(test_input).distinct().to_list()
+                )
+
+    def test_distinct_sortedIterable_returnsSortedDistinctElements(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    sorted(set(test_input)),
+                    Iterable(test_input).sorted().distinct().to_list()
+                )
+
     def test_intersection_leftAndRightHasSameContents_returnsLeft(self):
         tests = [(left, deepcopy(left)) for left in self.__test_inputs]
 
@@ -1230,6 +1514,20 @@ class TestIterable(TestCase):
                     Counter(Iterable(left).intersection([]).to_list())
                 )
 
+    def test_intersection_preservesFirstSeenOrderOfLeft(self):
+        tests = [
+            ([9, 1982, 2, -5, 9], [1982, -10, -5, 9, 98]),
+            # left smaller than right, so left is the hashed side
+            ([9, -5, 9], list(range(-10, 10)))
+        ]
+
+        for left, right in tests:
+            with self.subTest(left=left, right=right):
+                self.assertEqual(
+                    [value for i, value in enumerate(left) if value in right and value not in left[:i]],
+                    Iterable(left).intersection(right).to_list()
+                )
+
     def test_symmetric_difference_leftAndRightHasSameContents_returnsEmptyIterable(self):
         tests = [(left, deepcopy(left)) for left in self.__test_inputs]
 
@@ -1341,6 +1639,12 @@ class TestIterable(TestCase):
                     Counter(Iterable(left).symmetric_difference([]).to_list())
                 )
 
+    def test_symmetric_difference_preservesFirstSeenOrder(self):
+        self.assertEqual(
+            [2, 10, 9, -10, 98],
+            Iterable([2, 10, 1982, -5, 9, 10]).symmetric_difference([1982, -10, -5, 1982, 98, -10]).to_list()
+        )
+
     def test_union_leftAndRightHasSameContents_returnsLeft(self):
         tests = [(left, deepcopy(left)) for left in self.__test_inputs]
 
@@ -1452,4 +1756,424 @@ class TestIterable(TestCase):
                 self.assertEqual(
                     Counter(set(left)),
                     Counter(Iterable(left).union([]).to_list())
-                )
\ No newline at end of file
+                )
+
+    def test_union_preservesFirstSeenOrder(self):
+        self.assertEqual(
+            [2, 10, 5, 9, 1982, -10],
+            Iterable([2, 10, 2, 2, 5, 9, 10]).union(iter([1982, -10, 5, 1982, 9])).to_list()
+        )
+
+    def test_union_iteratedTwice_returnsSameElements(self):
+        union = Iterable([3, 1, 3]).union(iter([2, 1]))
+
+        self.assertEqual([3, 1, 2], union.to_list())
+        self.assertEqual([3, 1, 2], union.to_list())
+        self.assertEqual([2, 1, 3], union.reversed().to_list())
+
+    def test_aggregate_matchesSeparateReductions(self):
+        for test_input in self.__extend_test([5, 1, 4, 2, 3, 9]):
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    {'count': 6, 'total': 24, 'lo': 1, 'hi': 9, 'mean': 4.0, 'var': 8.0},
+                    Iterable(test_input).aggregate(count=len, total=sum, lo=min, hi=max, mean='mean', var='var')
+                )
+
+    def test_aggregate_isNumericallyStable(self):
+        test_input = [1e9 + x for x in [4, 7, 13, 16]] * 50000
+
+        self.assertAlmostEqual(
+            22.5 * 200000 / 199999,
+            Iterable(test_input).aggregate(var='var')['var'],
+            places=6
+        )
+
+    def test_aggregate_largeIntegers_doNotOverflow(self):
+        test_input = [2 ** 62, 2 ** 62, 2 ** 64]
+
+        result = Iterable(test_input).aggregate(total=sum, lo=min, hi=max, mean='mean')
+
+        self.assertEqual(
+            {'total': 2 ** 63 + 2 ** 64, 'lo': 2 ** 62, 'hi': 2 ** 64},
+            dict((name, value) for name, value in result.items() if name != 'mean')
+        )
+        self.assertAlmostEqual(float(2 ** 63 + 2 ** 64) / 3, result['mean'])
+        self.assertEqual(2 ** 63, Iterable([2 ** 62, 2 ** 62]).describe()['sum'])
+
+    def test_aggregate_nonFloatValues_usesExactArithmetic(self):
+        from fractions import Fraction
+        test_input = [Fraction(1, 3), Fraction(2, 3), Fraction(1, 2)]
+
+        result = Iterable(test_input).aggregate(total=sum, hi=max, std='std')
+
+        self.assertEqual(Fraction(3, 2), result['total'])
+        self.assertEqual(Fraction(2, 3), result['hi'])
+        self.assertAlmostEqual(1 / 6.0, result['std'])
+
+    def test_aggregate_strings_minAndMax(self):
+        self.assertEqual(
+            {'lo': 'Alice', 'hi': 'Charlie'},
+            Iterable(['Bob', 'Alice', 'Charlie']).aggregate(lo=min, hi=max)
+        )
+
+    def test_aggregate_emptyIterable_returnsNone(self):
+        self.assertEqual(
+            {'count': 0, 'total': 0, 'lo': None, 'mean': None, 'var': None},
+            Iterable([]).aggregate(count=len, total=sum, lo=min, mean='mean', var='var')
+        )
+
+    def test_aggregate_lazySource_traversedOnce(self):
+        calls = []
+
+        def read():
+            calls.append(1)
+            return range(10)
+
+        self.assertEqual(
+            {'count': 10, 'total': 45},
+            Iterable.defer(read).aggregate(count=len, total=sum)
+        )
+        self.assertEqual(1, len(calls))
+
+    def test_aggregate_unsupportedReduction_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).aggregate(product='product')
+
+    def test_describe(self):
+        result = Iterable([2, 4, 4, 4, 5, 5, 7, 9]).describe()
+
+        self.assertEqual(
+            {'count': 8, 'sum': 40, 'mean': 5.0, 'min': 2, 'max': 9},
+            dict((name, value) for name, value in result.items() if name != 'std')
+        )
+        self.assertAlmostEqual((32 / 7.0) ** 0.5, result['std'])
+
+    def test_median_exact_returnsMiddleValue(self):
+        for test_input in self.__extend_test([5, 1, 4, 2, 3]):
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    3,
+                    Iterable(test_input).median(method='exact')
+                )
+
+    def test_median_tdigestSmallInput_returnsExactMedian(self):
+        for test_input in self.__extend_test([6, 1, 4, 2]):
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    3,
+                    Iterable(test_input).median()
+                )
+
+    def test_quantiles_exact_returnsInterpolatedValues(self):
+        test_input = list(range(101))
+
+        self.assertEqual(
+            [0, 25, 50, 99, 100],
+            Iterable(test_input).quantiles([0, 0.25, 0.5, 0.99, 1], method='exact')
+        )
+
+    def test_quantiles_tdigest_isCloseToExact(self):
+        values = [(i * 7919) % 10007 for i in range(20000)]
+        qs = [0.01, 0.5, 0.99]
+
+        exact = Iterable(values).quantiles(qs, method='exact')
+        estimated = Iterable(values).quantiles(qs, method='tdigest')
+
+        for q, expected, actual in zip(qs, exact, estimated):
+            with self.subTest(q=q):
+                self.assertAlmostEqual(expected, actual, delta=10007 * 0.01)
+
+    def test_quantiles_emptyIterable_raisesValueError(self):
+        for method in ['tdigest', 'exact']:
+            with self.subTest(method=method):
+                with self.assertRaises(ValueError):
+                    Iterable([]).quantiles([0.5], method=method)
+
+    def test_quantiles_quantileOutOfRange_raisesValueError(self):
+        for q in [-0.1, 1.1]:
+            with self.subTest(q=q):
+                with self.assertRaises(ValueError):
+                    Iterable([1, 2, 3]).quantiles([q])
+
+    def test_quantiles_unsupportedMethod_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2, 3]).quantiles([0.5], method='invalid')
+
+    def test_sample_kSmallerThanLength_returnsDistinctElementsFromIterable(self):
+        test_input = list(range(50))
+
+        actual = Iterable(test_input).sample(10, seed=1).to_list()
+
+        self.assertEqual(10, len(actual))
+        self.assertEqual(10, len(set(actual)))
+        self.assertTrue(set(actual).issubset(set(test_input)))
+
+    def test_sample_sameSeed_returnsSameSample(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    Iterable(test_input).sample(3, seed=42).to_list(),
+                    Iterable(test_input).sample(3, seed=42).to_list()
+                )
+
+    def test_sample_kGreaterThanLength_returnsAllElements(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    Counter(list(test_input)),
+                    Counter(Iterable(test_input).sample(len(test_input) + 1).to_list())
+                )
+
+    def test_sample_withWeightFunction_onlyReturnsWeightedElements(self):
+        actual = Iterable(range(100)).sample(5, seed=3, weights=lambda x: 1 if x % 10 == 0 else 0).to_list()
+
+        self.assertEqual(5, len(actual))
+        self.assertTrue(all(x % 10 == 0 for x in actual))
+
+    def test_sample_withWeightIterable_onlyReturnsWeightedElements(self):
+        actual = Iterable(['a', 'b', 'c']).sample(3, seed=3, weights=[0, 2, 1]).to_list()
+
+        self.assertEqual(Counter(['b', 'c']), Counter(actual))
+
+    def test_sample_withWeightFunction_readsSourceOnce(self):
+        calls = []
+
+        def read():
+            calls.append(1)
+            return range(100)
+
+        sample = Iterable.defer(read).sample(5, seed=3, weights=lambda x: x % 2)
+
+        self.assertEqual(5, sample.len())
+        self.assertTrue(all(x % 2 for x in sample))
+        self.assertEqual(1, len(calls))
+
+    def test_sample_weightIterableOfDifferentLength_raisesValueError(self):
+        for weights in [[1, 1], [1, 1, 1, 1]]:
+            with self.subTest(weights=weights):
+                with self.assertRaises(ValueError):
+                    Iterable([1, 2, 3]).sample(1, weights=weights)
+
+    def test_sample_negativeWeight_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).sample(1, weights=[1, -1])
+
+    def test_sample_kIsNegative_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).sample(-1)
+
+    def test_lookup_withKeyIndex_returnsMatchingElementsInOrder(self):
+        grades = Iterable([('Alice', 94), ('Bob', 65), ('Charlie', 94)]).index_by(lambda x: x[1])
+
+        self.assertEqual([('Alice', 94), ('Charlie', 94)], grades.lookup(94).to_list())
+        self.assertEqual([], grades.lookup(70).to_list())
+
+    def test_lookup_unhashableKeys_fallsBackToLinearScan(self):
+        values = Iterable([{'id': [1]}, {'id': [2]}, {'id': 3}]).index_by(lambda x: x['id'])
+
+        self.assertEqual([{'id': [2]}], values.lookup([2]).to_list())
+        self.assertEqual([{'id': 3}], values.lookup(3).to_list())
+
+    def test_lookup_noKeyIndex_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2]).lookup(1)
+
+    def test_range_between_sortedIterable_returnsElementsBetweenBoundsInclusive(self):
+        values = Iterable([5, 1, 9, 3, 7, 3, 8])
+
+        self.assertEqual([3, 3, 5, 7], values.sorted().range_between(2, 7).to_list())
+        self.assertEqual([7, 5, 3, 3], values.sorted(reverse=True).range_between(2, 7).to_list())
+        self.assertEqual([], values.sorted().range_between(10, 20).to_list())
+        self.assertEqual([], values.sorted().range_between(7, 2).to_list())
+
+    def test_range_between_sortedWithKey_comparesKeys(self):
+        grades = Iterable([('Charlie', 79), ('Alice', 94), ('Bob', 65)]).sorted(key=lambda x: x[1])
+
+        self.assertEqual([('Charlie', 79), ('Alice', 94)], grades.range_between(70, 100).to_list())
+        self.assertEqual([('Alice', 94)], grades.range_between(70, 100).skip(1).to_list())
+
+    def test_range_between_unsortedIterable_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1, 2, 3]).range_between(1, 2)
+
+    def test_range_between_derivedFromSortedIterable_returnsElementsBetweenBounds(self):
+        values = Iterable(range(20)).sorted().filter(lambda x: x % 2 == 0).take(8).reversed()
+
+        self.assertEqual([10, 8, 6], values.range_between(5, 10).to_list())
+
+    def test_join_unsortedInputs_returnsMatchingPairsInLeftOrder(self):
+        names = Iterable([(3, 'Charlie'), (1, 'Alice'), (2, 'Bob'), (1, 'Alicia')])
+        grades = [(1, 94), (3, 79), (1, 88), (4, 60)]
+
+        self.assertEqual(
+            [((3, 'Charlie'), (3, 79)), ((1, 'Alice'), (1, 94)), ((1, 'Alice'), (1, 88)),
+             ((1, 'Alicia'), (1, 94)), ((1, 'Alicia'), (1, 88))],
+            names.join(grades, key=lambda x: x[0]).to_list()
+        )
+
+    def test_join_sortedInputs_matchesHashJoin(self):
+        key = lambda x: x[0]
+        other_key = lambda x: x[1]
+        left = [(i % 7, i) for i in range(40)]
+        right = [(i, i % 5) for i in range(30)]
+
+        for reverse in [False, True]:
+            with self.subTest(reverse=reverse):
+                sorted_left = Iterable(left).sorted(key=key, reverse=reverse)
+                sorted_right = Iterable(right).sorted(key=other_key, reverse=reverse)
+
+                self.assertEqual(
+                    sorted_left.join(sorted_right.to_list(), key=key, other_key=other_key).to_list(),
+                    sorted_left.join(sorted_right, key=key, other_key=other_key).to_list()
+                )
+
+    def test_join_noKey_joinsOnElements(self):
+        self.assertEqual(
+            [(2, 2), (3, 3)],
+            Iterable([1, 2, 3]).join([3, 2, 5]).to_list()
+        )
+
+    def test_merge_sortedInputs_returnsSortedIterable(self):
+        self.assertEqual(
+            [1, 2, 3, 4, 5, 9, 10],
+            Iterable([1, 4, 9]).merge([2, 3, 10], Iterable([5])).to_list()
+        )
+
+    def test_merge_withKeyAndReverse_returnsSortedIterable(self):
+        merged = Iterable(['ccc', 'a']).merge(['dddd', 'bb', ''], key=len, reverse=True)
+
+        self.assertEqual(['dddd', 'ccc', 'bb', 'a', ''], merged.to_list())
+        self.assertEqual('dddd', merged.max(key=len))
+
+    def test_merge_equalKeys_keepsInputOrderWithoutComparingElements(self):
+        left = [{'k': 3, 'from': 'left'}, {'k': 1, 'from': 'left'}]
+        right = [{'k': 3, 'from': 'right'}, {'k': 1, 'from': 'right'}]
+        merged = Iterable(left).merge(right, key=lambda row: row['k'], reverse=True)
+
+        self.assertEqual([left[0], right[0], left[1], right[1]], merged.to_list())
+
+    def test_merge_invalidKeywordParameter_raisesTypeError(self):
+        with self.assertRaises(TypeError):
+            Iterable([1]).merge([2], invalid=True)
+
+    def test_setFunctions_sortedInputs_matchUnsortedResults(self):
+        left = [1, 2, 2, 3, 5, 8, 8]
+        right = [2, 3, 3, 4, 8, 9]
+
+        for reverse in [False, True]:
+            with self.subTest(reverse=reverse):
+                sorted_left = Iterable(left).sorted(reverse=reverse)
+                sorted_right = Iterable(right).sorted(reverse=reverse)
+
+                self.assertEqual(
+                    sorted_left.difference(right).to_list(),
+                    sorted_left.difference(sorted_right).to_list()
+                )
+                self.assertEqual(
+                    sorted_left.intersection(right).to_list(),
+                    sorted_left.intersection(sorted_right).to_list()
+                )
+                self.assertEqual(
+                    sorted(set(left + right), reverse=reverse),
+                    sorted_left.union(sorted_right).to_list()
+                )
+
+    def test_defer_iteratedTwice_callsFunctionEachTime(self):
+        calls = []
+
+        def source(n):
+            calls.append(n)
+            return range(n)
+
+        iterable = Iterable.defer(source, 3)
+
+        self.assertEqual([0, 1, 2], iterable.to_list())
+        self.assertEqual(3, iterable.len())
+        self.assertEqual([3, 3], calls)
+
+    def test_defer_takeAndSkip_readOnlyWhatIsNeeded(self):
+        read = []
+
+        def source():
+            for i in range(1000000):
+                read.append(i)
+                yield i
+
+        iterable = Iterable.defer(source)
+
+        self.assertEqual([0, 1, 2], iterable.take(3).to_list())
+        self.assertEqual(3, len(read))
+        self.assertEqual([5, 6], iterable.skip(5).take(2).to_list())
+        self.assertEqual(10, len(read))
+
+    def test_defer_randomAccess_callsFunctionAgain(self):
+        calls = []
+
+        def source():
+            calls.append(1)
+            return [len(calls)] * 3
+
+        iterable = Iterable.defer(source)
+
+        self.assertEqual(1, iterable.get(0))
+        self.assertEqual([2, 2, 2], iterable.to_list())
+        self.assertEqual(3, iterable.get(2))
+
+    def test_prefetch_returnsAllElementsInOrder(self):
+        for test_input in self.__test_inputs:
+            with self.subTest(test_input=test_input):
+                self.assertEqual(
+                    list(test_input),
+                    Iterable(test_input).prefetch(2).to_list()
+                )
+
+    def test_prefetch_producesAheadOfConsumer(self):
+        produced = []
+
+        def source():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        iterator = iter(Iterable.defer(source).prefetch(4))
+        self.assertEqual(0, next(iterator))
+
+        deadline = time.time() + 5
+        while len(produced) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertGreaterEqual(len(produced), 5)
+        self.assertEqual([1, 2, 3, 4], [next(iterator) for _ in range(4)])
+
+    def test_prefetch_sourceRaises_raisesToConsumer(self):
+        def source():
+            yield 1
+            raise KeyError('source failed')
+
+        iterator = iter(Iterable.defer(source).prefetch(2))
+
+        self.assertEqual(1, next(iterator))
+        with self.assertRaises(KeyError):
+            next(iterator)
+
+    def test_prefetch_consumerStopsEarly_closesSource(self):
+        closed = []
+
+        def source():
+            try:
+                for i in itertools.count():
+                    yield i
+            finally:
+                closed.append(True)
+
+        self.assertEqual(3, Iterable.defer(source).prefetch(2).first(filter_by=lambda x: x > 2))
+
+        deadline = time.time() + 5
+        while len(closed) < 1 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertTrue(closed)
+
+    def test_prefetch_sizeLessThanOne_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable([1]).prefetch(0)
@@ -0,0 +1,104 @@
+from unittest2 import TestCase
+import os
+import random
+import shutil
+import tempfile
+
+import pyiterable
+from pyiterable import Iterable
+from pyiterable.memory import active, parse_size
+
+
+class TestMemory(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.mkdtemp()
+        generator = random.Random(7)
+        self.__values = [generator.randint(0, 3000) for _ in range(10000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def __limits(self, memory='64KB'):
+        return pyiterable.limits(memory=memory, spill_directory=self.__directory)
+
+    def test_parseSize_units(self):
+        self.assertEqual(2 << 30, parse_size('2GB'))
+        self.assertEqual(512 << 20, parse_size('512 mb'))
+        self.assertEqual(1536, parse_size('1.5K'))
+        self.assertEqual(100, parse_size(100))
+
+    def test_parseSize_invalid(self):
+        self.assertRaises(ValueError, parse_size, 'lots')
+        self.assertRaises(ValueError, pyiterable.limits, 0)
+
+    def test_limits_nested(self):
+        with self.__limits('1GB') as outer:
+            with self.__limits() as inner:
+                self.assertIs(inner, active())
+            self.assertIs(outer, active())
+        self.assertIsNone(active())
+
+    def test_sorted_spills(self):
+        with self.__limits() as budget:
+            ordered = Iterable(self.__values).sorted()
+
+        self.assertEqual(sorted(self.__values), ordered.to_list())
+        self.assertGreater(budget.stats['sorted']['spills'], 1)
+        self.assertLessEqual(budget.stats['sorted']['peak'], budget.memory + 1024)
+        self.assertEqual(0, budget.used)
+
+    def test_sorted_spills_stable(self):
+        pairs = list(enumerate(self.__values))
+        with self.__limits():
+            ordered = Iterable(pairs).sorted(key=lambda x: x[1] % 10, reverse=True).to_list()
+
+        self.assertEqual(sorted(pairs, key=lambda x: x[1] % 10, reverse=True), ordered)
+
+    def test_sorted_withinBudget_doesNotSpill(self):
+        with self.__limits('1GB') as budget:
+            self.assertEqual([1, 2, 3], Iterable([3, 1, 2]).sorted().to_list())
+
+        self.assertEqual(0, budget.stats['sorted']['spills'])
+        self.assertGreater(budget.stats['sorted']['peak'], 0)
+
+    def test_sorted_spilled_fastPathsMatchUnlimited(self):
+        unlimited = Iterable(self.__values).sorted()
+        for reverse in [False, True]:
+            with self.subTest(reverse=reverse):
+                with self.__limits() as budget:
+                    spilled = Iterable(self.__values).sorted(reverse=reverse)
+                expected = unlimited.reversed() if reverse else unlimited
+
+                self.assertGreater(budget.stats['sorted']['spills'], 1)
+                self.assertEqual(max(self.__values), spilled.max())
+                self.assertEqual(min(self.__values), spilled.min())
+                self.assertTrue(spilled.contains(self.__values[0]))
+                self.assertFalse(spilled.contains(-1))
+                self.assertEqual(expected.get(1234), spilled.get(1234))
+                self.assertEqual(expected.take(5).to_list(), spilled.take(5).to_list())
+                self.assertEqual(unlimited.range_between(100, 200).to_list(),
+                                 sorted(spilled.range_between(100, 200).to_list()))
+
+    def test_sorted_budgetAlreadyUsed_spillsMinimumRuns(self):
+        with self.__limits('1KB') as budget:
+            budget._reserve('other', 1 << 20, 1 << 20)
+            ordered = Iterable(self.__values[:5000]).sorted()
+
+        self.assertEqual(sorted(self.__values[:5000]), ordered.to_list())
+        self.assertLessEqual(budget.stats['sorted']['spills'], 5)
+
+    def test_distinct_spills(self):
+        with self.__limits('16KB') as budget:
+            distinct = Iterable(self.__values).distinct()
+
+        expected = list(Iterable(self.__values).distinct())
+        self.assertEqual(expected, distinct.to_list())
+        self.assertEqual(expected, distinct.to_list())
+        self.assertGreater(budget.stats['distinct']['spills'], 0)
+
+    def test_spillFiles_removed(self):
+        with self.__limits():
+            self.assertEqual(sorted(self.__values), Iterable(self.__values).sorted().to_list())
+
+        self.assertEqual([], os.listdir(self.__directory))
@@ -0,0 +1,166 @@
+from collections import Counter
+from operator import add
+from unittest2 import skipIf, TestCase
+import array
+import itertools
+import os
+
+from pyiterable import Iterable, PartitionedIterable
+from pyiterable.partitioned import shared_memory
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def square(x):
+    return int(x) * int(x)
+
+
+def duplicate(x):
+    return [x, x]
+
+
+def first_letter(x):
+    return x[0]
+
+
+def distinct_keys(partition):
+    return sorted(set(map(first_letter, partition)))
+
+
+class TestPartitionedIterable(TestCase):
+
+    def setUp(self):
+        self.__values = list(range(50))
+
+    def test_partition_roundRobin_balancesPartitions(self):
+        partitions = Iterable(self.__values).partition(4, by='round_robin').partitions()
+
+        self.assertEqual([13, 13, 12, 12], [len(p) for p in partitions])
+        self.assertEqual(self.__values, sorted(sum(partitions, [])))
+
+    def test_partition_hash_placesEqualKeysTogether(self):
+        words = ['apple', 'bob', 'avocado', 'cat', 'bee', 'cow', 'ant']
+        partitions = Iterable(words).partition(3, key=first_letter).partitions()
+
+        keys = [set(map(first_letter, partition)) for partition in partitions]
+        for i in range(len(keys)):
+            for j in range(i + 1, len(keys)):
+                self.assertFalse(keys[i] & keys[j])
+
+    def test_partition_range_ordersPartitionsByKey(self):
+        partitions = Iterable(reversed(self.__values)).partition(5, by='range').partitions()
+
+        self.assertEqual(5, len(partitions))
+        for left, right in zip(partitions, partitions[1:]):
+            if left and right:
+                self.assertLess(max(left), min(right))
+
+    def test_partition_invalidArguments_raisesValueError(self):
+        for n, by in [(0, 'hash'), (2, 'invalid')]:
+            with self.subTest(n=n, by=by):
+                with self.assertRaises(ValueError):
+                    Iterable(self.__values).partition(n, by=by)
+
+    def test_transformations_inProcessPool_matchIterable(self):
+        partitioned = Iterable(self.__values).partition(3, processes=2)
+
+        self.assertEqual(
+            Counter(Iterable(self.__values).filter(is_even).map(square).mapmany(duplicate).to_list()),
+            Counter(partitioned.filter(is_even).map(square).mapmany(duplicate).collect().to_list())
+        )
+
+    def test_transformations_singleProcess_acceptsLambdas(self):
+        partitioned = Iterable(self.__values).partition(3, by='round_robin', processes=1)
+
+        self.assertEqual(
+            sum(x + 1 for x in self.__values),
+            partitioned.map(lambda x: x + 1).reduce(lambda a, b: a + b)
+        )
+
+    def test_aggregate_withCombine_returnsCombinedResult(self):
+        partitioned = Iterable(self.__values).partition(4, processes=2)
+
+        self.assertEqual(4, len(partitioned.aggregate(sum)))
+        self.assertEqual(sum(self.__values), partitioned.aggregate(sum, combine=add))
+
+    def test_len_returnsNumberOfItems(self):
+        self.assertEqual(25, Iterable(self.__values).partition(4, processes=2).filter(is_even).len())
+
+    def test_reduce_emptyPartitions_skipsThem(self):
+        self.assertEqual(3, Iterable([1, 2]).partition(5, by='round_robin', processes=1).reduce(add))
+
+    def test_shuffle_byKey_groupsEqualKeys(self):
+        words = ['apple', 'bob', 'avocado', 'cat', 'bee', 'cow', 'ant']
+        shuffled = Iterable(words).partition(3, by='round_robin').shuffle(key=first_letter)
+
+        self.assertEqual(3, len(shuffled))
+        self.assertEqual(
+            ['a', 'b', 'c'],
+            sorted(shuffled.map_partitions(distinct_keys).collect().to_list())
+        )
+
+    def test_constructor_withPool_usesPool(self):
+        class SerialPool(object):
+            calls = 0
+
+            def map(self, function, tasks):
+                SerialPool.calls += 1
+                return list(map(function, tasks))
+
+        partitioned = PartitionedIterable([[1, 2], [3]], pool=SerialPool())
+
+        self.assertEqual([2, 4, 6], partitioned.map(lambda x: x * 2).collect().to_list())
+        self.assertEqual(1, SerialPool.calls)
+
+
+@skipIf(shared_memory is None, "multiprocessing.shared_memory is new in 3.8")
+class TestPartitionedIterableSharedMemory(TestCase):
+
+    def setUp(self):
+        self.__values = [float(i) for i in range(1000)]
+
+    def __segments(self):
+        return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+    def test_map_withTypecode_writesResultsToArrays(self):
+        partitioned = Iterable(self.__values).partition(4, by='round_robin', processes=2, typecode='d')
+        partitions = partitioned.map(square, typecode='d').partitions()
+
+        self.assertTrue(all(isinstance(p, array.array) and p.typecode == 'd' for p in partitions))
+        self.assertEqual(
+            Counter(map(square, self.__values)),
+            Counter(itertools.chain.from_iterable(partitions))
+        )
+
+    def test_transformations_withTypecode_matchIterable(self):
+        partitioned = Iterable(self.__values).partition(3, processes=2, typecode='d')
+
+        self.assertEqual(
+            sum(square(x) for x in self.__values if x % 2 == 0),
+            partitioned.filter(is_even).map(square).aggregate(sum, combine=add)
+        )
+        self.assertEqual(500, partitioned.filter(is_even).len())
+
+    def test_run_withTypecode_unlinksSegments(self):
+        before = self.__segments()
+
+        Iterable(self.__values).partition(4, processes=2, typecode='d').map(square, typecode='d').collect()
+
+        self.assertEqual(before, self.__segments())
+
+    def test_run_functionRaises_unlinksSegments(self):
+        before = self.__segments()
+
+        with self.assertRaises(TypeError):
+            Iterable(self.__values).partition(4, processes=2, typecode='d').map(duplicate, typecode='d').collect()
+
+        self.assertEqual(before, self.__segments())
+
+    def test_shuffle_withTypecode_keepsTypecode(self):
+        partitioned = Iterable(self.__values).partition(4, processes=2, typecode='d').map(square, typecode='q')
+        partitions = partitioned.shuffle(2, by='range').partitions()
+
+        self.assertTrue(all(p.typecode == 'q' for p in partitions))
+        self.assertEqual(sorted(map(square, self.__values)), sorted(itertools.chain.from_iterable(partitions)))
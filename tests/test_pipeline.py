@@ -0,0 +1,41 @@
+from unittest2 import TestCase
+
+from pyiterable import Iterable, Pipeline
+
+
+class TestPipeline(TestCase):
+
+    def test_call_matchesIterableChain(self):
+        values = list(range(-5, 20))
+        pipeline = Pipeline().map(abs).filter(lambda x: x % 2).enumerate(1).take(4)
+
+        self.assertEqual(
+            Iterable(values).map(abs).filter(lambda x: x % 2).enumerate(1).take(4).to_list(),
+            pipeline(values).to_list()
+        )
+
+    def test_runMany_appliesToEveryInput(self):
+        pipeline = Pipeline().zip('ab').filter()
+
+        self.assertEqual(
+            [[(1, 'a')], [], [(2, 'a'), (3, 'b')]],
+            [result.to_list() for result in pipeline.run_many([[1], [], [2, 3, 4]])]
+        )
+
+    def test_compile_calledTwice_compilesOnce(self):
+        pipeline = Pipeline().map(str).take(5).take(2)
+
+        self.assertIs(pipeline.compile(), pipeline.compile())
+        self.assertEqual(['0', '1'], pipeline(range(10)).to_list())
+
+    def test_transformations_returnNewPipelines(self):
+        base = Pipeline().map(abs)
+        extended = base.take(1)
+
+        self.assertEqual(1, len(base))
+        self.assertEqual((('map', abs), ('take', 1)), extended.stages())
+        self.assertEqual([3, 2], base([-3, 2]).to_list())
+
+    def test_take_negativeCount_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Pipeline().take(-1)
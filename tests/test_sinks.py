@@ -0,0 +1,84 @@
+from unittest2 import TestCase
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from pyiterable import col, Iterable
+
+
+class TestSinks(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.mkdtemp()
+        self.__rows = [{'name': 'Ann', 'score': i} for i in range(2500)]
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def __path(self, name):
+        return os.path.join(self.__directory, name)
+
+    def test_toFile_writesLines(self):
+        path = self.__path('numbers.txt')
+
+        self.assertEqual(3, Iterable([1, 2, 3]).to_file(path))
+        with open(path) as f:
+            self.assertEqual('1\n2\n3\n', f.read())
+
+    def test_toFile_function_formatsElements(self):
+        path = self.__path('numbers.txt')
+
+        Iterable([1, 2]).to_file(path, function='{:03}'.format, separator=';')
+        with open(path) as f:
+            self.assertEqual('001;002;', f.read())
+
+    def test_toCsv_dicts_roundTripThroughFromCsv(self):
+        path = self.__path('scores.csv')
+
+        self.assertEqual(2500, Iterable(self.__rows).to_csv(path, batch_size=100))
+        self.assertEqual(self.__rows, Iterable.from_csv(path, types={'score': int}).to_list())
+
+    def test_toCsv_tuplesWithColumns_writesHeader(self):
+        path = self.__path('scores.csv')
+
+        Iterable([('Ann', 1), ('Bob', 2)]).to_csv(path, columns=['name', 'score'], delimiter=';')
+        with open(path, newline='') as f:
+            self.assertEqual([['name', 'score'], ['Ann', '1'], ['Bob', '2']], list(csv.reader(f, delimiter=';')))
+
+    def test_toCsv_empty_writesEmptyFile(self):
+        path = self.__path('empty.csv')
+
+        self.assertEqual(0, Iterable([]).to_csv(path))
+        self.assertEqual(0, os.path.getsize(path))
+
+    def test_toJsonl_threads_keepOrder(self):
+        path = self.__path('scores.jsonl')
+
+        self.assertEqual(2500, Iterable(self.__rows).to_jsonl(path, batch_size=7, threads=3))
+        with open(path) as f:
+            self.assertEqual(self.__rows, [json.loads(line) for line in f])
+
+    def test_toJsonl_sourceRaises_propagates(self):
+        def rows():
+            yield {'a': 1}
+            raise KeyError('source failed')
+
+        with self.assertRaises(KeyError):
+            Iterable.defer(rows).to_jsonl(self.__path('failed.jsonl'), threads=2)
+
+    def test_toSqlite_dicts_createsTableAndInserts(self):
+        connection = sqlite3.connect(':memory:')
+
+        self.assertEqual(2500, Iterable(self.__rows).to_sqlite(connection, 'scores', batch_size=300))
+        self.assertEqual(2500, Iterable.from_sqlite(connection, table='scores').len())
+        self.assertEqual(self.__rows[-1], Iterable.from_sqlite(connection, table='scores').max(key=col('score')))
+
+    def test_toSqlite_tuples_insertIntoExistingTable(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute('CREATE TABLE pairs (a INTEGER, b TEXT)')
+
+        Iterable([(1, 'x'), (2, 'y')]).to_sqlite(connection, 'pairs')
+        self.assertEqual([(1, 'x'), (2, 'y')], connection.execute('SELECT * FROM pairs').fetchall())
@@ -0,0 +1,77 @@
+from collections import Counter
+from unittest2 import TestCase
+import random
+
+from pyiterable import TDigest
+from pyiterable.sketches import reservoir_sample, weighted_reservoir_sample
+
+
+class TestTDigest(TestCase):
+
+    def setUp(self):
+        self.__values = [(i * 7919) % 10007 for i in range(20000)]
+
+    def test_constructor_nonPositiveCompression_raisesValueError(self):
+        for compression in [0, -5]:
+            with self.subTest(compression=compression):
+                with self.assertRaises(ValueError):
+                    TDigest(compression)
+
+    def test_add_manyValues_keepsBoundedCentroids(self):
+        digest = TDigest.from_iterable(self.__values, compression=50)
+
+        self.assertEqual(len(self.__values), len(digest))
+        self.assertLessEqual(len(digest._means), 50)
+
+    def test_quantile_extremes_returnsMinAndMax(self):
+        digest = TDigest.from_iterable(self.__values)
+
+        self.assertEqual(min(self.__values), digest.quantile(0))
+        self.assertEqual(max(self.__values), digest.quantile(1))
+
+    def test_quantile_emptyDigest_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            TDigest().quantile(0.5)
+
+    def test_merge_partitions_matchesSingleDigest(self):
+        half = len(self.__values) // 2
+        merged = TDigest.from_iterable(self.__values[:half]).merge(TDigest.from_iterable(self.__values[half:]))
+        single = TDigest.from_iterable(self.__values)
+
+        self.assertEqual(len(single), len(merged))
+        for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+            with self.subTest(q=q):
+                self.assertAlmostEqual(single.quantile(q), merged.quantile(q), delta=10007 * 0.01)
+
+    def test_merge_emptyDigest_keepsValues(self):
+        digest = TDigest.from_iterable([1, 2, 3]).merge(TDigest())
+
+        self.assertEqual(2, digest.quantile(0.5))
+
+
+class TestReservoirSample(TestCase):
+
+    def test_reservoir_sample_generator_returnsKDistinctElements(self):
+        actual = reservoir_sample((i for i in range(1000)), 20, random.Random(0))
+
+        self.assertEqual(20, len(set(actual)))
+        self.assertTrue(all(0 <= x < 1000 for x in actual))
+
+    def test_reservoir_sample_shortGenerator_returnsAllElements(self):
+        self.assertEqual([0, 1, 2], reservoir_sample(iter(range(3)), 5, random.Random(0)))
+
+    def test_reservoir_sample_manyRuns_isApproximatelyUniform(self):
+        counts = Counter()
+        for seed in range(4000):
+            counts.update(reservoir_sample(iter(range(10)), 2, random.Random(seed)))
+
+        for value in range(10):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(800, counts[value], delta=120)
+
+    def test_weighted_reservoir_sample_manyRuns_favoursHeavierElements(self):
+        counts = Counter()
+        for seed in range(2000):
+            counts.update(weighted_reservoir_sample(iter('ab'), iter([1, 9]), 1, random.Random(seed)))
+
+        self.assertAlmostEqual(1800, counts['b'], delta=100)
@@ -0,0 +1,236 @@
+from unittest2 import TestCase
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from pyiterable import col, Iterable
+
+
+class TestFileSources(TestCase):
+
+    def setUp(self):
+        self.__directory = tempfile.mkdtemp()
+        self.__csv = os.path.join(self.__directory, 'scores.csv')
+        with open(self.__csv, 'w') as f:
+            f.write('name,score,city\nAlice,90,Oslo\nBob,70,Rome\n\nCharlie,85,Oslo\n')
+
+        self.__jsonl = os.path.join(self.__directory, 'events.jsonl')
+        with open(self.__jsonl, 'w') as f:
+            for event in [{'time': 1, 'level': 'error', 'message': 'disk'}, {'time': 2, 'level': 'info'},
+                          {'time': 3, 'level': 'error'}, {'time': 4, 'level': 'ERROR'}]:
+                f.write(json.dumps(event) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.__directory)
+
+    def test_fromCsv_readsRowsAsDicts(self):
+        rows = Iterable.from_csv(self.__csv)
+
+        self.assertEqual(
+            [{'name': 'Alice', 'score': '90', 'city': 'Oslo'}, {'name': 'Bob', 'score': '70', 'city': 'Rome'},
+             {'name': 'Charlie', 'score': '85', 'city': 'Oslo'}],
+            rows.to_list()
+        )
+        self.assertEqual(3, rows.len())
+
+    def test_fromCsv_columns_projectsAndConverts(self):
+        rows = Iterable.from_csv(self.__csv, columns=['score', 'name'], types={'score': int})
+
+        self.assertEqual([{'score': 90, 'name': 'Alice'}, {'score': 70, 'name': 'Bob'},
+                          {'score': 85, 'name': 'Charlie'}], rows.to_list())
+
+    def test_fromCsv_filterExpression_evaluatedDuringScan(self):
+        converted = []
+
+        def upper(name):
+            converted.append(name)
+            return name.upper()
+
+        rows = Iterable.from_csv(self.__csv, columns=['name', 'score'], types={'name': upper, 'score': int})
+        high = rows.filter(col('score') > 80).filter(col('score') < 88)
+
+        self.assertEqual(['CHARLIE'], high.map(col('name')).to_list())
+        self.assertEqual(['Charlie'], converted)
+
+    def test_fromCsv_filterOverUnreadColumn_raisesKeyError(self):
+        with self.assertRaises(KeyError):
+            Iterable.from_csv(self.__csv, columns=['name']).filter(col('city') == 'Oslo')
+
+    def test_fromCsv_unknownColumn_raisesValueError(self):
+        with self.assertRaises(ValueError):
+            Iterable.from_csv(self.__csv, columns=['age']).to_list()
+
+    def test_fromCsv_delimiter_passedToReader(self):
+        path = os.path.join(self.__directory, 'scores.tsv')
+        with open(path, 'w') as f:
+            f.write('a\tb\n1\t2\n')
+
+        self.assertEqual([{'b': '2'}], Iterable.from_csv(path, columns=['b'], delimiter='\t').to_list())
+
+    def test_fromCsv_shortRow_missingValuesAreNoneAndNotConverted(self):
+        path = os.path.join(self.__directory, 'short.csv')
+        with open(path, 'w') as f:
+            f.write('name,score\na,1\nb\n')
+
+        rows = Iterable.from_csv(path, types={'score': int})
+
+        self.assertEqual([{'name': 'a', 'score': 1}, {'name': 'b', 'score': None}], rows.to_list())
+        self.assertEqual([{'name': 'a', 'score': 1}], rows.filter(col('score') == 1).to_list())
+
+    def test_fromCsv_duplicateHeader_matchesDictReader(self):
+        path = os.path.join(self.__directory, 'duplicates.csv')
+        with open(path, 'w') as f:
+            f.write('a,b,a\n1,2,3\n')
+
+        with open(path) as f:
+            expected = [dict(row) for row in csv.DictReader(f)]
+        self.assertEqual(expected, Iterable.from_csv(path).to_list())
+        self.assertEqual(expected, Iterable.from_csv(path).filter(col('a') == '3').to_list())
+
+    def test_fromJsonl_fields_projectsMissingAsNone(self):
+        events = Iterable.from_jsonl(self.__jsonl, fields=['time', 'message'])
+
+        self.assertEqual([{'time': 1, 'message': 'disk'}, {'time': 2, 'message': None},
+                          {'time': 3, 'message': None}, {'time': 4, 'message': None}], events.to_list())
+
+    def test_fromJsonl_filterExpression_matchesLambda(self):
+        events = Iterable.from_jsonl(self.__jsonl)
+        expressions = [col('level') == 'error', (col('level') == 'error') & (col('time') > 1),
+                       col('level').lower() == 'error', col('level') != 'error']
+
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                self.assertEqual(
+                    Iterable(events.to_list()).filter(lambda event: expression(event)).to_list(),
+                    events.filter(expression).to_list()
+                )
+
+
+class TestSqliteSource(TestCase):
+
+    def setUp(self):
+        self.__connection = sqlite3.connect(':memory:')
+        self.__connection.execute('CREATE TABLE scores (name TEXT, score INTEGER)')
+        self.__rows = [('Ann', 90), ('Bob', 70), ('Abe', 85), ('Cat', 65), ('Dan', 99)]
+        self.__connection.executemany('INSERT INTO scores VALUES (?, ?)', self.__rows)
+        self.__statements = []
+        self.__connection.set_trace_callback(self.__statements.append)
+        self.__scores = Iterable.from_sqlite(self.__connection, table='scores')
+
+    def tearDown(self):
+        self.__connection.close()
+
+    def test_fromSqlite_readsRowsAsDicts(self):
+        self.assertEqual([{'name': name, 'score': score} for name, score in self.__rows],
+                         self.__scores.to_list())
+
+    def test_fromSqlite_query_readsQueryRows(self):
+        rows = Iterable.from_sqlite(self.__connection, query='SELECT name FROM scores WHERE score < ?',
+                                    parameters=(70,), batch_size=1)
+
+        self.assertEqual([{'name': 'Cat'}], rows.to_list())
+
+    def test_fromSqlite_tableAndQuery_raisesValueError(self):
+        for kwargs in [{}, {'table': 'scores', 'query': 'SELECT 1'}]:
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    Iterable.from_sqlite(self.__connection, **kwargs)
+
+    def test_transformations_pushedIntoSql(self):
+        top = self.__scores.filter(col('score') > 66).sorted(key=col('score'), reverse=True).skip(1).take(2)
+
+        self.assertEqual([{'name': 'Ann', 'score': 90}, {'name': 'Abe', 'score': 85}], top.to_list())
+        self.assertEqual(1, len(self.__statements))
+        self.assertIn('WHERE', self.__statements[0])
+        self.assertIn('ORDER BY "score" DESC LIMIT 2 OFFSET 1', self.__statements[0])
+
+    def test_transformations_matchPython(self):
+        rows = Iterable([{'name': name, 'score': score} for name, score in self.__rows])
+        cases = [
+            lambda i: i.filter((col('score') >= 85) | col('name').startswith('C')),
+            lambda i: i.filter(~col('name').isin(['Ann', 'Bob']) & (col('score') * 2 - 100 != 70)),
+            lambda i: i.filter(col('name').endswith('n')).sorted(key=col('name')),
+            lambda i: i.sorted(key=col('score')).take(3).skip(1),
+            lambda i: i.take(2).filter(col('score') > 80),
+            lambda i: i.filter(col('score') % 2 == 0),
+            lambda i: i.map(col('score') + 1).sorted(reverse=True),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(case(rows).to_list(), case(self.__scores).to_list())
+
+    def test_sortedByColumnNamedValue_thenMapped_matchesPython(self):
+        self.__connection.execute('CREATE TABLE pairs (name TEXT, value INTEGER)')
+        self.__connection.executemany('INSERT INTO pairs VALUES (?, ?)', [('a', 3), ('b', 1), ('c', 2)])
+        pairs = Iterable.from_sqlite(self.__connection, table='pairs')
+
+        self.assertEqual(['b', 'c', 'a'], pairs.sorted(key=col('value')).map(col('name')).to_list())
+        self.assertEqual(['c', 'b', 'a'],
+                         pairs.sorted(key=col('value')).map(col('name')).sorted(reverse=True).to_list())
+        self.assertEqual('c', pairs.map(col('name')).max())
+
+    def test_expressions_notPushedWhereSqlDiffers_matchPython(self):
+        self.__connection.execute("INSERT INTO scores VALUES ('', NULL)")
+        rows = Iterable(self.__scores.to_list())
+        cases = [
+            lambda i: i.map(col('name') + col('name')),
+            lambda i: i.map(col('name') * 2),
+            lambda i: i.filter(col('name')),
+            lambda i: i.filter(col('score')),
+            lambda i: i.filter(col('name') & (col('score') > 80)),
+            lambda i: i.filter(~col('name') | (col('name') == 'Bob')),
+            lambda i: i.filter(col('score') != 90),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                self.assertEqual(case(rows).to_list(), case(self.__scores).to_list())
+
+    def test_minMax_nullKeys_matchPython(self):
+        self.__connection.execute("INSERT INTO scores VALUES ('Eve', NULL)")
+
+        with self.assertRaises(TypeError):
+            self.__scores.min(key=col('score'))
+        with self.assertRaises(TypeError):
+            self.__scores.map(col('score')).max()
+        self.assertEqual({'name': 'Eve', 'score': None}, self.__scores.max(key=col('name')))
+
+    def test_distinct_pushedIntoSql(self):
+        self.__connection.execute("INSERT INTO scores VALUES ('Ann', 90)")
+
+        self.assertEqual(5, self.__scores.distinct().len())
+        self.assertEqual(['Abe', 'Ann', 'Bob', 'Cat', 'Dan'], self.__scores.map(col('name')).distinct().sorted().to_list())
+
+    def test_aggregates_computedBySql(self):
+        self.assertEqual(5, self.__scores.len())
+        self.assertEqual(409, self.__scores.map(col('score')).sum())
+        self.assertEqual({'name': 'Dan', 'score': 99}, self.__scores.max(key=col('score')))
+        self.assertEqual(65, self.__scores.map(col('score')).min())
+        self.assertEqual(2, self.__scores.filter(col('score') > 85).len())
+        self.assertTrue(all(statement.startswith('SELECT') for statement in self.__statements))
+        self.assertTrue(all('COUNT(*)' in statement or 'LIMIT' in statement or 'SUM' in statement
+                            or 'EXISTS' in statement for statement in self.__statements))
+
+    def test_sum_nullTextOrLargeValues_matchPython(self):
+        self.__connection.execute('CREATE TABLE mixed (n INTEGER, text TEXT)')
+        self.__connection.executemany('INSERT INTO mixed VALUES (?, ?)', [(2 ** 62, 'a'), (2 ** 62, 'b')])
+        mixed = Iterable.from_sqlite(self.__connection, table='mixed')
+
+        self.assertEqual(2 ** 63, mixed.map(col('n')).sum())
+        with self.assertRaises(TypeError):
+            mixed.map(col('text')).sum()
+
+        self.__connection.execute("INSERT INTO scores VALUES ('Eve', NULL)")
+        with self.assertRaises(TypeError):
+            self.__scores.map(col('score')).sum()
+
+    def test_aggregates_empty_matchPython(self):
+        empty = self.__scores.filter(col('score') > 100)
+
+        self.assertEqual(0, empty.len())
+        self.assertEqual(10, empty.map(col('score')).sum(10))
+        self.assertIsNone(empty.max(key=col('score'), default=None))
+        with self.assertRaises(ValueError):
+            empty.min(key=col('score'))